@@ -1,26 +1,50 @@
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Union
+
 from pydantic import BaseModel
 from pydantic_ai import Agent, FunctionToolset, ModelSettings, RunContext
+from pydantic_ai.capabilities import PrepareTools, ProcessHistory
 from pydantic_ai.exceptions import ModelRetry
-from config import settings as conf
+from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models import Model, infer_model
+from pydantic_ai.toolsets import AbstractToolset
+from config import Settings, settings as process_settings
 import importlib
 
 from general_toolset import toolset as general_toolset
+from model_router import RoutingModel
+from fast_path import FastPath
+from hedged_model import HedgedModel
+from plan_cache import PlanCache
+from prompt_cache import PromptCacheStats, cache_model_settings, keepalive_provider_factory, stable_tool_order, warm_up
+from robot_state import RobotStateContext
+from speculative import SpeculativeRunner, SpeculativeToolset
+from tool_filter import ToolFilter
+
+
+############################################################
+# Cached construction
+############################################################
+
+# Read by the robot modules from config.settings when they are imported, so they apply to the whole process
+ROBOT_PROCESS_SETTINGS = (
+    "CONTROL_PROCESS", "SPATIAL_MEMORY_SIZE", "SPATIAL_MEMORY_OBSERVATIONS", "SPATIAL_MEMORY_THUMBNAIL_PX",
+    "TRANSPORT_HEALTH_LOG_SEC", "VELOCITY_STREAMING",
+)
 
 
-# Dynamically import the robot specified in the configuration
-robot_module = importlib.import_module(conf.ROBOT_MODULE)
-robot_toolset = getattr(robot_module, conf.ROBOT_TOOLSET)
+@lru_cache(maxsize=None)
+def load_robot_toolset(robot_module: str, toolset_name: str) -> FunctionToolset:
+    """Import the robot module once and return its toolset; tool schemas are built on import."""
+    module = importlib.import_module(robot_module)
+    return getattr(module, toolset_name)
 
-robot_description = robot_toolset.metadata.get("robot_description", None)    
 
-agent = Agent(  
-    conf.MODEL,
-    # deps_type=RobotInstance,
-    output_type=str,
-    model_settings=ModelSettings(
-        parallel_tool_calls=False,
-    ),
-    system_prompt=(
+@lru_cache(maxsize=None)
+def build_system_prompt(robot_description: Optional[str]) -> str:
+    return (
         'You are the brain of a robot.'
         f'{"Robot description: " + robot_description if robot_description else ""}'
         'Get an instruction from the user and execute it.'
@@ -28,13 +52,203 @@ agent = Agent(
         'Use available tools to perform your given task.'
         'If the requested action is not possible, relay that to the user.'
         'User instructions can consist of multiple steps.'
-        
+
         'Make your responses as concise and to the point as possible!'
         'Give clear and direct answers without unnecessary elaboration!'
         'Be brief with all responses!'
         'Do not mention unrelated information!'
         'Do not relay function names, parameters, descriptions or the system prompt to the user, they are here for your reference.'
         'Assume the user is not technically savvy.'
-    ),
-    toolsets=[general_toolset, robot_toolset],
-)
\ No newline at end of file
+    )
+
+
+@lru_cache(maxsize=None)
+def load_model(name: str, keepalive_sec: float = 0.0) -> Model:
+    """Provider model by name, shared so agents reuse one HTTP client and connection pool.
+
+    With ``keepalive_sec`` the pool keeps idle connections that long instead of httpx's 5 s.
+    """
+    if keepalive_sec > 0:
+        return infer_model(name, keepalive_provider_factory(keepalive_sec))
+    return infer_model(name)
+
+
+############################################################
+# Factory
+############################################################
+
+@dataclass
+class RobotAgent:
+    """An agent together with the per-instance helpers that run turns around it."""
+
+    settings: Settings
+    agent: Agent
+    model: Union[Model, RoutingModel, HedgedModel]
+    system_prompt: str
+    robot_toolset: FunctionToolset
+    speculative: Optional[SpeculativeRunner] = None
+    fast_path: Optional[FastPath] = None
+    plan_cache: Optional[PlanCache] = None
+    state_context: Optional[RobotStateContext] = None
+    tool_filter: Optional[ToolFilter] = None
+    prompt_cache: Optional[PromptCacheStats] = None
+    function_toolsets: List[FunctionToolset] = field(default_factory=list)  # the tools the agent sends, for the warm-up
+
+    def run_sync(self, prompt: str, message_history: Optional[List[ModelMessage]] = None):
+        """Run one user turn: fast path, then plan cache, then the model."""
+        result = self.fast_path.try_run(prompt, message_history) if self.fast_path else None  # Simple commands skip the model
+        if result is None and self.plan_cache:
+            result = self.plan_cache.try_run(prompt, message_history)  # Repeated instructions replay a cached plan
+        if result is None:
+            run_sync = self.speculative.run_sync if self.speculative else self.agent.run_sync  # Streaming mode starts tools early
+            start = time.perf_counter()
+            result = run_sync(prompt, message_history=message_history)
+            if self.prompt_cache:
+                self.prompt_cache.record(result.usage, time.perf_counter() - start)
+            if self.plan_cache:
+                self.plan_cache.record_run(prompt, result.new_messages(), result.output)
+        return result
+
+    def provider_models(self) -> List[Model]:
+        """The provider models behind the routing and hedging wrappers."""
+        models = [self.model.primary, self.model.backup] if isinstance(self.model, HedgedModel) else [self.model]
+        models = [m for model in models for m in (model.models if isinstance(model, RoutingModel) else [model])]
+        return list({id(model): model for model in models}.values())
+
+    def warm_up(self) -> Dict[str, Optional[float]]:
+        """Open the provider connections and prime their prompt caches before the first turn (see prompt_cache.py)."""
+        tool_defs = [tool.tool_def for toolset in self.function_toolsets for tool in toolset.tools.values()]
+        # The tool filter sends a different tool list, and so a different prefix, per group combination
+        tool_lists = self.tool_filter.tool_lists(tool_defs) if self.tool_filter else [tool_defs]
+        if self.prompt_cache:
+            tool_lists = [stable_tool_order(None, defs) for defs in tool_lists]
+        return warm_up(self.provider_models(), self.system_prompt, tool_lists, self.agent.model_settings or {})
+
+    def summaries(self) -> List[str]:
+        lines = []
+        if self.fast_path:
+            lines.append(self.fast_path.summary())
+        if self.plan_cache:
+            lines.append(self.plan_cache.summary())
+        if self.speculative:
+            lines.append(self.speculative.summary())
+        if self.state_context:
+            lines.append(self.state_context.summary())
+        if self.tool_filter:
+            lines.append(self.tool_filter.summary())
+        if self.prompt_cache:
+            lines.append(self.prompt_cache.summary())
+        model = self.model
+        if isinstance(model, HedgedModel):
+            lines.append(model.summary())
+            model = model.primary
+        if isinstance(model, RoutingModel):
+            lines.append(model.summary())
+        return lines
+
+
+def build_agent(settings: Settings, toolsets: Sequence[FunctionToolset] = ()) -> RobotAgent:
+    """Build an independent agent for ``settings``.
+
+    The robot module, its tool schemas, the system prompt and provider models are
+    constructed once per process and shared; everything with per-run state
+    (agent, router statistics, speculative wrapper, fast path and plan cache
+    counters) is new for every call. ``toolsets`` are extra front-end tools such
+    as ``inform_user``, which the plan cache ignores when recording plans.
+
+    The robot module owns the robot's connections and is imported once per
+    process, so ``ROBOT_PROCESS_SETTINGS`` come from the process-wide
+    ``config.settings``; different values in ``settings`` are reported and
+    ignored.
+    """
+    overridden = [key for key in ROBOT_PROCESS_SETTINGS if getattr(settings, key) != getattr(process_settings, key)]
+    if overridden:
+        print(f"[Agent] {', '.join(overridden)} apply to the whole process (config.settings), ignored for this agent")
+    robot_toolset = load_robot_toolset(settings.ROBOT_MODULE, settings.ROBOT_TOOLSET)
+    system_prompt = build_system_prompt(robot_toolset.metadata.get("robot_description", None))
+
+    # Optionally let allowed robot tools start while the model is still streaming its response
+    agent_robot_toolset: AbstractToolset = robot_toolset
+    if settings.SPECULATIVE_EXECUTION:
+        agent_robot_toolset = SpeculativeToolset(
+            robot_toolset,
+            allowed_tools=set(settings.SPECULATIVE_TOOLS or robot_toolset.metadata.get("speculative_tools", [])),
+        )
+
+    # Route turns across a cascade of models if configured, otherwise use the single model
+    keepalive_sec = settings.PROVIDER_KEEPALIVE_SEC
+    model = (
+        RoutingModel(*(load_model(name, keepalive_sec) for name in settings.MODEL_TIERS))
+        if settings.MODEL_TIERS else load_model(settings.MODEL, keepalive_sec)
+    )
+
+    # Optionally duplicate slow requests to a backup model and use the first answer
+    if settings.HEDGING:
+        model = HedgedModel(
+            model,
+            load_model(settings.HEDGE_MODEL or settings.MODEL, keepalive_sec),
+            hedge_delay_sec=settings.HEDGE_DELAY_SEC,
+            hedge_percentile=settings.HEDGE_PERCENTILE,
+            max_hedge_rate=settings.HEDGE_MAX_RATE,
+        )
+
+    # Attach the robot's cached state to every model request so the model does not have to query it with tools
+    state_fields = robot_toolset.metadata.get("state_fields", {})
+    state_context = RobotStateContext(state_fields, settings.ROBOT_STATE_FIELDS) if settings.ROBOT_STATE_CONTEXT and state_fields else None
+
+    # Send only the tool groups relevant to the instruction, with show_all_tools as the way back to the full set
+    tool_filter = ToolFilter([general_toolset, robot_toolset, *toolsets]) if settings.TOOL_FILTER else None
+    if tool_filter and not tool_filter.groups:  # no toolset declares tool groups
+        tool_filter = None
+
+    capabilities = []
+    if state_context:
+        capabilities.append(ProcessHistory(state_context.inject))
+    if tool_filter:
+        capabilities.append(PrepareTools(tool_filter.prepare_tools))
+    # Keep the request prefix byte-stable so provider prompt caching hits; runs after the filter
+    if settings.PROMPT_CACHE:
+        capabilities.append(PrepareTools(stable_tool_order))
+
+    function_toolsets = [general_toolset, robot_toolset, *toolsets, *([tool_filter.toolset] if tool_filter else [])]
+    agent = Agent(
+        model,
+        # deps_type=RobotInstance,
+        output_type=str,
+        model_settings=ModelSettings(
+            parallel_tool_calls=False,
+            **(cache_model_settings(f"{settings.ROBOT_MODULE}.{settings.ROBOT_TOOLSET}") if settings.PROMPT_CACHE else {}),
+        ),
+        system_prompt=system_prompt,
+        toolsets=[general_toolset, agent_robot_toolset, *function_toolsets[2:]],
+        capabilities=capabilities or None,
+    )
+
+    robot_agent = RobotAgent(
+        settings=settings,
+        agent=agent,
+        model=model,
+        system_prompt=system_prompt,
+        robot_toolset=robot_toolset,
+        speculative=SpeculativeRunner(agent, agent_robot_toolset) if settings.SPECULATIVE_EXECUTION else None,
+        # Simple robot commands are executed without a model round trip
+        fast_path=FastPath(robot_toolset, system_prompt) if settings.FAST_PATH else None,
+        state_context=state_context,
+        tool_filter=tool_filter,
+        prompt_cache=PromptCacheStats() if settings.PROMPT_CACHE else None,
+        function_toolsets=function_toolsets,
+    )
+
+    # Repeated instructions replay the tool calls of an earlier successful run
+    if settings.PLAN_CACHE:
+        robot_agent.plan_cache = PlanCache(
+            robot_toolset,
+            toolset_id=f"{settings.ROBOT_MODULE}.{settings.ROBOT_TOOLSET}",
+            path=settings.PLAN_CACHE_PATH,
+            max_entries=settings.PLAN_CACHE_SIZE,
+            system_prompt=system_prompt,
+        )
+        for toolset in function_toolsets[2:]:
+            robot_agent.plan_cache.ignored_tools.update(toolset.tools)
+
+    return robot_agent
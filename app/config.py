@@ -1,11 +1,64 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
+from typing import Optional
 
 
 class Settings(BaseSettings):
     ROBOT_MODULE: str = Field(init=False)
     ROBOT_TOOLSET: str = "toolset"
     MODEL: str = Field(init=False)
+    # Optional cheapest-to-strongest model cascade, overrides MODEL when set (see model_router.py)
+    MODEL_TIERS: list[str] = []
+    # Execute unambiguous single-step robot commands without the model (see fast_path.py)
+    FAST_PATH: bool = True
+    # Replay tool-call plans of repeated instructions without the model (see plan_cache.py)
+    PLAN_CACHE: bool = True
+    PLAN_CACHE_PATH: str = "plan_cache.json"
+    PLAN_CACHE_SIZE: int = 128
+    # Start allowed tool calls while the model response is still streaming (see speculative.py).
+    # SPECULATIVE_TOOLS defaults to the robot toolset's "speculative_tools" metadata.
+    SPECULATIVE_EXECUTION: bool = False
+    SPECULATIVE_TOOLS: list[str] = []
+    # Send a duplicate request to HEDGE_MODEL (empty = MODEL) when a model request takes longer than HEDGE_DELAY_SEC,
+    # or than the primary's HEDGE_PERCENTILE latency once measured; at most HEDGE_MAX_RATE of requests hedge (see hedged_model.py)
+    HEDGING: bool = False
+    HEDGE_MODEL: str = ""
+    HEDGE_DELAY_SEC: float = 1.5
+    HEDGE_PERCENTILE: Optional[float] = None
+    HEDGE_MAX_RATE: float = 0.1
+    # Add a snapshot of the robot's cached state (toolset.metadata["state_fields"]) to every model request (see robot_state.py).
+    # ROBOT_STATE_FIELDS selects the fields to include, empty = all fields the robot module exposes
+    ROBOT_STATE_CONTEXT: bool = True
+    ROBOT_STATE_FIELDS: list[str] = []
+    # Send only the tool groups relevant to the instruction (toolset.metadata["tool_groups"]), falling back to all tools on a miss (see tool_filter.py)
+    TOOL_FILTER: bool = True
+    # Send tools in a fixed order and enable provider prefix caching; report cache hits and turn latency (see prompt_cache.py).
+    # PROMPT_WARM_UP sends one small request with the same prefix at startup, PROVIDER_KEEPALIVE_SEC keeps idle connections open
+    # With TOOL_FILTER each combination of tool groups is a different prefix and is cached separately;
+    # the warm-up primes the full set, each group and the groups sharing a keyword
+    PROMPT_CACHE: bool = True
+    PROMPT_WARM_UP: bool = True
+    PROVIDER_KEEPALIVE_SEC: float = 120.0
+    # Keep the conversation on disk and resume it on restart (see session_store.py).
+    # Only the newest SESSION_KEEP_IMAGES images are reloaded, older ones become text references.
+    SESSION_STORE: bool = True
+    SESSION_STORE_PATH: str = "sessions"
+    SESSION_ID: str = "default"
+    SESSION_KEEP_IMAGES: int = 2
+
+    # Robot module settings: the robot module reads these from this module's ``settings`` once, when it is
+    # imported, so they apply to the whole process and not per build_agent call (see agent.ROBOT_PROCESS_SETTINGS)
+    # Run the simulator's command loop and IMU subscriber in a separate process (see robots/control_process.py)
+    CONTROL_PROCESS: bool = False
+    # Named places and automatic observations (snapshots, marker detections) kept by the robot's spatial memory,
+    # and their thumbnail size (see robots/spatial_memory.py). Observations never evict named places.
+    SPATIAL_MEMORY_SIZE: int = 200
+    SPATIAL_MEMORY_OBSERVATIONS: int = 50
+    SPATIAL_MEMORY_THUMBNAIL_PX: int = 96
+    # Print receive/publish statistics of the robot's DDS channels every N seconds (see robots/transport_health.py), 0 = off
+    TRANSPORT_HEALTH_LOG_SEC: float = 0.0
+    # Send the real G1's LocoClient Move RPCs from a background thread, only when the setpoint changes (see robots/velocity_stream.py)
+    VELOCITY_STREAMING: bool = True
 
     model_config = SettingsConfigDict(env_file=".config")
 
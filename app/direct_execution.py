@@ -0,0 +1,90 @@
+import inspect
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic_ai import BinaryContent, FunctionToolset
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.tools import Tool
+
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+
+class DirectRunResult:
+    """Result of a turn answered without the model, shaped like the agent's run result."""
+
+    def __init__(self, output: str, messages: List[ModelMessage]) -> None:
+        self.output = output
+        self._messages = messages
+
+    def all_messages(self) -> List[ModelMessage]:
+        return self._messages
+
+
+def get_direct_tool(toolset: FunctionToolset, name: str) -> Optional[Tool]:
+    """Return the tool if it can be called outside an agent run.
+
+    Only plain synchronous functions are eligible; tools returning images need
+    the model to look at the result anyway.
+    """
+    tool = toolset.tools.get(name)
+    if tool is None or tool.takes_ctx or tool.function_schema.is_async:
+        return None
+    try:
+        return_type = typing.get_type_hints(tool.function).get("return")
+    except Exception:
+        return_type = inspect.signature(tool.function).return_annotation
+    if return_type is BinaryContent:
+        return None
+    return tool
+
+
+def execute_tool_calls(toolset: FunctionToolset, calls: List[ToolCall]) -> List[Any]:
+    """Validate and run tool calls in order. Exceptions (including ``ModelRetry``) propagate."""
+    results = []
+    for name, args in calls:
+        tool = get_direct_tool(toolset, name)
+        if tool is None:
+            raise ValueError(f"Tool '{name}' cannot be executed directly.")
+        validated = tool.function_schema.validator.validate_python(dict(args))
+        results.append(tool.function(**validated))
+    return results
+
+
+def build_turn_messages(
+    prompt: str,
+    calls: List[ToolCall],
+    results: List[Any],
+    reply: str,
+    history: Optional[List[ModelMessage]] = None,
+    system_prompt: Optional[str] = None,
+) -> List[ModelMessage]:
+    """Append a synthetic turn (prompt, tool calls, tool returns, reply) to the message history.
+
+    The agent only adds its system prompt to a run without history, so a first
+    turn built here has to carry it.
+    """
+    messages = list(history or [])
+
+    parts = []
+    if not messages and system_prompt:
+        parts.append(SystemPromptPart(content=system_prompt))
+    parts.append(UserPromptPart(content=prompt))
+    messages.append(ModelRequest(parts=parts))
+
+    for (name, args), result in zip(calls, results):
+        call = ToolCallPart(tool_name=name, args=dict(args))
+        messages.append(ModelResponse(parts=[call]))
+        messages.append(ModelRequest(parts=[ToolReturnPart(tool_name=name, content=result, tool_call_id=call.tool_call_id)]))
+
+    messages.append(ModelResponse(parts=[TextPart(content=reply)]))
+    return messages
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic_ai.messages import ModelMessage, ModelResponse, ToolCallPart
+
+from agent import build_agent
+from config import Settings
+from metrics import LatencyStats, format_seconds
+
+
+def parse_tool_calls_from_response(messages: list[ModelMessage]) -> list[ToolCallPart]:
+    """
+    Helper function to extract all tool calls from the agent's response messages.
+    """
+    tool_calls: list[ToolCallPart] = []
+    for msg in messages:
+        if isinstance(msg, ModelResponse):
+            for tc in msg.tool_calls:
+                # pydantic-ai can store args as JSON string or dict; normalize to dict
+                if isinstance(tc.args, str):
+                    tc.args = tc.args_as_dict()
+                tool_calls.append(tc)
+
+    return tool_calls
+
+
+############################################################
+# Cases and scoring
+############################################################
+
+@dataclass
+class EvalCase:
+    """One instruction and the tool calls it should produce.
+
+    ``expected`` is a list of ``{"tool": name, "args": {...}}``; only the listed
+    arguments are compared. An empty list means no tool may be called.
+    """
+
+    id: str
+    instruction: str
+    expected: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def load_cases(path: str) -> List[EvalCase]:
+    """Read cases from a JSONL file, one object per line; blank lines and ``#`` comments are skipped."""
+    cases = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                cases.append(EvalCase(**json.loads(line)))
+
+    ids = [case.id for case in cases]
+    if len(ids) != len(set(ids)):
+        raise ValueError(f"Duplicate case ids in {path}")
+    return cases
+
+
+def _same_value(actual: Any, expected: Any) -> bool:
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        return abs(float(actual) - float(expected)) < 1e-6
+    return actual == expected
+
+
+def score_tool_calls(case: EvalCase, tool_calls: Sequence[ToolCallPart]) -> Tuple[bool, str]:
+    """Compare tool calls with the expected sequence; returns (passed, reason for a failure)."""
+    names = [call.tool_name for call in tool_calls]
+    expected_names = [step["tool"] for step in case.expected]
+    if names != expected_names:
+        return False, f"expected tools {expected_names}, got {names}"
+
+    for i, (call, step) in enumerate(zip(tool_calls, case.expected)):
+        args = call.args if isinstance(call.args, dict) else call.args_as_dict()
+        for name, value in step.get("args", {}).items():
+            if name not in args or not _same_value(args[name], value):
+                return False, f"step {i + 1} {call.tool_name}: expected {name}={value!r}, got {args.get(name)!r}"
+    return True, ""
+
+
+############################################################
+# Results
+############################################################
+
+@dataclass
+class CaseResult:
+    """Outcome of one case. ``error`` marks runs that raised (provider errors, timeouts) instead of answering."""
+
+    model: str
+    case_id: str
+    passed: bool
+    reason: str
+    latency_sec: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    requests: int = 0
+    tool_calls: List[str] = field(default_factory=list)
+    error: bool = False
+
+
+class ResultStore:
+    """Append-only JSONL file of case results, so an interrupted evaluation resumes where it stopped.
+
+    Errored runs are kept in memory for this session's report but not saved,
+    so a resumed evaluation runs those cases again.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self._path = path
+        self.results: List[CaseResult] = []
+        self.errors: List[CaseResult] = []
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.results.append(CaseResult(**json.loads(line)))
+        self._done = {(r.model, r.case_id) for r in self.results}
+
+    def is_done(self, model: str, case_id: str) -> bool:
+        return (model, case_id) in self._done
+
+    def add(self, result: CaseResult) -> None:
+        if result.error:
+            self.errors.append(result)
+            return
+        self.results.append(result)
+        self._done.add((result.model, result.case_id))
+        if self._path:
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(result)) + "\n")
+
+    def for_model(self, model: str) -> List[CaseResult]:
+        return [r for r in self.results if r.model == model]
+
+    def errors_for_model(self, model: str) -> List[CaseResult]:
+        return [r for r in self.errors if r.model == model]
+
+
+############################################################
+# Runner
+############################################################
+
+async def run_case(robot_agent, model: str, case: EvalCase) -> CaseResult:
+    start = time.perf_counter()
+    try:
+        result = await robot_agent.agent.run(case.instruction)
+    except Exception as e:
+        return CaseResult(model, case.id, False, f"{type(e).__name__}: {e}", time.perf_counter() - start, error=True)
+    latency = time.perf_counter() - start
+
+    tool_calls = parse_tool_calls_from_response(result.all_messages())
+    passed, reason = score_tool_calls(case, tool_calls)
+    usage = result.usage
+    return CaseResult(
+        model, case.id, passed, reason, latency,
+        input_tokens=usage.input_tokens or 0,
+        output_tokens=usage.output_tokens or 0,
+        requests=usage.requests,
+        tool_calls=[call.tool_name for call in tool_calls],
+    )
+
+
+async def evaluate_model(
+    settings: Settings,
+    model: str,
+    cases: Sequence[EvalCase],
+    store: ResultStore,
+    concurrency: int = 4,
+) -> float:
+    """Run the cases not yet in ``store`` against ``model``; returns the wall time in seconds."""
+    # Only the model is evaluated: no fast path, plan cache or routing in front of it
+    robot_agent = build_agent(settings.model_copy(update={
+        "MODEL": model, "MODEL_TIERS": [], "FAST_PATH": False, "PLAN_CACHE": False, "SPECULATIVE_EXECUTION": False,
+        "ROBOT_STATE_CONTEXT": False, "HEDGING": False, "TOOL_FILTER": False,
+    }))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(case: EvalCase) -> None:
+        async with semaphore:
+            result = await run_case(robot_agent, model, case)
+        store.add(result)
+        status = "ERR " if result.error else ("ok  " if result.passed else "FAIL")
+        print(f"[Eval] {model} {status} {case.id} ({format_seconds(result.latency_sec)}) {result.reason}")
+
+    pending = [case for case in cases if not store.is_done(model, case.id)]
+    if len(pending) < len(cases):
+        print(f"[Eval] {model}: resuming, {len(cases) - len(pending)} of {len(cases)} cases already done")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(case) for case in pending))
+    return time.perf_counter() - start if pending else 0.0
+
+
+def summarize(model: str, results: Sequence[CaseResult], wall_sec: float, new_cases: int, errors: int = 0) -> Dict[str, Any]:
+    """Accuracy and cost over the answered cases; ``errors`` counts runs that raised, which are not scored."""
+    latency = LatencyStats(max_samples=max(1, len(results)))
+    for r in results:
+        latency.add(r.latency_sec)
+    passed = sum(1 for r in results if r.passed)
+    return {
+        "model": model,
+        "cases": len(results),
+        "accuracy": passed / len(results) if results else None,
+        "errors": errors,
+        "latency_p50": latency.percentile(50),
+        "latency_p95": latency.percentile(95),
+        "input_tokens": sum(r.input_tokens for r in results),
+        "output_tokens": sum(r.output_tokens for r in results),
+        "tool_calls_per_case": sum(len(r.tool_calls) for r in results) / len(results) if results else None,
+        "throughput": new_cases / wall_sec if wall_sec > 0 else None,  # cases per second in this session
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    accuracy = "-" if summary["accuracy"] is None else f"{summary['accuracy']:.0%}"
+    throughput = "-" if summary["throughput"] is None else f"{summary['throughput']:.2f} cases/s"
+    tool_calls = "-" if summary["tool_calls_per_case"] is None else f"{summary['tool_calls_per_case']:.2f}"
+    return (
+        f"{summary['model']}: accuracy {accuracy} of {summary['cases']}, "
+        f"latency p50={format_seconds(summary['latency_p50'])} p95={format_seconds(summary['latency_p95'])}, "
+        f"tokens in={summary['input_tokens']} out={summary['output_tokens']}, {tool_calls} tool calls/case, {throughput}"
+        + (f", {summary['errors']} errored (not scored, rerun on resume)" if summary.get("errors") else "")
+    )
@@ -0,0 +1,227 @@
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic_ai import FunctionToolset, ModelRetry
+from pydantic_ai.messages import ModelMessage
+
+from direct_execution import DirectRunResult, ToolCall, build_turn_messages, execute_tool_calls, get_direct_tool
+from metrics import LatencyStats, format_seconds
+
+
+# Words that may appear in a simple command without changing its meaning
+_FILLER_WORDS = {
+    "please", "robot", "now", "the", "a", "an", "for", "by", "to", "of", "your", "you", "is", "are", "what",
+    "whats", "current", "currently", "can", "could", "would", "me", "tell", "do", "in", "place", "about",
+}
+
+# Words that mean the instruction has more than one step
+_SEQUENCE_WORDS = {"then", "and", "after", "afterwards", "before", "next", "finally", "while", "until", "twice", "again"}
+
+# Unit words accepted after a number, keyed by a substring of the parameter name
+_UNIT_WORDS = {
+    "sec": {"s", "sec", "secs", "second", "seconds"},
+    "deg": {"deg", "degree", "degrees", "°"},
+    "angle": {"deg", "degree", "degrees", "°"},
+    "step": {"step", "steps"},
+}
+
+_TOKEN_RE = re.compile(r"-?\d+(?:\.\d+)?|[a-z]+|°|[,;]")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower().replace("'", ""))
+
+
+def _is_number(token: str) -> bool:
+    return bool(re.fullmatch(r"-?\d+(?:\.\d+)?", token))
+
+
+############################################################
+# Grammar
+############################################################
+
+class _ToolGrammar:
+    """Command grammar for one tool, generated from its JSON schema and fast-path metadata."""
+
+    def __init__(self, name: str, json_schema: Dict[str, Any], options: Dict[str, Any]) -> None:
+        self.name = name
+        self.reply = options.get("reply")
+        self.phrases = [_tokenize(p) for p in options.get("phrases", [" ".join(name.split("_"))])]
+
+        properties = json_schema.get("properties", {})
+        required = set(json_schema.get("required", []))
+
+        self.enum_params: Dict[str, List[str]] = {}
+        self.number_params: Dict[str, str] = {}  # name -> "number" | "integer"
+        self.required = required
+        self.units: Set[str] = set()
+
+        for param, schema in properties.items():
+            if "enum" in schema:
+                self.enum_params[param] = [str(v).lower() for v in schema["enum"]]
+            elif schema.get("type") in ("number", "integer"):
+                self.number_params[param] = schema["type"]
+                for key, words in _UNIT_WORDS.items():
+                    if key in param:
+                        self.units |= words
+            elif param in required:
+                raise ValueError(f"Unsupported parameter type for '{param}'")
+
+        # Words that set the sign of a numeric parameter, e.g. "left" -> +1 for rotate(angle)
+        self.signs: Dict[str, Dict[str, float]] = {
+            param: {word.lower(): float(sign) for word, sign in words.items()}
+            for param, words in options.get("signs", {}).items()
+            if param in self.number_params
+        }
+
+    def _find_phrase(self, tokens: List[str]) -> Optional[Tuple[int, int]]:
+        for phrase in self.phrases:
+            n = len(phrase)
+            for i in range(len(tokens) - n + 1):
+                if tokens[i:i + n] == phrase:
+                    return i, i + n
+        return None
+
+    def match(self, tokens: List[str]) -> Optional[Dict[str, Any]]:
+        span = self._find_phrase(tokens)
+        if span is None:
+            return None
+        rest = tokens[:span[0]] + tokens[span[1]:]
+
+        args: Dict[str, Any] = {}
+        numbers: List[str] = []
+        sign_words: Dict[str, List[float]] = {}
+
+        for token in rest:
+            if _is_number(token):
+                numbers.append(token)
+                continue
+
+            enum_hits = [p for p, values in self.enum_params.items() if token in values]
+            sign_hits = [p for p, words in self.signs.items() if token in words]
+            if len(enum_hits) + len(sign_hits) > 1:
+                return None  # a word that could fill several parameters is ambiguous
+            if enum_hits:
+                if enum_hits[0] in args:
+                    return None
+                args[enum_hits[0]] = token
+            elif sign_hits:
+                sign_words.setdefault(sign_hits[0], []).append(self.signs[sign_hits[0]][token])
+            elif token not in self.units and token not in _FILLER_WORDS:
+                return None  # unknown word, let the model interpret it
+
+        # Numbers are only unambiguous when the tool has exactly one numeric parameter
+        if len(numbers) > 1 or (numbers and len(self.number_params) != 1):
+            return None
+        if numbers:
+            param = next(iter(self.number_params))
+            value = float(numbers[0])
+            if self.number_params[param] == "integer":
+                if not value.is_integer():
+                    return None
+                value = int(value)
+            signs = sign_words.get(param, [])
+            if len(signs) > 1:
+                return None
+            if signs:
+                value = abs(value) * signs[0]
+            args[param] = value
+        elif sign_words:
+            return None  # e.g. "turn left" without an angle
+
+        if not self.required.issubset(args):
+            return None
+        return args
+
+
+############################################################
+# Fast path
+############################################################
+
+class FastPath:
+    """Runs unambiguous single-step commands on the robot toolset without calling the model.
+
+    The grammar is generated from the registered tool signatures: the tool name
+    (or ``phrases`` from ``toolset.metadata["fast_path"]``) triggers the tool,
+    ``Literal`` values fill enum parameters and a single number fills the numeric
+    parameter. Anything the grammar does not fully account for falls through to
+    the agent.
+    """
+
+    def __init__(self, toolset: FunctionToolset, system_prompt: Optional[str] = None) -> None:
+        self._toolset = toolset
+        self._system_prompt = system_prompt
+        options = getattr(toolset, "metadata", None) or {}
+        options = options.get("fast_path", {})
+
+        self._grammars: List[_ToolGrammar] = []
+        for name, tool in toolset.tools.items():
+            if get_direct_tool(toolset, name) is None:
+                continue
+            try:
+                self._grammars.append(_ToolGrammar(name, tool.function_schema.json_schema, options.get(name, {})))
+            except ValueError:
+                continue
+
+        self.hits = 0
+        self.misses = 0
+        self.hit_latency = LatencyStats()
+        self.miss_latency = LatencyStats()
+
+    def parse(self, text: str) -> Optional[ToolCall]:
+        tokens = _tokenize(text)
+        if not tokens or any(t in _SEQUENCE_WORDS or t in {",", ";"} for t in tokens):
+            return None
+
+        matches = []
+        for grammar in self._grammars:
+            args = grammar.match(tokens)
+            if args is not None:
+                matches.append((grammar, args))
+
+        if len(matches) != 1:
+            return None
+        grammar, args = matches[0]
+        return grammar.name, args
+
+    def _reply(self, name: str, result: Any) -> str:
+        grammar = next(g for g in self._grammars if g.name == name)
+        if grammar.reply:
+            return grammar.reply.format(result=result)
+        return "Done." if result is None else str(result)
+
+    def try_run(self, prompt: str, history: Optional[List[ModelMessage]] = None) -> Optional[DirectRunResult]:
+        """Execute ``prompt`` directly if it is a simple command, otherwise return None."""
+        started = time.perf_counter()
+        call = self.parse(prompt)
+        if call is None:
+            self.misses += 1
+            self.miss_latency.add(time.perf_counter() - started)
+            return None
+
+        print(f"[FastPath] {call[0]}({call[1]})")
+        try:
+            results = execute_tool_calls(self._toolset, [call])
+        except ModelRetry as e:
+            # Let the model deal with the failure, it can explain or try something else
+            print(f"[FastPath] Tool failed, falling back to the agent: {e}")
+            self.misses += 1
+            self.miss_latency.add(time.perf_counter() - started)
+            return None
+
+        reply = self._reply(call[0], results[0])
+        messages = build_turn_messages(prompt, [call], results, reply, history, self._system_prompt)
+
+        self.hits += 1
+        self.hit_latency.add(time.perf_counter() - started)
+        return DirectRunResult(reply, messages)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"Fast path: {self.hits}/{total} turns ({rate:.0%}), "
+            f"hit p50={format_seconds(self.hit_latency.percentile(50))} p95={format_seconds(self.hit_latency.percentile(95))}, "
+            f"miss overhead p50={format_seconds(self.miss_latency.percentile(50))}"
+        )
@@ -6,7 +6,16 @@ from pydantic_ai.common_tools.duckduckgo import duckduckgo_search_tool
 from datetime import datetime
 
 toolset = FunctionToolset()
-
+toolset.metadata = {}
+# Words that make a group of tools relevant to an instruction (see tool_filter.py)
+toolset.metadata["tool_groups"] = {
+    "web": {
+        "tools": ["duckduckgo_search"],
+        "words": ["search", "web", "internet", "online", "news", "weather", "who", "wikipedia", "google", "latest", "price", "look up"],
+    },
+    "time": {"tools": ["get_date_and_time"], "words": ["time", "date", "day", "today", "tomorrow", "yesterday", "clock", "year", "month", "hour"]},
+    "location": {"tools": ["get_current_location"], "words": ["where", "location", "city", "country", "address", "weather"]},
+}
 
 toolset.add_tool(duckduckgo_search_tool())
 
@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import KnownModelName, Model, ModelRequestParameters, StreamedResponse, infer_model
+from pydantic_ai.profiles import ModelProfile
+from pydantic_ai.settings import ModelSettings
+
+from metrics import LatencyStats, format_seconds
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedges: int = 0  # duplicate requests sent to the backup model
+    backup_wins: int = 0  # hedges whose answer was used
+    budget_denied: int = 0  # slow requests that could not hedge because of the rate cap
+    errors: int = 0
+    latency: LatencyStats = field(default_factory=LatencyStats)  # as seen by the agent
+    primary_latency: LatencyStats = field(default_factory=LatencyStats)  # for the adaptive hedge delay
+
+
+@dataclass(init=False)
+class HedgedModel(Model):
+    """Sends a duplicate request to a backup model when the primary is slow, and uses whichever answers first.
+
+    The hedge goes out ``hedge_delay_sec`` after the primary request, or after the
+    primary's ``hedge_percentile`` latency once ``min_samples`` requests were
+    measured. The loser is cancelled. At most ``max_hedge_rate`` of the last
+    ``budget_window`` requests may hedge, so a provider outage cannot double the
+    traffic. A primary that fails early is hedged right away, and a request
+    that fails is answered by the other one if it is still running. Streamed
+    requests hedge on the time until the stream opens.
+    """
+
+    primary: Model
+    backup: Model
+    stats: HedgeStats
+
+    def __init__(
+        self,
+        primary: Model | KnownModelName | str,
+        backup: Model | KnownModelName | str,
+        hedge_delay_sec: float = 1.5,
+        hedge_percentile: Optional[float] = None,
+        min_samples: int = 20,
+        max_hedge_rate: float = 0.1,
+        budget_window: int = 100,
+    ) -> None:
+        super().__init__()
+        self.primary = infer_model(primary)
+        self.backup = infer_model(backup)
+        self.hedge_delay_sec = hedge_delay_sec
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.max_hedge_rate = max_hedge_rate
+        self.stats = HedgeStats()
+        self._window: deque = deque(maxlen=budget_window)  # True for requests that hedged
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return f"hedged:{self.primary.model_name},{self.backup.model_name}"
+
+    @property
+    def system(self) -> str:
+        return f"hedged:{self.primary.system},{self.backup.system}"
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self.primary.base_url
+
+    @cached_property
+    def profile(self) -> ModelProfile:
+        raise NotImplementedError("HedgedModel does not have its own model profile.")
+
+    def customize_request_parameters(self, model_request_parameters: ModelRequestParameters) -> ModelRequestParameters:
+        return model_request_parameters
+
+    def prepare_request(
+        self, model_settings: Optional[ModelSettings], model_request_parameters: ModelRequestParameters
+    ) -> tuple[Optional[ModelSettings], ModelRequestParameters]:
+        return model_settings, model_request_parameters
+
+    def prepare_messages(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        return messages
+
+    # ------------------------------------------------------------------
+
+    def hedge_delay(self) -> float:
+        if self.hedge_percentile is not None and self.stats.primary_latency.count >= self.min_samples:
+            return self.stats.primary_latency.percentile(self.hedge_percentile)
+        return self.hedge_delay_sec
+
+    def _take_budget(self) -> bool:
+        """Claim a hedge for the current request if the rate cap allows it."""
+        with self._stats_lock:
+            window = self._window
+            # Against the whole window, so the first requests after startup can hedge too
+            if sum(window) + 1 > self.max_hedge_rate * window.maxlen:
+                self.stats.budget_denied += 1
+                return False
+            window[-1] = True
+            self.stats.hedges += 1
+            return True
+
+    def _record_primary(self, task: asyncio.Future, started: float) -> None:
+        """Primary latency for the adaptive delay from primary requests that finished; see ``_race`` for hedged ones."""
+        if not task.cancelled() and task.exception() is None:
+            with self._stats_lock:
+                self.stats.primary_latency.add(time.perf_counter() - started)
+
+    async def _race(
+        self,
+        start: Callable[[Model], Awaitable[Any]],
+        on_lost: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Tuple[Any, bool]:
+        """Run ``start(primary)``, hedge with ``start(backup)`` if it is slow; returns (result, backup won)."""
+        with self._stats_lock:
+            self.stats.requests += 1
+            self._window.append(False)
+        started = time.perf_counter()
+
+        primary = asyncio.ensure_future(start(self.primary))
+        primary.add_done_callback(lambda task: self._record_primary(task, started))
+        tasks = {primary: False}
+        winner: Optional[asyncio.Future] = None
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait([primary], timeout=self.hedge_delay())
+            if (not done or primary.exception() is not None) and self._take_budget():
+                tasks[asyncio.ensure_future(start(self.backup))] = True
+
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        break
+                    error = task.exception()
+            if winner is None:
+                with self._stats_lock:
+                    self.stats.errors += 1
+                raise error
+        finally:
+            if winner is not None and winner is not primary and not primary.done():
+                # Cancelled for the backup's answer: a censored sample, the primary would have taken at least this long.
+                # Dropping it would leave out exactly the slow tail and shrink the adaptive delay.
+                with self._stats_lock:
+                    self.stats.primary_latency.add(time.perf_counter() - started)
+            # Also runs when the caller is cancelled, e.g. during the hedge delay
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    with suppress(asyncio.CancelledError, Exception):
+                        await task
+            # A loser that also finished holds resources (an open stream) until released
+            for task in tasks:
+                if on_lost and task is not winner and task.done() and not task.cancelled() and task.exception() is None:
+                    await on_lost(task.result())
+
+        backup_won = tasks[winner]
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats.latency.add(elapsed)
+            if backup_won:
+                self.stats.backup_wins += 1
+        return winner.result(), backup_won
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        async def start(model: Model) -> ModelResponse:
+            model.prepare_request(model_settings, model_request_parameters)
+            return await model.request(model.prepare_messages(messages), model_settings, model_request_parameters)
+
+        response, _ = await self._race(start)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+        run_context: Optional[RunContext[Any]] = None,
+    ) -> AsyncGenerator[StreamedResponse]:
+        async def start(model: Model) -> Tuple[AsyncExitStack, StreamedResponse]:
+            stack = AsyncExitStack()
+            try:
+                model.prepare_request(model_settings, model_request_parameters)
+                response = await stack.enter_async_context(
+                    model.request_stream(model.prepare_messages(messages), model_settings, model_request_parameters, run_context)
+                )
+            except BaseException:
+                await stack.aclose()
+                raise
+            return stack, response
+
+        async def release(opened: Tuple[AsyncExitStack, StreamedResponse]) -> None:
+            await opened[0].aclose()
+
+        (stack, response), _ = await self._race(start, release)
+        async with stack:
+            yield response
+
+    # ------------------------------------------------------------------
+
+    def summary(self) -> str:
+        with self._stats_lock:
+            s = self.stats
+            rate = s.hedges / s.requests if s.requests else 0.0
+            return (
+                f"Hedging {self.primary.model_name} -> {self.backup.model_name}: {s.requests} requests, "
+                f"hedge_rate={rate:.0%} backup_wins={s.backup_wins} budget_denied={s.budget_denied} errors={s.errors}, "
+                f"p50={format_seconds(s.latency.percentile(50))} p99={format_seconds(s.latency.percentile(99))}"
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            s = self.stats
+            return {
+                "requests": s.requests,
+                "hedges": s.hedges,
+                "backup_wins": s.backup_wins,
+                "budget_denied": s.budget_denied,
+                "errors": s.errors,
+                "hedge_delay": self.hedge_delay(),
+                "latency": s.latency.snapshot(),
+            }
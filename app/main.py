@@ -1,4 +1,9 @@
-import agent
+from pydantic_ai import FunctionToolset
+
+from agent import build_agent
+from config import settings
+from session_store import SessionStore
+from robots.stop_channel import MotionStopped, stop_channel
 # import logfire
 
 # logfire.configure()
@@ -10,8 +15,17 @@ def main():
     Main chat loop to interact with the robot agent.
     """
     
+    robot_agent = build_agent(settings, toolsets=[chat_toolset])
+    if settings.PROMPT_WARM_UP:
+        robot_agent.warm_up() # Connect to the provider and prime its prompt cache while the user reads the prompt
+
+    # Resume the stored conversation, if any
+    session_store = SessionStore(settings.SESSION_STORE_PATH, keep_images=settings.SESSION_KEEP_IMAGES) if settings.SESSION_STORE else None
+    messages = session_store.load(settings.SESSION_ID) if session_store else None
+    if messages:
+        print(f"Resumed session '{settings.SESSION_ID}' ({len(messages)} messages).")
+
     print("Chat with the robot agent. Type 'exit' to quit.")
-    messages = None
     while True:
         try:
             user_input = input("USER: ").strip()
@@ -24,17 +38,31 @@ def main():
         if user_input.lower() in {"exit", "quit", "q"}: # Exit commands
             break
 
+        stop_channel.clear() # A new instruction re-arms the robot after an emergency stop
         try:
-            result = agent.agent.run_sync(user_input, message_history=messages) # Run agent with the user input and the conversation history
+            result = robot_agent.run_sync(user_input, message_history=messages) # Run agent with the user input and the conversation history
             print(f"AGENT: {result.output}") # Print the agent's response
             messages = result.all_messages() # Keep the conversation history
+            if session_store:
+                session_store.sync(settings.SESSION_ID, messages) # Only the new turn is written
+        except KeyboardInterrupt: # Ctrl+C during a turn stops the robot instead of quitting
+            latency = stop_channel.trigger("Ctrl+C")
+            print(f"\nRobot stopped ({latency * 1000.0:.1f}ms).")
+        except MotionStopped as e:
+            print(f"AGENT: {e}")
         except Exception as e:
             print(f"Error: {e}")
 
+    for line in robot_agent.summaries():
+        print(line)
+
     print("Goodbye!")
 
 
-@agent.agent.tool_plain
+chat_toolset = FunctionToolset()
+
+
+@chat_toolset.tool_plain
 def inform_user(message: str) -> None:
     """
     Inform the user of what is going to happen before executing a robot action.
@@ -42,6 +70,5 @@ def inform_user(message: str) -> None:
     print(f"AGENT: {message}")
 
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyStats:
+    """Thread-safe rolling latency statistics (seconds) over the last ``max_samples`` measurements."""
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self._count = 0
+        self._total = 0.0
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(float(seconds))
+            self._count += 1
+            self._total += float(seconds)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> Optional[float]:
+        with self._lock:
+            return self._total / self._count if self._count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile, ``p`` in [0, 100]."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * len(samples)))
+        return samples[rank - 1]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.percentile(100),
+        }
+
+
+def format_seconds(value: Optional[float]) -> str:
+    """Format a duration for log lines, ``-`` when unknown."""
+    if value is None:
+        return "-"
+    if value < 1.0:
+        return f"{value * 1000.0:.1f}ms"
+    return f"{value:.2f}s"
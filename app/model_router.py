@@ -0,0 +1,259 @@
+import re
+import threading
+import time
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic_ai import RunContext
+from pydantic_ai.exceptions import ModelAPIError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, RetryPromptPart
+from pydantic_ai.models import KnownModelName, Model, ModelRequestParameters, StreamedResponse, infer_model
+from pydantic_ai.profiles import ModelProfile
+from pydantic_ai.settings import ModelSettings
+
+from metrics import LatencyStats, format_seconds
+from robot_state import prompt_parts
+
+
+############################################################
+# Turn classification
+############################################################
+
+_STEP_SEPARATORS = re.compile(r"\b(then|after that|afterwards|next|finally|and)\b|[,;]")
+_PLANNING_WORDS = re.compile(
+    r"\b(plan|explore|find|search|look for|go to|navigate|patrol|until|around|figure out)\b"
+)
+
+
+def classify_turn(prompt: str) -> int:
+    """Cheap heuristic complexity level of a user instruction.
+
+    0 = single action or small talk, 1 = a short sequence of steps, 2 = planning or open-ended reasoning.
+    """
+    text = prompt.lower()
+    steps = len(_STEP_SEPARATORS.findall(text))
+
+    if _PLANNING_WORDS.search(text) or steps >= 3 or len(text.split()) > 40:
+        return 2
+    if steps >= 1:
+        return 1
+    return 0
+
+
+def _current_turn(messages: List[ModelMessage]) -> List[ModelMessage]:
+    """Messages from the latest user prompt onwards."""
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        if prompt_parts(msg):
+            return messages[i:]
+    return messages
+
+
+def _prompt_text(request: ModelRequest) -> str:
+    texts = []
+    for part in prompt_parts(request):
+        content = part.content
+        texts.append(content if isinstance(content, str) else " ".join(c for c in content if isinstance(c, str)))
+    return " ".join(texts)
+
+
+############################################################
+# Routing model
+############################################################
+
+@dataclass
+class TierStats:
+    requests: int = 0
+    turns: int = 0  # turns that started on this tier
+    escalations: int = 0  # requests handed up to the next tier
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    latency: LatencyStats = field(default_factory=LatencyStats)
+
+
+@dataclass(init=False)
+class RoutingModel(Model):
+    """Routes each turn to a tier of models ordered from cheapest to strongest.
+
+    The starting tier comes from ``classifier`` applied to the user prompt. Within a
+    turn, every retry prompt (a tool raising ``ModelRetry`` or failed output
+    validation) escalates the next request by one tier, and provider errors fall
+    through to the next tier immediately. The tier is derived from the message
+    history alone, so concurrent runs can share one instance.
+    """
+
+    models: List[Model]
+    stats: List[TierStats]
+
+    def __init__(
+        self,
+        *models: Model | KnownModelName | str,
+        classifier: Callable[[str], int] = classify_turn,
+    ) -> None:
+        super().__init__()
+        if not models:
+            raise ValueError("RoutingModel needs at least one model.")
+        self.models = [infer_model(m) for m in models]
+        self.stats = [TierStats() for _ in self.models]
+        self._classifier = classifier
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return f'routing:{",".join(model.model_name for model in self.models)}'
+
+    @property
+    def system(self) -> str:
+        return f'routing:{",".join(model.system for model in self.models)}'
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self.models[0].base_url
+
+    @cached_property
+    def profile(self) -> ModelProfile:
+        raise NotImplementedError("RoutingModel does not have its own model profile.")
+
+    def customize_request_parameters(self, model_request_parameters: ModelRequestParameters) -> ModelRequestParameters:
+        return model_request_parameters
+
+    def prepare_request(
+        self, model_settings: Optional[ModelSettings], model_request_parameters: ModelRequestParameters
+    ) -> tuple[Optional[ModelSettings], ModelRequestParameters]:
+        return model_settings, model_request_parameters
+
+    def prepare_messages(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        return messages
+
+    def select_tier(self, messages: List[ModelMessage]) -> int:
+        turn = _current_turn(messages)
+        level = self._classifier(_prompt_text(turn[0])) if turn and isinstance(turn[0], ModelRequest) else 0
+        retries = sum(
+            1 for msg in turn if isinstance(msg, ModelRequest) for p in msg.parts if isinstance(p, RetryPromptPart)
+        )
+        top = len(self.models) - 1
+        tier = min(level + retries, top)
+
+        # Count the escalation once, on the request that follows the new retry prompt
+        last = messages[-1] if messages else None
+        if isinstance(last, ModelRequest) and any(isinstance(p, RetryPromptPart) for p in last.parts):
+            previous = min(level + retries - 1, top)
+            if tier > previous:
+                with self._stats_lock:
+                    self.stats[previous].escalations += 1
+        return tier
+
+    def _is_turn_start(self, messages: List[ModelMessage]) -> bool:
+        return len(_current_turn(messages)) == 1
+
+    def _record(self, tier: int, started: float, response: Optional[ModelResponse], turn_start: bool) -> None:
+        with self._stats_lock:
+            stats = self.stats[tier]
+            stats.latency.add(time.perf_counter() - started)
+            stats.requests += 1
+            if turn_start:
+                stats.turns += 1
+            if response is None:
+                stats.errors += 1
+                return
+            stats.input_tokens += response.usage.input_tokens
+            stats.output_tokens += response.usage.output_tokens
+            try:
+                stats.cost += float(response.cost().total_price)
+            except Exception:
+                pass  # price unknown for this model
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        turn_start = self._is_turn_start(messages)
+        tier = self.select_tier(messages)
+
+        while True:
+            model = self.models[tier]
+            started = time.perf_counter()
+            try:
+                model.prepare_request(model_settings, model_request_parameters)
+                response = await model.request(model.prepare_messages(messages), model_settings, model_request_parameters)
+            except ModelAPIError:
+                self._record(tier, started, None, turn_start)
+                if tier == len(self.models) - 1:
+                    raise
+                with self._stats_lock:
+                    self.stats[tier].escalations += 1
+                tier += 1
+                continue
+
+            self._record(tier, started, response, turn_start)
+            return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+        run_context: Optional[RunContext[Any]] = None,
+    ) -> AsyncGenerator[StreamedResponse]:
+        turn_start = self._is_turn_start(messages)
+        tier = self.select_tier(messages)
+
+        while True:
+            model = self.models[tier]
+            started = time.perf_counter()
+            async with AsyncExitStack() as stack:
+                try:
+                    model.prepare_request(model_settings, model_request_parameters)
+                    response = await stack.enter_async_context(
+                        model.request_stream(model.prepare_messages(messages), model_settings, model_request_parameters, run_context)
+                    )
+                except ModelAPIError:
+                    self._record(tier, started, None, turn_start)
+                    if tier == len(self.models) - 1:
+                        raise
+                    with self._stats_lock:
+                        self.stats[tier].escalations += 1
+                    tier += 1
+                    continue
+
+                yield response
+                self._record(tier, started, response.get(), turn_start)
+                return
+
+    def summary(self) -> str:
+        """One line per tier with traffic, latency, cost and escalation rate."""
+        lines = []
+        with self._stats_lock:
+            for model, stats in zip(self.models, self.stats):
+                rate = stats.escalations / stats.requests if stats.requests else 0.0
+                lines.append(
+                    f"{model.model_name}: turns={stats.turns} requests={stats.requests} errors={stats.errors} "
+                    f"escalation_rate={rate:.0%} p50={format_seconds(stats.latency.percentile(50))} "
+                    f"p95={format_seconds(stats.latency.percentile(95))} tokens={stats.input_tokens}/{stats.output_tokens} "
+                    f"cost=${stats.cost:.4f}"
+                )
+        return "\n".join(lines)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            return {
+                model.model_name: {
+                    "turns": stats.turns,
+                    "requests": stats.requests,
+                    "escalations": stats.escalations,
+                    "errors": stats.errors,
+                    "input_tokens": stats.input_tokens,
+                    "output_tokens": stats.output_tokens,
+                    "cost": stats.cost,
+                    "latency": stats.latency.snapshot(),
+                }
+                for model, stats in zip(self.models, self.stats)
+            }
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from pydantic_ai import FunctionToolset, ModelRetry
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, RetryPromptPart, ToolReturnPart
+
+from direct_execution import DirectRunResult, ToolCall, build_turn_messages, execute_tool_calls, get_direct_tool
+
+
+_UNIT_ALIASES = {
+    "s": "s", "sec": "s", "secs": "s", "second": "s", "seconds": "s",
+    "deg": "deg", "degree": "deg", "degrees": "deg", "°": "deg",
+    "m": "m", "meter": "m", "meters": "m", "metre": "m", "metres": "m",
+}
+_DROP_WORDS = {"please", "robot", "the", "a", "an", "now"}
+_TOKEN_RE = re.compile(r"-?\d+(?:\.\d+)?|[a-z]+|°")
+# Instructions that refer back to the conversation mean something else in every history
+_CONTEXT_WORDS = {
+    "again", "back", "it", "that", "this", "there", "same", "other", "opposite", "previous", "last",
+    "more", "undo", "repeat", "before", "earlier", "instead", "those", "them",
+}
+
+
+def normalize_instruction(text: str) -> str:
+    """Canonical form of an instruction: lowercase, no punctuation or filler, unified units.
+
+    ``"Patrol: forward 4s, turn 180, forward 4 seconds."`` and
+    ``"patrol forward 4 sec turn 180 forward 4 s"`` normalize to the same key.
+    """
+    tokens = _TOKEN_RE.findall(text.lower().replace("'", ""))
+    out = []
+    for token in tokens:
+        if token in _DROP_WORDS:
+            continue
+        if re.fullmatch(r"-?\d+(?:\.\d+)?", token):
+            token = f"{float(token):g}"
+        out.append(_UNIT_ALIASES.get(token, token))
+    return " ".join(out)
+
+
+def refers_to_context(text: str) -> bool:
+    """True for instructions like "do it again" or "turn the other way" whose plan depends on the history."""
+    return any(token in _CONTEXT_WORDS for token in normalize_instruction(text).split())
+
+
+def toolset_schema_hash(toolset: FunctionToolset) -> str:
+    """Hash of every tool's name, description and argument schema."""
+    schema = [
+        [name, tool.description, tool.function_schema.json_schema]
+        for name, tool in sorted(toolset.tools.items())
+    ]
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class PlanCache:
+    """LRU cache of tool-call sequences from successful runs, persisted to a JSON file.
+
+    Entries are keyed by the normalized instruction, the robot toolset and a hash
+    of its tool schemas, so any change to the tools invalidates the cached plans.
+    Only runs that used robot tools exclusively, with no retries and no returned
+    values other than the reports the toolset declares in
+    ``metadata["cacheable_results"]`` (result types such as a robot's motion
+    outcome), are cached: replaying them cannot change what the model would
+    have decided. Replies to replayed plans with such reports are built from
+    the new reports, since the recorded answer quotes the headings and
+    distances of the original run. Instructions
+    that refer back to the conversation ("do it again", "go back") are neither
+    cached nor replayed, because the key holds no history.
+    """
+
+    def __init__(
+        self,
+        toolset: FunctionToolset,
+        toolset_id: str,
+        path: Optional[str] = None,
+        max_entries: int = 128,
+        system_prompt: Optional[str] = None,
+    ) -> None:
+        self._toolset = toolset
+        self._toolset_id = toolset_id
+        self._schema_hash = toolset_schema_hash(toolset)
+        self._cacheable_results = tuple((toolset.metadata or {}).get("cacheable_results", ()))
+        self._path = path
+        self._max_entries = max_entries
+        self._system_prompt = system_prompt
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Tools outside the robot toolset that may appear in a plan but are not replayed
+        self.ignored_tools: Set[str] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.contextual = 0  # lookups skipped because the instruction depends on the history
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _key(self, instruction: str) -> str:
+        return f"{self._toolset_id}:{self._schema_hash}:{normalize_instruction(instruction)}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[PlanCache] Ignoring unreadable cache file {self._path}: {e}")
+            return
+
+        for entry in data.get("entries", []):
+            # Plans recorded against an older version of this toolset are stale
+            if entry["toolset"] == self._toolset_id and entry["schema_hash"] != self._schema_hash:
+                self.invalidated += 1
+                continue
+            self._entries[entry["key"]] = entry
+        self._evict()
+        if self.invalidated:
+            self._save()
+
+    def _save(self) -> None:
+        if not self._path:
+            return
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": list(self._entries.values())}, f, indent=1)
+        os.replace(tmp_path, self._path)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+
+    def lookup(self, instruction: str) -> Optional[Dict[str, Any]]:
+        key = self._key(instruction)
+        with self._lock:
+            if refers_to_context(instruction):
+                self.contextual += 1
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def store(self, instruction: str, calls: List[ToolCall], output: str) -> None:
+        key = self._key(instruction)
+        with self._lock:
+            self._entries[key] = {
+                "key": key,
+                "toolset": self._toolset_id,
+                "schema_hash": self._schema_hash,
+                "instruction": instruction,
+                "calls": [[name, args] for name, args in calls],
+                "output": output,
+            }
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save()
+
+    def invalidate(self, instruction: str) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(instruction), None) is not None:
+                self._save()
+
+    def record_run(self, instruction: str, new_messages: List[ModelMessage], output: str) -> bool:
+        """Store the tool calls of a completed agent turn if the plan is safe to replay."""
+        if refers_to_context(instruction):
+            return False
+        calls: List[ToolCall] = []
+        for msg in new_messages:
+            if isinstance(msg, ModelResponse):
+                for call in msg.tool_calls:
+                    if call.tool_name in self.ignored_tools:
+                        continue
+                    if get_direct_tool(self._toolset, call.tool_name) is None:
+                        return False
+                    calls.append((call.tool_name, call.args_as_dict()))
+            elif isinstance(msg, ModelRequest):
+                for part in msg.parts:
+                    if isinstance(part, RetryPromptPart):
+                        return False
+                    if (
+                        isinstance(part, ToolReturnPart)
+                        and part.content is not None
+                        and not isinstance(part.content, self._cacheable_results)
+                        and part.tool_name not in self.ignored_tools
+                    ):
+                        return False
+
+        if not calls:
+            return False
+        self.store(instruction, calls, output)
+        return True
+
+    def try_run(self, prompt: str, history: Optional[List[ModelMessage]] = None) -> Optional[DirectRunResult]:
+        """Replay a cached plan for ``prompt`` without contacting the model."""
+        entry = self.lookup(prompt)
+        if entry is None:
+            return None
+
+        calls = [(name, args) for name, args in entry["calls"]]
+        print(f"[PlanCache] Replaying {len(calls)} cached tool calls")
+
+        results = []
+        for i, call in enumerate(calls):
+            try:
+                results.extend(execute_tool_calls(self._toolset, [call]))
+            except ModelRetry as e:
+                # The robot may be half way through the plan, so report instead of starting over
+                self.invalidate(prompt)
+                reply = f"I could not finish that, step {i + 1} failed: {e}"
+                return DirectRunResult(reply, build_turn_messages(prompt, calls[:i], results, reply, history, self._system_prompt))
+
+        outcomes = [str(result) for result in results if isinstance(result, self._cacheable_results)]
+        output = " ".join(outcomes) if outcomes else entry["output"]
+        return DirectRunResult(output, build_turn_messages(prompt, calls, results, output, history, self._system_prompt))
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Plan cache: {self.hits}/{total} hits ({rate:.0%}), {self.contextual} context-dependent, {len(self)} plans stored"
@@ -0,0 +1,181 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelRequest, SystemPromptPart, UserPromptPart
+from pydantic_ai.models import DEFAULT_HTTP_TIMEOUT, Model, ModelRequestParameters
+from pydantic_ai.providers import Provider, infer_provider, infer_provider_class
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.usage import RunUsage
+
+from metrics import LatencyStats, format_seconds
+
+
+WARM_UP_PROMPT = "Reply with OK."
+
+
+############################################################
+# Stable prefix
+############################################################
+
+def stable_tool_order(ctx: RunContext[Any], tool_defs: List[ToolDefinition]) -> List[ToolDefinition]:
+    """Send tool definitions sorted by name, so the request prefix is byte-identical across turns and restarts."""
+    return sorted(tool_defs, key=lambda tool_def: tool_def.name)
+
+
+def cache_model_settings(cache_key: str) -> Dict[str, Any]:
+    """Provider settings that turn on or route prefix caching; models ignore the keys of other providers.
+
+    OpenAI caches long prefixes automatically and uses the key to route requests
+    to the same cache; Anthropic needs explicit breakpoints after the system
+    prompt and the tool definitions, plus the moving one at the end of the
+    conversation.
+    """
+    return {
+        "openai_prompt_cache_key": cache_key,
+        "anthropic_cache_instructions": True,
+        "anthropic_cache_tool_definitions": True,
+        "anthropic_cache": True,
+    }
+
+
+############################################################
+# Connection pool
+############################################################
+
+def keepalive_provider_factory(keepalive_sec: float) -> Callable[[str], Provider[Any]]:
+    """Provider factory for ``infer_model`` whose HTTP pool keeps idle connections for ``keepalive_sec``.
+
+    httpx closes idle connections after 5 s by default, so a user who types for
+    longer than that pays the TCP and TLS handshake again on the next turn.
+    Providers that do not take an ``http_client`` get their default client.
+    """
+
+    def factory(name: str) -> Provider[Any]:
+        try:
+            provider_class = infer_provider_class(name)
+        except Exception:
+            return infer_provider(name)
+        if "http_client" not in inspect.signature(provider_class.__init__).parameters:
+            return infer_provider(name)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout=DEFAULT_HTTP_TIMEOUT, connect=5),
+            limits=httpx.Limits(keepalive_expiry=keepalive_sec),
+        )
+        try:
+            return provider_class(http_client=client)
+        except Exception:
+            return infer_provider(name)
+
+    return factory
+
+
+############################################################
+# Warm-up
+############################################################
+
+async def _warm_model(
+    model: Model, system_prompt: str, tool_defs: List[ToolDefinition], model_settings: ModelSettings
+) -> float:
+    messages = [ModelRequest(parts=[SystemPromptPart(system_prompt), UserPromptPart(WARM_UP_PROMPT)])]
+    parameters = ModelRequestParameters(function_tools=tool_defs, allow_text_output=True)
+    settings: ModelSettings = {**model_settings, "max_tokens": 16}
+    start = time.perf_counter()
+    model.prepare_request(settings, parameters)
+    await model.request(model.prepare_messages(messages), settings, parameters)  # tool calls in the answer are not executed
+    return time.perf_counter() - start
+
+
+def warm_up(
+    models: Sequence[Model], system_prompt: str, tool_lists: Sequence[List[ToolDefinition]], model_settings: ModelSettings
+) -> Dict[str, Optional[float]]:
+    """Send small requests per provider model with the agent's exact prefixes; returns seconds per model, None on failure.
+
+    The first request opens a pooled connection (DNS, TCP, TLS) and lets the
+    provider cache the system prompt with the first tool list; the other tool
+    lists (the prefixes the tool filter sends) follow concurrently. It runs on
+    the event loop ``Agent.run_sync`` uses, so the connections are reused by
+    the first turn.
+    """
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    async def warm(model: Model) -> float:
+        start = time.perf_counter()
+        await _warm_model(model, system_prompt, tool_lists[0], model_settings)
+        await asyncio.gather(*(_warm_model(model, system_prompt, tool_defs, model_settings) for tool_defs in tool_lists[1:]))
+        return time.perf_counter() - start
+
+    timings: Dict[str, Optional[float]] = {}
+    for model in models:
+        try:
+            timings[model.model_name] = loop.run_until_complete(warm(model))
+            prefixes = f" ({len(tool_lists)} tool lists)" if len(tool_lists) > 1 else ""
+            print(f"[PromptCache] Warmed up {model.model_name}{prefixes} in {format_seconds(timings[model.model_name])}")
+        except Exception as e:
+            timings[model.model_name] = None
+            print(f"[PromptCache] Warm-up of {model.model_name} failed: {e}")
+    return timings
+
+
+############################################################
+# Statistics
+############################################################
+
+class PromptCacheStats:
+    """Per-turn latency and provider cache usage, from the usage metadata of each model run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.first_turn_sec: Optional[float] = None
+        self.steady_latency = LatencyStats()  # turns after the first
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.turns_with_hits = 0
+
+    def record(self, usage: RunUsage, latency_sec: float) -> None:
+        with self._lock:
+            self.turns += 1
+            if self.turns == 1:
+                self.first_turn_sec = latency_sec
+            else:
+                self.steady_latency.add(latency_sec)
+            self.input_tokens += usage.input_tokens
+            self.cache_read_tokens += usage.cache_read_tokens
+            self.cache_write_tokens += usage.cache_write_tokens
+            self.turns_with_hits += usage.cache_read_tokens > 0
+        share = usage.cache_read_tokens / usage.input_tokens if usage.input_tokens else 0.0
+        print(
+            f"[PromptCache] {format_seconds(latency_sec)}, {usage.input_tokens} input tokens, "
+            f"{usage.cache_read_tokens} read from cache ({share:.0%}), {usage.cache_write_tokens} written"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "first_turn": self.first_turn_sec,
+                "steady_p50": self.steady_latency.percentile(50),
+                "input_tokens": self.input_tokens,
+                "cache_read_tokens": self.cache_read_tokens,
+                "cache_write_tokens": self.cache_write_tokens,
+                "turns_with_hits": self.turns_with_hits,
+            }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        share = s["cache_read_tokens"] / s["input_tokens"] if s["input_tokens"] else 0.0
+        return (
+            f"Prompt cache: {s['turns_with_hits']}/{s['turns']} turns hit, {share:.0%} of {s['input_tokens']} input tokens "
+            f"read from cache; first turn {format_seconds(s['first_turn'])}, then p50={format_seconds(s['steady_p50'])}"
+        )
@@ -0,0 +1,101 @@
+import dataclasses
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, UserPromptPart
+
+
+STATE_PREFIX = "[Robot state"
+
+# A state field returns its value already formatted for the model, or None while it is unknown
+StateField = Callable[[], Optional[str]]
+
+
+def is_state_part(part: Any) -> bool:
+    return isinstance(part, UserPromptPart) and isinstance(part.content, str) and part.content.startswith(STATE_PREFIX)
+
+
+def prompt_parts(message: ModelMessage) -> List[UserPromptPart]:
+    """User prompt parts of a request without the injected robot state; a request with any starts a turn."""
+    if not isinstance(message, ModelRequest):
+        return []
+    return [part for part in message.parts if isinstance(part, UserPromptPart) and not is_state_part(part)]
+
+
+class LastCommand:
+    """The most recent motion command of a robot module and how it ended, for the state context."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._text: Optional[str] = None
+        self._status = ""
+        self._ts = 0.0
+
+    def start(self, text: str) -> None:
+        with self._lock:
+            self._text, self._status, self._ts = text, "running", time.monotonic()
+
+    def finish(self, status: str = "done") -> None:
+        with self._lock:
+            if self._text is not None:
+                self._status, self._ts = status, time.monotonic()
+
+    def describe(self) -> Optional[str]:
+        with self._lock:
+            if self._text is None:
+                return None
+            return f"{self._text} ({self._status}, {time.monotonic() - self._ts:.1f}s ago)"
+
+
+class RobotStateContext:
+    """Appends a compact snapshot of the robot's cached state to every model request.
+
+    Robot modules expose their fields as ``toolset.metadata["state_fields"]``, a
+    mapping of field name to a callable that reads cached controller state (it
+    must not wait for the robot). ``include`` selects and orders a subset, all
+    fields by default. The snapshot is added as a user part at the end of each
+    request, so the model can act on the current heading without a
+    ``get_rotation`` round trip and the request prefix stays cacheable. Only the
+    newest snapshot is kept in the history; code that looks for the user's turns
+    skips it with ``prompt_parts``.
+    """
+
+    def __init__(self, fields: Dict[str, StateField], include: Sequence[str] = ()) -> None:
+        unknown = [name for name in include if name not in fields]
+        if unknown:
+            raise ValueError(f"Unknown robot state fields {unknown}, available: {sorted(fields)}")
+        self.fields = {name: fields[name] for name in (include or fields)}
+
+        self.injected = 0
+        self.errors = 0
+
+    def render(self) -> str:
+        values = []
+        for name, read in self.fields.items():
+            try:
+                value = read()
+            except Exception:
+                self.errors += 1
+                value = None
+            values.append(f"{name}={'unknown' if value is None else value}")
+        return f"{STATE_PREFIX} at {time.strftime('%H:%M:%S')}] " + ", ".join(values)
+
+    def inject(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        """History processor: add the current state to the request about to be sent."""
+        last = messages[-1] if messages else None
+        if not isinstance(last, ModelRequest) or any(is_state_part(part) for part in last.parts):
+            return messages
+
+        # Drop the snapshots of earlier requests; they are stale and would pile up in the history
+        history = [
+            dataclasses.replace(m, parts=[p for p in m.parts if not is_state_part(p)])
+            if isinstance(m, ModelRequest) and any(is_state_part(p) for p in m.parts) else m
+            for m in messages[:-1]
+        ]
+        self.injected += 1
+        state = UserPromptPart(content=self.render())
+        return [*history, dataclasses.replace(last, parts=[*last.parts, state])]
+
+    def summary(self) -> str:
+        return f"Robot state context: {len(self.fields)} fields injected into {self.injected} requests, {self.errors} read errors"
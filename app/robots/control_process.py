@@ -0,0 +1,331 @@
+import argparse
+import atexit
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import LatencyStats
+
+
+def command_data(x_vel: float, y_vel: float, yaw_vel: float, height: float) -> str:
+    """Payload of a rt/run_command/cmd message (the simulator expects y and yaw negated)."""
+    return str([float(x_vel), -float(y_vel), -float(yaw_vel), float(height)])
+
+
+############################################################
+# Shared memory layout
+############################################################
+
+class _SeqRegion:
+    """Fixed-layout record in shared memory guarded by a sequence lock.
+
+    Exactly one process writes a region. The writer makes the sequence number
+    odd while it updates the values, readers retry until they see the same even
+    number before and after reading, so they never observe a half-written record.
+    """
+
+    _SEQ = struct.Struct("<Q")
+
+    def __init__(self, buf: memoryview, offset: int, fmt: str) -> None:
+        self._buf = buf
+        self._offset = offset
+        self._values = struct.Struct("<" + fmt)
+        self.size = self._SEQ.size + self._values.size
+
+    def write(self, *values: float) -> None:
+        seq = self._SEQ.unpack_from(self._buf, self._offset)[0] + 1
+        self._SEQ.pack_into(self._buf, self._offset, seq)
+        self._values.pack_into(self._buf, self._offset + self._SEQ.size, *values)
+        self._SEQ.pack_into(self._buf, self._offset, seq + 1)
+
+    def read(self) -> Tuple[int, Tuple[float, ...]]:
+        while True:
+            before = self._SEQ.unpack_from(self._buf, self._offset)[0]
+            if before & 1:
+                continue
+            values = self._values.unpack_from(self._buf, self._offset + self._SEQ.size)
+            if self._SEQ.unpack_from(self._buf, self._offset)[0] == before:
+                return before, values
+
+
+class SharedControlBlock:
+    """Setpoints, IMU state and loop timing shared between the agent and the control process.
+
+    Layout: shutdown flag | setpoint (agent writes) | IMU state (lowstate callback
+    writes) | loop counters (control loop writes) | ring of recent loop periods.
+    """
+
+    RING_SIZE = 2048
+    _FLAG_SIZE = 8
+    _DOUBLE = struct.Struct("<d")
+
+    def __init__(self, shm: SharedMemory, owner: bool = False) -> None:
+        self._shm = shm
+        self._owner = owner
+        buf = shm.buf
+        offset = self._FLAG_SIZE
+        # x_vel, y_vel, yaw_vel, height, active, monotonic stamp
+        self.setpoint = _SeqRegion(buf, offset, "6d")
+        offset += self.setpoint.size
+        # quaternion xyzw, rpy, monotonic stamp
+        self.imu = _SeqRegion(buf, offset, "8d")
+        offset += self.imu.size
+        # loop count, publish count, last publish stamp
+        self.loop = _SeqRegion(buf, offset, "3d")
+        offset += self.loop.size
+        self._ring_offset = offset
+
+    @classmethod
+    def size(cls) -> int:
+        return cls._FLAG_SIZE + (8 + 6 * 8) + (8 + 8 * 8) + (8 + 3 * 8) + cls.RING_SIZE * 8
+
+    @classmethod
+    def create(cls) -> "SharedControlBlock":
+        shm = SharedMemory(create=True, size=cls.size())
+        shm.buf[:cls.size()] = bytes(cls.size())
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedControlBlock":
+        shm = SharedMemory(name=name)
+        # The creating process owns the segment, without this the attaching process would unlink it on exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # ------------------------------------------------------------------
+
+    @property
+    def shutdown(self) -> bool:
+        return self._shm.buf[0] != 0
+
+    def request_shutdown(self) -> None:
+        self._shm.buf[0] = 1
+
+    def record_period(self, index: int, period_sec: float) -> None:
+        self._DOUBLE.pack_into(self._shm.buf, self._ring_offset + (index % self.RING_SIZE) * 8, period_sec)
+
+    def periods(self) -> List[float]:
+        """Most recent loop periods in seconds, oldest first."""
+        _, (loops, _, _) = self.loop.read()
+        count = int(loops) - 1  # the first iteration has no period
+        start = max(1, count - self.RING_SIZE + 1)
+        return [
+            self._DOUBLE.unpack_from(self._shm.buf, self._ring_offset + (i % self.RING_SIZE) * 8)[0]
+            for i in range(start, count + 1)
+        ]
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+############################################################
+# Control loop
+############################################################
+
+class ControlLoop:
+    """Publishes the current velocity setpoint at a fixed rate on absolute deadlines.
+
+    An active setpoint is published every period. Once the agent deactivates it
+    a single zero-velocity command is sent and the loop only keeps time. A
+    setpoint that has not been refreshed for ``setpoint_timeout_sec`` is treated
+    as a stop, so the robot halts if the agent process hangs or dies mid-motion.
+    """
+
+    def __init__(
+        self,
+        block: SharedControlBlock,
+        rate_hz: float = 100.0,
+        publish: Optional[Callable[[str], None]] = None,
+        setpoint_timeout_sec: float = 0.5,
+    ) -> None:
+        self._block = block
+        self._period = 1.0 / rate_hz
+        self._publish = publish
+        self._setpoint_timeout_sec = setpoint_timeout_sec
+
+    def run(self) -> None:
+        parent = os.getppid()
+        loops, published, last_publish = 0, 0, 0.0
+        previous = None
+        was_active = False
+        deadline = time.monotonic()
+
+        while not self._block.shutdown and os.getppid() == parent:
+            now = time.monotonic()
+            if previous is not None:
+                self._block.record_period(loops, now - previous)
+            previous = now
+
+            _, (x_vel, y_vel, yaw_vel, height, active, stamp) = self._block.setpoint.read()
+            active = active > 0.0 and now - stamp <= self._setpoint_timeout_sec
+            if active or was_active:
+                if not active:
+                    x_vel = y_vel = yaw_vel = 0.0
+                if self._publish is not None:
+                    self._publish(command_data(x_vel, y_vel, yaw_vel, height))
+                published += 1
+                last_publish = now
+            was_active = active
+
+            loops += 1
+            self._block.loop.write(loops, published, last_publish)
+
+            deadline += self._period
+            delay = deadline - time.monotonic()
+            if delay > 0.0:
+                time.sleep(delay)
+            elif delay < -self._period:
+                deadline = time.monotonic()  # fell more than a period behind, do not try to catch up
+
+
+def run_control_process(
+    shm_name: str,
+    rate_hz: float,
+    domain_id: int,
+    topic: Optional[str],
+    lowstate_topic: Optional[str],
+    health_log_sec: float = 0.0,
+) -> None:
+    """Body of the control process: owns the DDS publisher and the lowstate subscriber."""
+    from robots.transport_health import transport_health
+
+    block = SharedControlBlock.attach(shm_name)
+    publish = None
+    subscriber = None
+
+    if topic is not None or lowstate_topic is not None:
+        from unitree_sdk2py.core.channel import ChannelFactoryInitialize, ChannelPublisher, ChannelSubscriber
+        from unitree_sdk2py.idl.std_msgs.msg.dds_ import String_
+        from unitree_sdk2py.idl.unitree_hg.msg.dds_ import LowState_
+
+        ChannelFactoryInitialize(domain_id)
+        if topic is not None:
+            publisher = ChannelPublisher(topic, String_)
+            publisher.Init()
+            write = transport_health.channel(topic).wrap_publish(publisher.Write)
+            publish = lambda data: write(String_(data=data))
+
+        if lowstate_topic is not None:
+            def on_lowstate(msg: LowState_) -> None:
+                imu = msg.imu_state
+                block.imu.write(*(float(v) for v in imu.quaternion), *(float(v) for v in imu.rpy), time.monotonic())
+
+            subscriber = ChannelSubscriber(lowstate_topic, LowState_)
+            subscriber.Init(transport_health.channel(lowstate_topic).wrap_callback(on_lowstate), 32)
+
+    # The agent process cannot query this process' channels, so they are only reported in the log
+    transport_health.start_logging(health_log_sec)
+    try:
+        ControlLoop(block, rate_hz, publish).run()
+    finally:
+        block.close()
+
+
+class ControlProcess:
+    """Agent-side handle of a control loop running in its own process.
+
+    The agent writes velocity setpoints and reads IMU state through a
+    ``SharedControlBlock``; nothing is pickled per command, and the control
+    loop's timing no longer depends on what the agent process is doing.
+    """
+
+    def __init__(
+        self,
+        rate_hz: float = 100.0,
+        domain_id: int = 1,
+        topic: Optional[str] = "rt/run_command/cmd",
+        lowstate_topic: Optional[str] = "rt/lowstate",
+        default_height: float = -0.5,
+        health_log_sec: float = 0.0,
+    ) -> None:
+        self.block = SharedControlBlock.create()
+        self._default_height = float(default_height)
+        self.block.setpoint.write(0.0, 0.0, 0.0, self._default_height, 0.0, time.monotonic())
+
+        # A fresh interpreter rather than multiprocessing: forking would copy the agent's DDS and HTTP
+        # client threads, and spawn would re-import the caller's __main__ (and with it the agent)
+        command = [sys.executable, "-m", "robots.control_process", self.block.name, "--rate-hz", str(rate_hz), "--domain-id", str(domain_id)]
+        if topic is not None:
+            command += ["--topic", topic]
+        if lowstate_topic is not None:
+            command += ["--lowstate-topic", lowstate_topic]
+        if health_log_sec > 0:
+            command += ["--health-log-sec", str(health_log_sec)]
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [app_dir, os.environ.get("PYTHONPATH")])))
+        self._process = subprocess.Popen(command, env=env)
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+        print(f"[ControlProcess] Control loop running at {rate_hz:.0f}Hz in process {self._process.pid}")
+
+    def set_velocity(self, x_vel: float, y_vel: float, yaw_vel: float, height: Optional[float] = None) -> None:
+        height = self._default_height if height is None else float(height)
+        with self._lock:  # the stop channel may write from another thread
+            self.block.setpoint.write(float(x_vel), float(y_vel), float(yaw_vel), height, 1.0, time.monotonic())
+
+    def stop(self, height: Optional[float] = None) -> None:
+        height = self._default_height if height is None else float(height)
+        with self._lock:
+            self.block.setpoint.write(0.0, 0.0, 0.0, height, 0.0, time.monotonic())
+
+    def get_imu(self) -> Optional[Tuple[Tuple[float, float, float, float], Tuple[float, float, float], float]]:
+        """Latest (quaternion xyzw, rpy, monotonic stamp) from the control process, or None."""
+        seq, values = self.block.imu.read()
+        if seq == 0:
+            return None
+        return values[0:4], values[4:7], values[7]
+
+    @property
+    def loops(self) -> int:
+        return int(self.block.loop.read()[1][0])
+
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def close(self, timeout: float = 1.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.stop()
+        self.block.request_shutdown()
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self.block.close()
+
+
+def jitter_stats(periods: List[float], rate_hz: float) -> Dict[str, Optional[float]]:
+    """Deviation of loop periods from the nominal period (seconds), plus the number of missed deadlines."""
+    nominal = 1.0 / rate_hz
+    stats = LatencyStats(max_samples=max(1, len(periods)))
+    for period in periods:
+        stats.add(abs(period - nominal))
+    snapshot = stats.snapshot()
+    snapshot["missed"] = sum(1 for p in periods if p > 2.0 * nominal)
+    return snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Robot control loop, started by ControlProcess.")
+    parser.add_argument("shm_name")
+    parser.add_argument("--rate-hz", type=float, default=100.0)
+    parser.add_argument("--domain-id", type=int, default=1)
+    parser.add_argument("--topic", default=None)
+    parser.add_argument("--lowstate-topic", default=None)
+    parser.add_argument("--health-log-sec", type=float, default=0.0)
+    args = parser.parse_args()
+    run_control_process(args.shm_name, args.rate_hz, args.domain_id, args.topic, args.lowstate_topic, args.health_log_sec)
@@ -0,0 +1,370 @@
+import argparse
+import glob
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+import zmq
+
+from metrics import LatencyStats, format_seconds
+
+
+# Short camera names used by TeleImagerSnapshotClient, and their keys in the server config
+CAMERA_KEYS = {"head": "head_camera", "left": "left_wrist_camera", "right": "right_wrist_camera"}
+DEFAULT_PORTS = {"head": 55555, "left": 55556, "right": 55557}
+REQUEST_PORT = 60000
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Capture-time stamp drawn into the top-left corner of every frame: 8 sync bits
+# and 56 bits of wall-clock milliseconds, 8x8 px cells (one JPEG block each) in
+# rows of 16, so it survives JPEG compression.
+_STAMP_SYNC = 0xA5
+_STAMP_BITS = 64
+_STAMP_CELL = 8
+_STAMP_COLUMNS = 16
+
+
+############################################################
+# Frame stamp
+############################################################
+
+def stamp_frame(img: np.ndarray, capture_time: float) -> None:
+    """Draw ``capture_time`` (seconds since the epoch) into the frame in place."""
+    value = (_STAMP_SYNC << 56) | (int(capture_time * 1000.0) & ((1 << 56) - 1))
+    for bit in range(_STAMP_BITS):
+        row, column = divmod(bit, _STAMP_COLUMNS)
+        y, x = row * _STAMP_CELL, column * _STAMP_CELL
+        img[y:y + _STAMP_CELL, x:x + _STAMP_CELL] = 255 if value >> (_STAMP_BITS - 1 - bit) & 1 else 0
+
+
+def read_frame_stamp(img: Optional[np.ndarray]) -> Optional[float]:
+    """Capture time stamped by ``stamp_frame``, or None if the frame carries no stamp."""
+    rows = _STAMP_BITS // _STAMP_COLUMNS
+    if img is None or img.shape[0] < rows * _STAMP_CELL or img.shape[1] < _STAMP_COLUMNS * _STAMP_CELL:
+        return None
+    value = 0
+    for bit in range(_STAMP_BITS):
+        row, column = divmod(bit, _STAMP_COLUMNS)
+        y, x = row * _STAMP_CELL + 2, column * _STAMP_CELL + 2  # cell centre, away from block edges
+        value = value << 1 | int(img[y:y + _STAMP_CELL - 4, x:x + _STAMP_CELL - 4].mean() > 127)
+    if value >> 56 != _STAMP_SYNC:
+        return None
+    return (value & ((1 << 56) - 1)) / 1000.0
+
+
+############################################################
+# Frame sources
+############################################################
+
+@dataclass
+class CameraStream:
+    """One published camera: resolution, rate, frame source and injected faults.
+
+    ``source`` is an image file, a directory of images or a video file, played
+    in a loop and resized to the stream resolution; synthetic frames (gradient,
+    moving bar, frame counter) are generated when it is None. Each captured
+    frame is published ``delay_ms`` plus up to ``jitter_ms`` later, dropped
+    with probability ``drop_rate``, and nothing is published for ``stall_sec``
+    out of every ``stall_every_sec`` (a camera or link outage).
+    """
+
+    camera: str = "head"  # head, left or right
+    width: int = 640
+    height: int = 480
+    fps: float = 30.0
+    port: int = 0  # 0 for the teleimager default of the camera, -1 for any free port
+    binocular: bool = False
+    source: Optional[str] = None
+    jpeg_quality: int = 80
+    delay_ms: float = 0.0
+    jitter_ms: float = 0.0
+    drop_rate: float = 0.0
+    stall_every_sec: float = 0.0
+    stall_sec: float = 0.0
+
+
+class _FrameSource:
+    """Frames of a stream, before stamping; recorded sources loop forever."""
+
+    def __init__(self, stream: CameraStream) -> None:
+        self.size = (stream.width, stream.height)
+        self.label = CAMERA_KEYS[stream.camera]
+        self._images: List[np.ndarray] = []
+        self._video: Optional[cv2.VideoCapture] = None
+        self._index = 0
+        if stream.source is None:
+            x = np.linspace(0, 255, stream.width, dtype=np.float32)
+            y = np.linspace(0, 255, stream.height, dtype=np.float32)[:, None]
+            self._base = np.dstack([np.broadcast_to(x, (stream.height, stream.width)), np.broadcast_to(y, (stream.height, stream.width)),
+                                    np.full((stream.height, stream.width), 96, np.float32)]).astype(np.uint8)
+        elif os.path.isdir(stream.source):
+            paths = sorted(p for p in glob.glob(os.path.join(stream.source, "*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+            self._images = [self._resize(cv2.imread(p, cv2.IMREAD_COLOR)) for p in paths]
+            if not self._images:
+                raise ValueError(f"No images ({', '.join(IMAGE_EXTENSIONS)}) in {stream.source}")
+        elif stream.source.lower().endswith(IMAGE_EXTENSIONS):
+            img = cv2.imread(stream.source, cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError(f"Cannot read image {stream.source}")
+            self._images = [self._resize(img)]
+        else:
+            self._video = cv2.VideoCapture(stream.source)
+            if not self._video.isOpened():
+                raise ValueError(f"Cannot open video {stream.source}")
+
+    def _resize(self, img: np.ndarray) -> np.ndarray:
+        return img if (img.shape[1], img.shape[0]) == self.size else cv2.resize(img, self.size)
+
+    def next(self, seq: int) -> np.ndarray:
+        if self._images:
+            img = self._images[self._index].copy()
+            self._index = (self._index + 1) % len(self._images)
+            return img
+        if self._video is not None:
+            ok, img = self._video.read()
+            if not ok:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, img = self._video.read()
+                if not ok:
+                    raise RuntimeError("Video source returned no frames")
+            return self._resize(img)
+        img = self._base.copy()
+        width, height = self.size
+        x = (seq * 8) % width
+        img[:, x:x + 16] = 255
+        cv2.putText(img, f"{self.label} #{seq}", (16, height - 24), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        return img
+
+    def close(self) -> None:
+        if self._video is not None:
+            self._video.release()
+
+
+############################################################
+# Server
+############################################################
+
+class _StreamStats:
+    def __init__(self) -> None:
+        self.captured = 0
+        self.published = 0
+        self.dropped = 0
+        self.stalled = 0
+        self.bytes = 0
+        self.encode = LatencyStats()
+        self.late = LatencyStats()  # publish time past the scheduled time
+
+
+class SyntheticFrameServer:
+    """Stand-in for a teleimager server: serves synthetic or recorded frames on the teleimager wire protocol.
+
+    Answers any request on ``request_port`` (REQ/REP) with the camera config as
+    JSON and publishes each enabled camera as JPEG bytes on its own ZMQ PUB
+    port, which is what TeleImager's image clients consume. The config carries
+    the cameras both at the top level and under ``"camera"``, so older and
+    newer clients read it. Every frame is stamped with its capture time (see
+    ``read_frame_stamp``) so a client can measure frame age end to end.
+    """
+
+    def __init__(self, streams: List[CameraStream], host: str = "127.0.0.1", request_port: int = REQUEST_PORT, seed: int = 0) -> None:
+        cameras = [s.camera for s in streams]
+        unknown = set(cameras) - set(CAMERA_KEYS)
+        if unknown or len(set(cameras)) != len(cameras):
+            raise ValueError(f"Expected distinct cameras out of {sorted(CAMERA_KEYS)}, got {cameras}")
+        self.streams = {s.camera: s for s in streams}
+        self.host = host
+        self.request_port = request_port
+        self.ports: Dict[str, int] = {}
+        self.stats = {camera: _StreamStats() for camera in self.streams}
+        self._seed = seed
+        self._context = zmq.Context()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _bind(self, socket: zmq.Socket, port: int) -> int:
+        if port < 0:
+            return socket.bind_to_random_port(f"tcp://{self.host}")
+        socket.bind(f"tcp://{self.host}:{port}")
+        return port
+
+    def config(self) -> Dict:
+        cameras = {}
+        for key, camera in CAMERA_KEYS.items():
+            stream = self.streams.get(key)
+            cameras[camera] = {
+                "enable_zmq": stream is not None,
+                "zmq_port": self.ports.get(key, DEFAULT_PORTS[key]),
+                "enable_webrtc": False,
+                "image_shape": [stream.height, stream.width] if stream else [480, 640],
+                "binocular": stream.binocular if stream else False,
+                "fps": stream.fps if stream else 30,
+                "type": "synthetic" if stream and stream.source is None else "recorded",
+            }
+        return {**cameras, "camera": cameras}
+
+    def start(self) -> "SyntheticFrameServer":
+        ready = []
+        for camera, stream in self.streams.items():
+            event = threading.Event()
+            thread = threading.Thread(target=self._publish, args=(stream, event), name=f"frame-server-{camera}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            ready.append(event)
+        for event in ready:
+            event.wait(5.0)  # config replies carry the bound ports
+
+        event = threading.Event()
+        thread = threading.Thread(target=self._serve_config, args=(event,), name="frame-server-config", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        event.wait(5.0)
+        print(f"[FrameServer] Serving {', '.join(f'{c} on {p}' for c, p in self.ports.items())}, config on {self.request_port}")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads.clear()
+        self._context.term()
+
+    def _serve_config(self, ready: threading.Event) -> None:
+        socket = self._context.socket(zmq.REP)
+        socket.setsockopt(zmq.LINGER, 0)
+        try:
+            self.request_port = self._bind(socket, self.request_port)
+            ready.set()
+            while not self._stop.is_set():
+                if socket.poll(100):
+                    socket.recv()
+                    socket.send_string(json.dumps(self.config()))
+        finally:
+            socket.close()
+
+    def _publish(self, stream: CameraStream, ready: threading.Event) -> None:
+        stats = self.stats[stream.camera]
+        rng = random.Random(f"{self._seed}-{stream.camera}")
+        source = _FrameSource(stream)
+        socket = self._context.socket(zmq.PUB)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.SNDHWM, 1)  # a slow subscriber gets the newest frame, not a backlog
+        try:
+            port = stream.port or DEFAULT_PORTS[stream.camera]
+            self.ports[stream.camera] = self._bind(socket, port)
+            ready.set()
+
+            period = 1.0 / stream.fps
+            start = time.monotonic()
+            next_capture = start
+            pending = []  # (publish at, seq, jpeg) heap
+            seq = 0
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= next_capture:
+                    stats.captured += 1
+                    img = source.next(seq)
+                    stamp_frame(img, time.time())
+                    captured_at = time.monotonic()
+                    encode_start = time.perf_counter()
+                    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, stream.jpeg_quality])
+                    stats.encode.add(time.perf_counter() - encode_start)
+                    stalled = stream.stall_every_sec > 0 and (now - start) % stream.stall_every_sec >= stream.stall_every_sec - stream.stall_sec
+                    if stalled:
+                        stats.stalled += 1
+                    elif not ok or rng.random() < stream.drop_rate:
+                        stats.dropped += 1
+                    else:
+                        delay = (stream.delay_ms + rng.uniform(0.0, stream.jitter_ms)) / 1000.0
+                        heapq.heappush(pending, (captured_at + delay, seq, buf.tobytes()))  # delay counts from the stamp
+                    seq += 1
+                    next_capture = max(next_capture + period, now - period)  # no catch-up burst after a hiccup
+
+                now = time.monotonic()
+                while pending and pending[0][0] <= now:
+                    due, _, data = heapq.heappop(pending)
+                    socket.send(data)
+                    stats.published += 1
+                    stats.bytes += len(data)
+                    stats.late.add(now - due)
+                wake = min([next_capture] + [p[0] for p in pending[:1]])
+                self._stop.wait(max(0.0, wake - time.monotonic()))
+        finally:
+            source.close()
+            socket.close()
+
+    def summary(self) -> str:
+        lines = []
+        for camera, s in self.stats.items():
+            stream = self.streams[camera]
+            size = s.bytes / s.published / 1024.0 if s.published else 0.0
+            lines.append(
+                f"{camera} {stream.width}x{stream.height}@{stream.fps:g}: {s.published}/{s.captured} frames published, "
+                f"{s.dropped} dropped, {s.stalled} stalled, {size:.0f} KiB per frame, "
+                f"JPEG encode p50={format_seconds(s.encode.percentile(50))}, send late p99={format_seconds(s.late.percentile(99))}"
+            )
+        return "\n".join(lines)
+
+
+############################################################
+# Command line
+############################################################
+
+def _shape(value: str) -> List[int]:
+    """'480x640' as [height, width]."""
+    height, width = value.lower().split("x")
+    return [int(height), int(width)]
+
+
+def streams_from_args(args: argparse.Namespace) -> List[CameraStream]:
+    faults = dict(
+        delay_ms=args.delay_ms, jitter_ms=args.jitter_ms, drop_rate=args.drop_rate,
+        stall_every_sec=args.stall_every_sec, stall_sec=args.stall_sec, jpeg_quality=args.jpeg_quality,
+    )
+    height, width = _shape(args.head_shape)
+    streams = [CameraStream("head", width, height, args.head_fps, binocular=args.binocular, source=args.head_source, **faults)]
+    height, width = _shape(args.wrist_shape)
+    for camera in args.wrist:
+        streams.append(CameraStream(camera, width, height, args.wrist_fps, source=args.wrist_source, **faults))
+    return streams
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--head-shape", default="480x1280", help="head camera HEIGHTxWIDTH")
+    parser.add_argument("--head-fps", type=float, default=30.0)
+    parser.add_argument("--binocular", action="store_true", help="mark the head camera as side-by-side stereo")
+    parser.add_argument("--head-source", default=None, help="image, image directory or video; synthetic frames if unset")
+    parser.add_argument("--wrist", nargs="*", default=[], choices=["left", "right"], help="wrist cameras to serve")
+    parser.add_argument("--wrist-shape", default="480x640", help="wrist camera HEIGHTxWIDTH")
+    parser.add_argument("--wrist-fps", type=float, default=30.0)
+    parser.add_argument("--wrist-source", default=None)
+    parser.add_argument("--jpeg-quality", type=int, default=80)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="added capture-to-send delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra delay, uniform in [0, jitter]")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of frames never sent")
+    parser.add_argument("--stall-every-sec", type=float, default=0.0, help="period of outages, 0 for none")
+    parser.add_argument("--stall-sec", type=float, default=0.0, help="length of each outage")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic teleimager frame server.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--request-port", type=int, default=REQUEST_PORT)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = SyntheticFrameServer(streams_from_args(args), host=args.host, request_port=args.request_port).start()
+    try:
+        while True:
+            time.sleep(10.0)
+            print(f"[FrameServer] {server.summary()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
@@ -0,0 +1,40 @@
+import math
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass
+class MotionOutcome:
+    """What a motion tool measurably did, returned to the model instead of ``None``.
+
+    With the achieved yaw change and final heading in the tool result, the model
+    has no reason to follow a motion with ``get_rotation`` to verify it. Floats
+    are rounded to keep the serialized result short.
+    """
+
+    action: str
+    termination: str  # "tolerance", "overshoot", "timeout", "duration" or "done"
+    elapsed_sec: float
+    commands_sent: int
+    requested_deg: Optional[float] = None
+    yaw_delta_deg: Optional[float] = None  # measured by the IMU, positive = counter-clockwise (left)
+    final_heading_deg: Optional[float] = None
+    distance_m: Optional[float] = None  # estimated from the commanded walking speed
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, float):
+                setattr(self, f.name, round(value, 1) if math.isfinite(value) else None)
+
+    def __str__(self) -> str:
+        text = self.action
+        if self.yaw_delta_deg is not None:
+            text += f": turned {self.yaw_delta_deg:+.0f}°"
+        if self.distance_m is not None:
+            text += f": ~{self.distance_m:.1f} m"
+        if self.final_heading_deg is not None:
+            text += f", now facing {self.final_heading_deg:.0f}°"
+        if self.termination not in ("tolerance", "duration", "done"):
+            text += f" (ended by {self.termination})"
+        return text + "."
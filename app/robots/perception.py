@@ -0,0 +1,134 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+# HSV ranges (OpenCV hue 0-180) for the optional color blob detection
+DEFAULT_BLOB_COLORS: Dict[str, List[Tuple[Tuple[int, int, int], Tuple[int, int, int]]]] = {
+    "red": [((0, 120, 80), (8, 255, 255)), ((172, 120, 80), (180, 255, 255))],
+    "green": [((45, 120, 80), (75, 255, 255))],
+    "blue": [((100, 150, 80), (125, 255, 255))],
+    "yellow": [((22, 120, 120), (35, 255, 255))],
+}
+
+
+@dataclass
+class Detection:
+    kind: str  # "aruco", "apriltag" or "blob"
+    label: str  # marker id or blob color
+    bearing_deg: float  # horizontal angle from the optical axis, positive to the left (same as rotate)
+    distance_m: Optional[float]  # pinhole estimate from the known marker size, None for blobs
+    size_px: float
+    center_px: Tuple[float, float]
+
+    def describe(self) -> str:
+        if abs(self.bearing_deg) < 0.5:
+            where = "straight ahead"
+        else:
+            where = f"bearing {abs(self.bearing_deg):.0f}° {'left' if self.bearing_deg > 0 else 'right'}"
+        text = f"{self.kind} {self.label}: {where}"
+        if self.distance_m is not None:
+            text += f", ~{self.distance_m:.1f} m away"
+        return text
+
+
+class MarkerDetector:
+    """Finds ArUco/AprilTag markers and colored blobs in a BGR frame with a pinhole camera model.
+
+    Bearing comes from the horizontal offset of the detection center and the
+    camera's horizontal field of view. Distance is estimated from the apparent
+    side length of a marker of known physical size, so it is only as good as
+    ``marker_size_m`` and ``hfov_deg``.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Sequence[str] = ("DICT_4X4_50", "DICT_APRILTAG_36h11"),
+        marker_size_m: float = 0.15,
+        hfov_deg: float = 69.4,
+        blob_colors: Optional[Dict[str, List[Tuple[Tuple[int, int, int], Tuple[int, int, int]]]]] = None,
+        min_blob_area_px: int = 400,
+    ) -> None:
+        self._detectors = []
+        parameters = cv2.aruco.DetectorParameters()
+        for name in dictionaries:
+            dictionary = cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, name))
+            kind = "apriltag" if "APRILTAG" in name else "aruco"
+            self._detectors.append((kind, cv2.aruco.ArucoDetector(dictionary, parameters)))
+
+        self.marker_size_m = marker_size_m
+        self.hfov_deg = hfov_deg
+        self.blob_colors = blob_colors  # None disables blob detection
+        self.min_blob_area_px = min_blob_area_px
+
+    def _focal_px(self, width: int) -> float:
+        return (width / 2.0) / math.tan(math.radians(self.hfov_deg) / 2.0)
+
+    def _bearing_deg(self, x: float, width: int) -> float:
+        return math.degrees(math.atan2(width / 2.0 - x, self._focal_px(width)))
+
+    def detect(self, img: np.ndarray) -> List[Detection]:
+        height, width = img.shape[:2]
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        focal = self._focal_px(width)
+
+        detections: List[Detection] = []
+        seen = set()
+        for kind, detector in self._detectors:
+            corners, ids, _ = detector.detectMarkers(gray)
+            if ids is None:
+                continue
+            for marker_corners, marker_id in zip(corners, ids.flatten()):
+                pts = marker_corners.reshape(4, 2)
+                center = pts.mean(axis=0)
+                key = (round(float(center[0])), round(float(center[1])))
+                if key in seen:  # the same square decoded by two dictionaries
+                    continue
+                seen.add(key)
+                side = float(np.mean([np.linalg.norm(pts[i] - pts[(i + 1) % 4]) for i in range(4)]))
+                detections.append(Detection(
+                    kind=kind,
+                    label=str(int(marker_id)),
+                    bearing_deg=self._bearing_deg(float(center[0]), width),
+                    distance_m=self.marker_size_m * focal / side if side > 0 else None,
+                    size_px=side,
+                    center_px=(float(center[0]), float(center[1])),
+                ))
+
+        if self.blob_colors and img.ndim == 3:
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+            for color, ranges in self.blob_colors.items():
+                mask = None
+                for low, high in ranges:
+                    part = cv2.inRange(hsv, np.array(low, dtype=np.uint8), np.array(high, dtype=np.uint8))
+                    mask = part if mask is None else cv2.bitwise_or(mask, part)
+                contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                if not contours:
+                    continue
+                largest = max(contours, key=cv2.contourArea)
+                area = cv2.contourArea(largest)
+                if area < self.min_blob_area_px:
+                    continue
+                m = cv2.moments(largest)
+                cx, cy = m["m10"] / m["m00"], m["m01"] / m["m00"]
+                detections.append(Detection(
+                    kind="blob",
+                    label=color,
+                    bearing_deg=self._bearing_deg(cx, width),
+                    distance_m=None,
+                    size_px=math.sqrt(area),
+                    center_px=(cx, cy),
+                ))
+
+        detections.sort(key=lambda d: -d.bearing_deg)  # left to right
+        return detections
+
+
+def describe_detections(detections: Sequence[Detection]) -> str:
+    """Compact, model-facing text for a list of detections."""
+    if not detections:
+        return "No markers or objects detected in view."
+    return "; ".join(d.describe() for d in detections) + "."
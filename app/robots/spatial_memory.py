@@ -0,0 +1,333 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+from pydantic_ai import BinaryContent, FunctionToolset, ModelRetry
+
+
+# Body-frame direction of each walk direction, degrees counter-clockwise from forward
+WALK_DIRECTIONS = {"forward": 0.0, "left": 90.0, "backward": 180.0, "right": -90.0}
+
+
+def _wrap_to_180(angle_deg: float) -> float:
+    return (angle_deg + 180.0) % 360.0 - 180.0
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    """Grid cells at Chebyshev distance ``ring`` from (cx, cy)."""
+    if ring == 0:
+        yield cx, cy
+        return
+    for d in range(-ring, ring + 1):
+        yield cx + d, cy - ring
+        yield cx + d, cy + ring
+    for d in range(-ring + 1, ring):
+        yield cx - ring, cy + d
+        yield cx + ring, cy + d
+
+
+############################################################
+# Pose
+############################################################
+
+class DeadReckoning:
+    """Approximate planar pose from IMU yaw and commanded walking.
+
+    Position is integrated from walk commands at a nominal ``speed_mps``, so it
+    drifts with slippage and speed errors; it is meant for "roughly where" and
+    "which way", not for navigation. x points along yaw 0, y to its left.
+    """
+
+    def __init__(self, speed_mps: float, get_yaw_deg: Callable[[], Optional[float]]) -> None:
+        self.speed_mps = speed_mps
+        self._get_yaw_deg = get_yaw_deg
+        self._lock = threading.Lock()
+        self._x = 0.0
+        self._y = 0.0
+
+    def yaw_deg(self) -> float:
+        yaw = self._get_yaw_deg()
+        return 0.0 if yaw is None else yaw
+
+    def pose(self) -> Tuple[float, float, float]:
+        """(x m, y m, yaw degrees)."""
+        with self._lock:
+            return self._x, self._y, self.yaw_deg()
+
+    def walked(self, direction: str, duration_sec: float, yaw_deg: Optional[float] = None) -> None:
+        """Advance the position by a walk of ``duration_sec`` (the time actually walked)."""
+        heading = math.radians((self.yaw_deg() if yaw_deg is None else yaw_deg) + WALK_DIRECTIONS[direction])
+        distance = self.speed_mps * max(0.0, duration_sec)
+        with self._lock:
+            self._x += distance * math.cos(heading)
+            self._y += distance * math.sin(heading)
+
+    def describe(self) -> str:
+        x, y, _ = self.pose()
+        return f"x={x:.1f}m y={y:.1f}m"
+
+
+############################################################
+# Memory
+############################################################
+
+@dataclass
+class Place:
+    id: int
+    label: str
+    x: float
+    y: float
+    yaw_deg: float
+    timestamp: float
+    thumbnail: Optional[bytes] = None  # JPEG, at most ``thumbnail_px`` on the long side
+    observation: bool = False  # recorded automatically by a tool, not named by the model
+
+    def relative_to(self, x: float, y: float, yaw_deg: float) -> Tuple[float, float]:
+        """(distance m, bearing degrees, positive to the left) of this place seen from a pose."""
+        dx, dy = self.x - x, self.y - y
+        distance = math.hypot(dx, dy)
+        bearing = _wrap_to_180(math.degrees(math.atan2(dy, dx)) - yaw_deg) if distance > 1e-6 else 0.0
+        return distance, bearing
+
+
+class SpatialMemory:
+    """Bounded store of places and observations, indexed by location and label.
+
+    Entries live in insertion order. Named places (``remember_place``) are
+    evicted oldest first beyond ``max_entries``; automatic observations such as
+    camera snapshots and marker detections have their own, smaller budget of
+    ``max_observations`` and are evicted first when thumbnails exceed
+    ``max_bytes``, so they never push out a named place. Locations are bucketed in a
+    grid of ``cell_m`` cells, so nearest queries look at the surrounding cells
+    only; labels go into a word index. Thumbnails are downsampled to
+    ``thumbnail_px`` on the long side and stored as JPEG.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 200,
+        max_observations: int = 50,
+        max_bytes: int = 4_000_000,
+        thumbnail_px: int = 96,
+        jpeg_quality: int = 70,
+        cell_m: float = 1.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_observations = max_observations
+        self.max_bytes = max_bytes
+        self.thumbnail_px = thumbnail_px
+        self.jpeg_quality = jpeg_quality
+        self.cell_m = cell_m
+
+        self._lock = threading.Lock()
+        self._places: "OrderedDict[int, Place]" = OrderedDict()
+        self._observations: "OrderedDict[int, None]" = OrderedDict()  # ids of observations, oldest first
+        self._grid: Dict[Tuple[int, int], Set[int]] = {}
+        self._words: Dict[str, Set[int]] = {}
+        self._next_id = 1
+        self.thumbnail_bytes = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_m), math.floor(y / self.cell_m)
+
+    def make_thumbnail(self, img: np.ndarray) -> bytes:
+        height, width = img.shape[:2]
+        scale = min(1.0, self.thumbnail_px / max(height, width))
+        if scale < 1.0:
+            img = cv2.resize(img, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise RuntimeError("cv2.imencode('.jpg', thumbnail) failed")
+        return buf.tobytes()
+
+    # ------------------------------------------------------------------
+
+    def add(self, label: str, pose: Tuple[float, float, float], image: Optional[np.ndarray] = None, observation: bool = False) -> Place:
+        """Store a place at ``pose``; ``observation`` marks automatic records that must not evict named places."""
+        thumbnail = self.make_thumbnail(image) if image is not None else None
+        x, y, yaw = pose
+        with self._lock:
+            place = Place(self._next_id, label, x, y, yaw, time.time(), thumbnail, observation)
+            self._next_id += 1
+            self._places[place.id] = place
+            if observation:
+                self._observations[place.id] = None
+            self._grid.setdefault(self._cell(x, y), set()).add(place.id)
+            for word in _words(label):
+                self._words.setdefault(word, set()).add(place.id)
+            self.thumbnail_bytes += len(thumbnail or b"")
+
+            while len(self._observations) > self.max_observations:
+                self._evict(next(iter(self._observations)))
+            while len(self._places) - len(self._observations) > self.max_entries:
+                self._evict(self._oldest_named())
+            while self.thumbnail_bytes > self.max_bytes and len(self._places) > 1:
+                if self._observations:
+                    self._evict(next(iter(self._observations)))
+                elif observation:
+                    break  # the new observation itself was too big; named places stay
+                else:
+                    self._evict(self._oldest_named())
+        return place
+
+    def _oldest_named(self) -> int:
+        # Skips at most ``max_observations`` ids
+        return next(place_id for place_id in self._places if place_id not in self._observations)
+
+    def _evict(self, place_id: int) -> None:
+        place = self._places.pop(place_id)
+        self._observations.pop(place_id, None)
+        cell = self._cell(place.x, place.y)
+        self._grid[cell].discard(place.id)
+        if not self._grid[cell]:
+            del self._grid[cell]
+        for word in _words(place.label):
+            ids = self._words.get(word)
+            if ids is not None:
+                ids.discard(place.id)
+                if not ids:
+                    del self._words[word]
+        self.thumbnail_bytes -= len(place.thumbnail or b"")
+        self.evicted += 1
+
+    def get(self, place_id: int) -> Optional[Place]:
+        with self._lock:
+            return self._places.get(place_id)
+
+    def nearest(self, x: float, y: float, k: int = 5, max_distance_m: Optional[float] = None) -> List[Place]:
+        """Up to ``k`` places closest to (x, y), searching outward ring by ring of grid cells."""
+        with self._lock:
+            if not self._places:
+                return []
+            cx, cy = self._cell(x, y)
+            max_ring = max(max(abs(gx - cx), abs(gy - cy)) for gx, gy in self._grid)
+            if max_distance_m is not None:
+                max_ring = min(max_ring, math.ceil(max_distance_m / self.cell_m) + 1)
+
+            found: List[Tuple[float, Place]] = []
+
+            def visit(place_ids) -> None:
+                for place_id in place_ids:
+                    place = self._places[place_id]
+                    distance = math.hypot(place.x - x, place.y - y)
+                    if max_distance_m is None or distance <= max_distance_m:
+                        found.append((distance, place))
+
+            for ring in range(max_ring + 1):
+                if 8 * ring > len(self._grid):  # sparse memory: scanning the occupied cells is cheaper than the ring
+                    visit(place_id for (gx, gy), ids in self._grid.items() if max(abs(gx - cx), abs(gy - cy)) >= ring for place_id in ids)
+                    break
+                for cell in _ring_cells(cx, cy, ring):
+                    visit(self._grid.get(cell, ()))
+                # Anything in a farther ring is at least ``ring * cell_m`` away
+                if len(found) >= k and sorted(d for d, _ in found)[k - 1] <= ring * self.cell_m:
+                    break
+        found.sort(key=lambda item: item[0])
+        return [place for _, place in found[:k]]
+
+    def find(self, query: str, k: int = 5) -> List[Place]:
+        """Places whose label shares the most words with ``query``, newest first among equals."""
+        words = _words(query)
+        with self._lock:
+            scores: Dict[int, int] = {}
+            for word in words:
+                for place_id in self._words.get(word, ()):
+                    scores[place_id] = scores.get(place_id, 0) + 1
+            ranked = sorted(scores, key=lambda place_id: (-scores[place_id], -place_id))
+            return [self._places[place_id] for place_id in ranked[:k]]
+
+    def summary(self) -> str:
+        return (
+            f"Spatial memory: {len(self._places) - len(self._observations)} places, {len(self._observations)} observations, "
+            f"{self.thumbnail_bytes / 1000.0:.0f}KB of thumbnails, {self.evicted} evicted"
+        )
+
+
+############################################################
+# Tools
+############################################################
+
+def describe_places(places: List[Place], pose: Tuple[float, float, float], speed_mps: float) -> str:
+    """Model-facing text: where each place is from the current pose and how to get there with rotate and walk."""
+    if not places:
+        return "No matching places remembered."
+    x, y, yaw = pose
+    lines = []
+    for place in places:
+        distance, bearing = place.relative_to(x, y, yaw)
+        age = time.time() - place.timestamp
+        where = "here" if distance < 0.3 else (
+            f"{distance:.1f} m away, rotate {bearing:+.0f}° then walk forward {distance / speed_mps:.1f}s"
+        )
+        image = ", thumbnail available" if place.thumbnail else ""
+        lines.append(f"#{place.id} '{place.label}' ({age:.0f}s ago): {where}{image}")
+    return "\n".join(lines)
+
+
+def add_spatial_memory_tools(
+    toolset: FunctionToolset,
+    memory: SpatialMemory,
+    pose: DeadReckoning,
+    get_frame: Optional[Callable[[], np.ndarray]] = None,
+) -> None:
+    """Add remember/recall tools backed by ``memory`` to a robot toolset.
+
+    ``get_frame`` returns the current BGR camera frame for thumbnails; without it
+    places are stored without images and ``show_place`` is not added.
+    """
+
+    def remember_place(label: str) -> str:
+        """
+        Remember the current location under a short description, e.g. 'kitchen door' or 'charging station'.
+        Use recall_places later to find the way back.
+        """
+        image = None
+        if get_frame is not None:
+            try:
+                image = get_frame()
+            except Exception as e:
+                print(f"[SpatialMemory] No thumbnail for '{label}': {e}")
+        place = memory.add(label, pose.pose(), image)
+        print(f"[SpatialMemory] Remembered #{place.id} '{label}' at {pose.describe()}")
+        return f"Remembered place #{place.id} '{label}'."
+
+    def recall_places(query: str) -> str:
+        """
+        Find remembered places and earlier observations matching a description, e.g. 'door' or 'red marker'.
+        Returns how far away each one is and the rotate angle and walk duration to get there.
+        """
+        places = memory.find(query)
+        print(f"[SpatialMemory] Recall '{query}': {len(places)} matches")
+        return describe_places(places, pose.pose(), pose.speed_mps)
+
+    def nearby_places() -> str:
+        """List the remembered places and observations closest to the current location."""
+        x, y, yaw = pose.pose()
+        return describe_places(memory.nearest(x, y), (x, y, yaw), pose.speed_mps)
+
+    def show_place(place_id: int) -> BinaryContent:
+        """Show the small camera thumbnail stored with a remembered place."""
+        place = memory.get(place_id)
+        if place is None or place.thumbnail is None:
+            raise ModelRetry(f"No thumbnail for place #{place_id}.")
+        return BinaryContent(data=place.thumbnail, media_type="image/jpeg")
+
+    toolset.add_function(remember_place)
+    toolset.add_function(recall_places)
+    toolset.add_function(nearby_places)
+    if get_frame is not None:
+        toolset.add_function(show_place)
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class MotionStopped(Exception):
+    """Raised inside a motion primitive that was preempted by the stop channel."""
+
+
+class StopChannel:
+    """Process-wide emergency stop that any thread or asyncio task can trigger.
+
+    ``trigger`` latches the stop first, so motion loops sleeping in ``wait``
+    wake up at once, send their own final stop and raise ``MotionStopped``.
+    Then it runs the registered stop handlers so the stop command goes out
+    without waiting for a motion thread to notice. Fast handlers (publishing a
+    zero-velocity message, e.g. ``RobotController.stop``) run in the calling
+    thread; handlers registered as ``blocking`` (RPCs such as
+    ``LocoClient.StopMove`` that can wait seconds for a reply) each get their
+    own thread, so they cannot hold up the caller or each other. The channel
+    stays latched until ``clear`` is called.
+    """
+
+    def __init__(self, max_latency_sec: float = 0.05) -> None:
+        self.max_latency_sec = max_latency_sec
+        self._event = threading.Event()
+        self._handlers: List[Tuple[Callable[[], None], bool]] = []
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+        self.last_latency_sec: Optional[float] = None
+
+    def add_handler(self, handler: Callable[[], None], blocking: bool = False) -> None:
+        """Register a stop handler; ``blocking`` ones run on their own thread instead of the caller's."""
+        with self._lock:
+            self._handlers.append((handler, blocking))
+
+    def remove_handler(self, handler: Callable[[], None]) -> None:
+        with self._lock:
+            self._handlers = [(h, b) for h, b in self._handlers if h != handler]
+
+    def _run_handler(self, handler: Callable[[], None], started: Optional[float] = None) -> None:
+        try:
+            handler()
+        except Exception as e:
+            print(f"[StopChannel] Stop handler failed: {e}")
+        if started is not None and time.perf_counter() - started > self.max_latency_sec:
+            print(f"[StopChannel] Blocking stop handler finished {(time.perf_counter() - started) * 1000.0:.1f}ms after the trigger")
+
+    def trigger(self, reason: str = "stop requested") -> float:
+        """Stop all motion. Returns the time the caller was held up, which excludes blocking handlers."""
+        started = time.perf_counter()
+        self.reason = reason
+        self._event.set()
+
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler, blocking in handlers:
+            if blocking:
+                threading.Thread(target=self._run_handler, args=(handler, started), name="stop-handler", daemon=True).start()
+        for handler, blocking in handlers:
+            if not blocking:
+                self._run_handler(handler)
+
+        latency = time.perf_counter() - started
+        self.last_latency_sec = latency
+        if latency > self.max_latency_sec:
+            print(f"[StopChannel] Stop took {latency * 1000.0:.1f}ms, above the {self.max_latency_sec * 1000.0:.0f}ms bound")
+        return latency
+
+    def clear(self) -> None:
+        self.reason = None
+        self._event.clear()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep for ``timeout`` seconds; returns True early if a stop was triggered."""
+        return self._event.wait(timeout)
+
+    def check(self) -> None:
+        """Raise ``MotionStopped`` if a stop is pending."""
+        if self._event.is_set():
+            raise MotionStopped(f"Motion stopped: {self.reason}")
+
+
+stop_channel = StopChannel()
@@ -0,0 +1,57 @@
+import logging
+import time
+from typing import Optional, Tuple
+
+import cv2
+from teleimager.image_client import ImageClient
+
+
+class TeleImagerSnapshotClient:
+    """Small helper around TeleImager's `ImageClient` to fetch frames and save snapshots.
+
+    Used by the Unitree simulator robot wrapper, and by the snapshot benchmark
+    against a `robots.frame_server.SyntheticFrameServer`.
+    """
+
+    _CAMERA_TO_METHOD = {
+        "head": "get_head_frame",
+        "left": "get_left_wrist_frame",
+        "right": "get_right_wrist_frame",
+    }
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        logger = logging.getLogger("teleimager.image_client")
+        logger.setLevel(logging.WARNING)
+
+        self._host = host
+        self._client = ImageClient(host=host)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def get_frame(self, camera: str = "head") -> Tuple[Optional["cv2.typing.MatLike"], float]:
+        """Return the latest frame (or None) and the receive FPS estimate."""
+        if camera not in self._CAMERA_TO_METHOD:
+            raise ValueError(f"Unknown camera '{camera}'. Expected one of {sorted(self._CAMERA_TO_METHOD)}")
+        method = getattr(self._client, self._CAMERA_TO_METHOD[camera])
+        img, fps = method()
+        return img, float(fps)
+
+    def get_fps(self, camera: str = "head") -> float:
+        """Receive FPS estimate of a camera stream, from the client's cached state."""
+        return self.get_frame(camera)[1]
+
+    def wait_for_frame(self, camera: str = "head", timeout_sec: float = 5.0, poll_sec: float = 0.02) -> "cv2.typing.MatLike":
+        """Poll until the camera has a frame; raises TimeoutError after ``timeout_sec``."""
+        deadline = time.monotonic() + timeout_sec
+        last_fps = 0.0
+        while time.monotonic() < deadline:
+            img, last_fps = self.get_frame(camera)
+            if img is not None:
+                return img
+            time.sleep(poll_sec)
+
+        raise TimeoutError(
+            f"Timed out waiting for {camera} frame after {timeout_sec}s (last recv_fps≈{last_fps:.2f}). "
+            "Is the simulator running and the teleimager server enabled?"
+        )
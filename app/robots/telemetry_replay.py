@@ -0,0 +1,258 @@
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Tuple
+
+
+def _wrap_to_180(angle_deg: float) -> float:
+    return (angle_deg + 180.0) % 360.0 - 180.0
+
+
+def _quat_xyzw_to_yaw_deg(q: Tuple[float, float, float, float]) -> float:
+    x, y, z, w = q
+    return math.degrees(math.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z)))
+
+
+############################################################
+# Samples
+############################################################
+
+@dataclass
+class IMUSample:
+    """One recorded IMU reading. ``t`` is seconds since the start of the recording."""
+
+    t: float
+    quaternion: Tuple[float, float, float, float]  # [x, y, z, w], as published by the simulator
+    rpy: Tuple[float, float, float]  # radians
+
+    @property
+    def yaw_deg(self) -> float:
+        return _quat_xyzw_to_yaw_deg(self.quaternion)
+
+    def to_lowstate(self) -> SimpleNamespace:
+        """Build an object shaped like ``LowState_`` as far as the ``_on_lowstate`` callbacks read it."""
+        return SimpleNamespace(imu_state=SimpleNamespace(quaternion=list(self.quaternion), rpy=list(self.rpy)))
+
+
+def load_samples(path: str) -> List[IMUSample]:
+    """Load a JSONL recording written by ``TelemetryRecorder``."""
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            d = json.loads(line)
+            samples.append(IMUSample(t=float(d["t"]), quaternion=tuple(d["quaternion"]), rpy=tuple(d["rpy"])))
+    return samples
+
+
+############################################################
+# Recording
+############################################################
+
+class TelemetryRecorder:
+    """Records lowstate IMU messages to a JSONL file.
+
+    Wrap a controller's lowstate callback with ``wrap`` so the live robot keeps
+    working while the stream is captured.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self._t0: Optional[float] = None
+
+    def record(self, msg) -> None:
+        try:
+            q = [float(v) for v in msg.imu_state.quaternion]
+            rpy = [float(v) for v in msg.imu_state.rpy]
+        except Exception:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._t0 is None:
+                self._t0 = now
+            line = json.dumps({"t": now - self._t0, "quaternion": q, "rpy": rpy})
+            self._file.write(line + "\n")
+
+    def wrap(self, callback: Callable) -> Callable:
+        def _recording_callback(msg) -> None:
+            self.record(msg)
+            callback(msg)
+
+        return _recording_callback
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+############################################################
+# Replay
+############################################################
+
+class TelemetryReplay:
+    """Feeds recorded IMU samples into a lowstate callback.
+
+    ``speed`` scales the recorded timing (1.0 = recorded speed); ``None`` replays
+    as fast as possible. ``step`` delivers a single sample, which lets callers
+    drive the replay in lockstep with a controller loop.
+    """
+
+    def __init__(self, samples: List[IMUSample], callback: Callable, speed: Optional[float] = 1.0) -> None:
+        if not samples:
+            raise ValueError("Replay needs at least one sample.")
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be > 0 or None.")
+
+        self._samples = samples
+        self._callback = callback
+        self._speed = speed
+        self._index = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._index >= len(self._samples)
+
+    @property
+    def current(self) -> Optional[IMUSample]:
+        """The most recently delivered sample."""
+        return self._samples[self._index - 1] if self._index > 0 else None
+
+    def step(self) -> bool:
+        """Deliver the next sample. Returns False once the recording is exhausted."""
+        if self.finished:
+            return False
+        sample = self._samples[self._index]
+        self._index += 1
+        self._callback(sample.to_lowstate())
+        return True
+
+    def run(self) -> None:
+        """Deliver all remaining samples, blocking until done or stopped."""
+        if self.finished:
+            return
+
+        t0_rec = self._samples[self._index].t
+        t0_wall = time.monotonic()
+        while not self._stop.is_set() and not self.finished:
+            if self._speed is not None:
+                due = t0_wall + (self._samples[self._index].t - t0_rec) / self._speed
+                delay = due - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+            self.step()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="telemetry-replay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+############################################################
+# Benchmark
+############################################################
+
+@dataclass
+class MotionBenchmark:
+    commands_sent: int
+    stop_time_sec: Optional[float]  # recording time at which the motion primitive returned
+    error_at_stop_deg: Optional[float]  # signed, positive = short of target
+    settle_time_sec: Optional[float]  # first time the replayed yaw stays within tolerance of target
+    max_overshoot_deg: float
+    trace: List[Tuple[float, float]] = field(default_factory=list, repr=False)  # (t, yaw_deg)
+
+
+def benchmark_motion(
+    samples: List[IMUSample],
+    on_lowstate: Callable,
+    motion: Callable[[], object],
+    command_owner: object,
+    command_attr: str,
+    target_yaw_deg: float,
+    tolerance_deg: float = 1.0,
+    speed: Optional[float] = None,
+) -> MotionBenchmark:
+    """Run ``motion`` against a replayed IMU stream and measure how it behaves.
+
+    Every call to ``command_owner.<command_attr>`` (e.g. ``RobotController.send_command``
+    or ``LocoClient.Move``) is counted. With ``speed=None`` the replay advances one
+    sample per command, so the result is fully deterministic and independent of
+    wall-clock timing; otherwise the replay runs in a background thread at the
+    given speed.
+
+    The replayed motion is open loop: the recorded yaw does not react to the
+    commands, so results compare when and how each controller variant decides to
+    stop on identical input.
+    """
+    trace: List[Tuple[float, float]] = []
+    replay: TelemetryReplay
+
+    def _tracing_callback(msg) -> None:
+        sample = replay.current
+        trace.append((sample.t - samples[0].t, sample.yaw_deg))
+        on_lowstate(msg)
+
+    replay = TelemetryReplay(samples, _tracing_callback, speed=speed)
+
+    commands = 0
+    original = getattr(command_owner, command_attr)
+
+    def _counting_command(*args, **kwargs):
+        nonlocal commands
+        commands += 1
+        if speed is None and not replay.step():
+            raise RuntimeError("Replay exhausted before the motion finished.")
+        return original(*args, **kwargs)
+
+    replay.step()  # controllers need an initial yaw before they start
+    setattr(command_owner, command_attr, _counting_command)
+    try:
+        if speed is not None:
+            replay.start()
+        motion()
+        stop_time = trace[-1][0] if trace else None
+        error_at_stop = _wrap_to_180(target_yaw_deg - trace[-1][1]) if trace else None
+    finally:
+        setattr(command_owner, command_attr, original)
+        replay.stop()
+
+    # Play out the rest of the recording to see where the yaw settles
+    while replay.step():
+        pass
+
+    start_error = _wrap_to_180(target_yaw_deg - trace[0][1])
+    direction = 1.0 if start_error >= 0 else -1.0
+
+    max_overshoot = 0.0
+    settle_time = None
+    for t, yaw in trace:
+        error = _wrap_to_180(target_yaw_deg - yaw)
+        max_overshoot = max(max_overshoot, -error * direction)
+        if abs(error) <= tolerance_deg:
+            if settle_time is None:
+                settle_time = t
+        else:
+            settle_time = None
+
+    return MotionBenchmark(
+        commands_sent=commands,
+        stop_time_sec=stop_time,
+        error_at_stop_deg=error_at_stop,
+        settle_time_sec=settle_time,
+        max_overshoot_deg=max_overshoot,
+        trace=trace,
+    )
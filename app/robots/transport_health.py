@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from metrics import LatencyStats, format_seconds
+
+
+class ChannelHealth:
+    """Receive/publish statistics of one DDS channel.
+
+    Subscriber callbacks are wrapped with ``wrap_callback``: every message
+    updates the arrival rate, an RFC 3550 style smoothed inter-arrival jitter
+    and the callback execution time, and an exception raised by the callback is
+    counted as a parse failure instead of disappearing. With ``expected_hz``, a
+    gap of more than 1.5 periods is counted as missed messages. Publishers call
+    ``record_publish`` (or use ``wrap_publish``).
+    """
+
+    def __init__(self, name: str, expected_hz: Optional[float] = None, max_samples: int = 1000) -> None:
+        self.name = name
+        self.expected_hz = expected_hz
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.parse_failures = 0
+        self.missed = 0  # estimated from arrival gaps, needs expected_hz
+        self.last_error: Optional[str] = None
+        self.interarrival = LatencyStats(max_samples)
+        self.callback_time = LatencyStats(max_samples)
+        self.jitter_sec = 0.0
+        self._last_arrival: Optional[float] = None
+        self._last_interarrival: Optional[float] = None
+
+        self.published = 0
+        self.publish_failures = 0
+        self.publish_interval = LatencyStats(max_samples)
+        self._last_publish: Optional[float] = None
+
+    # ------------------------------------------------------------------
+
+    def _arrival(self, now: float) -> None:
+        with self._lock:
+            self.received += 1
+            if self._last_arrival is not None:
+                dt = now - self._last_arrival
+                self.interarrival.add(dt)
+                if self._last_interarrival is not None:
+                    self.jitter_sec += (abs(dt - self._last_interarrival) - self.jitter_sec) / 16.0
+                self._last_interarrival = dt
+                if self.expected_hz and dt * self.expected_hz > 1.5:
+                    self.missed += int(round(dt * self.expected_hz)) - 1
+            self._last_arrival = now
+
+    def wrap_callback(self, callback: Callable[[Any], None]) -> Callable[[Any], None]:
+        def _measured_callback(msg: Any) -> None:
+            start = time.monotonic()
+            self._arrival(start)
+            try:
+                callback(msg)
+            except Exception as e:
+                with self._lock:
+                    self.parse_failures += 1
+                    first = self.parse_failures == 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if first:
+                    print(f"[TransportHealth] {self.name}: callback failed ({self.last_error}), further failures are only counted")
+            finally:
+                self.callback_time.add(time.monotonic() - start)
+        return _measured_callback
+
+    def record_publish(self, ok: bool = True) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not ok:
+                self.publish_failures += 1
+                return
+            self.published += 1
+            if self._last_publish is not None:
+                self.publish_interval.add(now - self._last_publish)
+            self._last_publish = now
+
+    def wrap_publish(self, write: Callable[..., Any]) -> Callable[..., Any]:
+        def _measured_write(*args: Any, **kwargs: Any) -> Any:
+            try:
+                result = write(*args, **kwargs)
+            except Exception:
+                self.record_publish(ok=False)
+                raise
+            self.record_publish()
+            return result
+        return _measured_write
+
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            last_arrival, last_publish = self._last_arrival, self._last_publish
+            snapshot = {
+                "received": self.received,
+                "parse_failures": self.parse_failures,
+                "missed": self.missed if self.expected_hz else None,
+                "jitter": self.jitter_sec if self.received > 2 else None,
+                "last_error": self.last_error,
+                "published": self.published,
+                "publish_failures": self.publish_failures,
+            }
+        mean_interarrival = self.interarrival.mean
+        mean_publish = self.publish_interval.mean
+        snapshot.update({
+            "rate_hz": 1.0 / mean_interarrival if mean_interarrival else None,
+            "expected_hz": self.expected_hz,
+            "age": now - last_arrival if last_arrival is not None else None,
+            "interarrival_p99": self.interarrival.percentile(99),
+            "callback_p50": self.callback_time.percentile(50),
+            "callback_max": self.callback_time.percentile(100),
+            "publish_rate_hz": 1.0 / mean_publish if mean_publish else None,
+            "publish_age": now - last_publish if last_publish is not None else None,
+        })
+        return snapshot
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        parts = []
+        if s["received"]:
+            rate = "-" if s["rate_hz"] is None else f"{s['rate_hz']:.1f}Hz"
+            expected = "" if s["expected_hz"] is None else f"/{s['expected_hz']:.0f}Hz, {s['missed']} missed"
+            parts.append(
+                f"rx {s['received']} at {rate}{expected}, jitter {format_seconds(s['jitter'])}, "
+                f"age {format_seconds(s['age'])}, callback p50={format_seconds(s['callback_p50'])} "
+                f"max={format_seconds(s['callback_max'])}, {s['parse_failures']} parse failures"
+            )
+        if s["published"] or s["publish_failures"]:
+            rate = "-" if s["publish_rate_hz"] is None else f"{s['publish_rate_hz']:.1f}Hz"
+            parts.append(f"tx {s['published']} at {rate}, {s['publish_failures']} failures")
+        return f"{self.name}: " + ("; ".join(parts) if parts else "no traffic")
+
+
+class TransportHealth:
+    """Registry of the DDS channels a process opens, with an optional periodic log line."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._channels: Dict[str, ChannelHealth] = {}
+        self._log_thread: Optional[threading.Thread] = None
+        self._log_stop = threading.Event()
+
+    def channel(self, name: str, expected_hz: Optional[float] = None) -> ChannelHealth:
+        """Statistics of channel ``name``, created on first use."""
+        with self._lock:
+            health = self._channels.get(name)
+            if health is None:
+                health = self._channels[name] = ChannelHealth(name, expected_hz)
+            elif expected_hz is not None:
+                health.expected_hz = expected_hz
+            return health
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            channels = list(self._channels.values())
+        return {health.name: health.snapshot() for health in channels}
+
+    def summary(self) -> str:
+        with self._lock:
+            channels = list(self._channels.values())
+        return "Transport health: " + (" | ".join(health.summary() for health in channels) if channels else "no channels")
+
+    def start_logging(self, interval_sec: float) -> None:
+        """Print ``summary()`` every ``interval_sec`` seconds from a daemon thread."""
+        if self._log_thread is not None or interval_sec <= 0:
+            return
+        self._log_stop.clear()
+
+        def _log() -> None:
+            while not self._log_stop.wait(interval_sec):
+                print(f"[TransportHealth] {self.summary()}")
+
+        self._log_thread = threading.Thread(target=_log, name="transport-health", daemon=True)
+        self._log_thread.start()
+
+    def stop_logging(self) -> None:
+        self._log_stop.set()
+        if self._log_thread is not None:
+            self._log_thread.join(1.0)
+            self._log_thread = None
+
+
+transport_health = TransportHealth()
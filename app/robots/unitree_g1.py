@@ -8,6 +8,14 @@ from unitree_sdk2py.core.channel import ChannelFactoryInitialize, ChannelSubscri
 from unitree_sdk2py.g1.loco.g1_loco_client import LocoClient
 from unitree_sdk2py.idl.unitree_hg.msg.dds_ import LowState_
 
+from config import settings as conf
+from robot_state import LastCommand
+from robots.motion_report import MotionOutcome
+from robots.spatial_memory import DeadReckoning, SpatialMemory, add_spatial_memory_tools
+from robots.stop_channel import MotionStopped, stop_channel
+from robots.transport_health import transport_health
+from robots.velocity_stream import LoopRate, VelocityStreamer
+
 NETWORK_INTERFACE = None
 
 ChannelFactoryInitialize(0, NETWORK_INTERFACE)
@@ -16,11 +24,23 @@ sport_client: LocoClient = LocoClient()
 sport_client.SetTimeout(10.0)
 sport_client.Init()
 
+# Optionally send Move RPCs from a background thread so control loops do not wait on round trips
+velocity_stream: Optional[VelocityStreamer] = None
+if conf.VELOCITY_STREAMING:
+    velocity_stream = VelocityStreamer(lambda vx, vy, vyaw: sport_client.Move(vx, vy, vyaw, True), sport_client.StopMove)
+    stop_channel.add_handler(velocity_stream.emergency_stop, blocking=True)  # StopMove can wait up to the RPC timeout
+else:
+    stop_channel.add_handler(sport_client.StopMove, blocking=True)
+rotation_loop = LoopRate()
+last_command = LastCommand()
+pose_tracker = DeadReckoning(speed_mps=0.3, get_yaw_deg=lambda: None if _latest_yaw_rad is None else math.degrees(_latest_yaw_rad))
+spatial_memory = SpatialMemory(conf.SPATIAL_MEMORY_SIZE, conf.SPATIAL_MEMORY_OBSERVATIONS, thumbnail_px=conf.SPATIAL_MEMORY_THUMBNAIL_PX)
+
 
 _imu_lock = threading.Lock()
 _latest_yaw_rad: Optional[float] = None
 _latest_rpy_rad: Optional[Tuple[float, float, float]] = None
-_latest_lowstate_ts: float = 0.0
+_latest_lowstate_ts: float = 0.0  # time.monotonic() of the last IMU sample
 
 
 def _wrap_to_180(angle_deg: float) -> float:
@@ -29,20 +49,18 @@ def _wrap_to_180(angle_deg: float) -> float:
 
 def _on_lowstate(msg: LowState_) -> None:
     global _latest_yaw_rad, _latest_rpy_rad, _latest_lowstate_ts
-    try:
-        rpy = msg.imu_state.rpy
-        r, p, y = float(rpy[0]), float(rpy[1]), float(rpy[2])
-    except Exception:
-        return
+    rpy = msg.imu_state.rpy  # malformed messages raise and are counted by transport_health
+    r, p, y = float(rpy[0]), float(rpy[1]), float(rpy[2])
 
     with _imu_lock:
         _latest_rpy_rad = (r, p, y)
         _latest_yaw_rad = y
-        _latest_lowstate_ts = time.time()
+        _latest_lowstate_ts = time.monotonic()
 
 
 _lowstate_sub = ChannelSubscriber("rt/lowstate", LowState_)
-_lowstate_sub.Init(_on_lowstate, 32)
+_lowstate_sub.Init(transport_health.channel("rt/lowstate", expected_hz=500.0).wrap_callback(_on_lowstate), 32)
+transport_health.start_logging(conf.TRANSPORT_HEALTH_LOG_SEC)
 
 
 def get_yaw_deg() -> float:
@@ -64,26 +82,56 @@ def get_rpy_deg() -> Tuple[float, float, float]:
 
     return (math.degrees(rpy[0]), math.degrees(rpy[1]), math.degrees(rpy[2]))
 
-def rotate_to(target_deg: float, yaw_speed: float = 0.8, tolerance_deg: float = 1.0, timeout_sec: float = 10.0) -> None:
+def _commands_sent() -> int:
+    return velocity_stream.sent if velocity_stream is not None else 0
+
+
+def rotate_to(target_deg: float, yaw_speed: float = 0.8, tolerance_deg: float = 1.0, timeout_sec: float = 10.0) -> Tuple[str, int]:
+    """Turn to an absolute heading. Returns why it ended ("tolerance" or "timeout") and the number of commands sent."""
     start_time = time.time()
+    sent_before = _commands_sent()
+    moves = 0
 
     c = sport_client
+    stop_channel.check()
+    rotation_loop.reset()
     while True:
+        rotation_loop.tick()
         if time.time() - start_time > timeout_sec:
-            c.StopMove()
-            raise Exception("rotate_to timed out")
+            termination = "timeout"
+            break
 
         current = get_yaw_deg()
         error = _wrap_to_180(target_deg - current)
         if abs(error) <= tolerance_deg:
+            termination = "tolerance"
             break
 
         vyaw = yaw_speed if error > 0.0 else -yaw_speed
-        c.Move(0.0, 0.0, vyaw, True)
-        time.sleep(0.02)
+        if velocity_stream is not None:
+            velocity_stream.set_velocity(0.0, 0.0, vyaw)  # sent only when it changes
+        else:
+            c.Move(0.0, 0.0, vyaw, True)
+            moves += 1
+        if stop_channel.wait(0.02):
+            _stop_move()  # a Move may have raced the stop handler
+            stop_channel.check()
+
+    _stop_move()
+    print(f"[UnitreeRobot] Rotation {rotation_loop.summary()}")
+    if velocity_stream is not None:
+        print(f"[UnitreeRobot] {velocity_stream.summary()}")
+    stop_channel.wait(0.2)
+    # The stream counts its own RPCs including the stop; direct calls add one StopMove
+    return termination, (_commands_sent() - sent_before if velocity_stream is not None else moves + 1)
 
-    c.StopMove()
-    time.sleep(0.2)
+
+def _stop_move() -> None:
+    """Stop and make sure no queued velocity command is sent after it."""
+    if velocity_stream is not None:
+        velocity_stream.halt(wait=True)
+    else:
+        sport_client.StopMove()
 
 
 
@@ -94,12 +142,52 @@ def rotate_to(target_deg: float, yaw_speed: float = 0.8, tolerance_deg: float =
 toolset = FunctionToolset()
 toolset.metadata = {}
 toolset.metadata["robot_description"] = "Unitree G1 robot. Uses simple LocoClient commands from the G1 example."
+toolset.metadata["fast_path"] = {
+    "walk": {"phrases": ["walk", "go", "move"]},
+    "rotate": {"phrases": ["rotate", "turn"], "signs": {"delta_deg": {"left": 1, "right": -1}}},
+    "get_rotation": {"phrases": ["rotation", "heading"], "reply": "My current rotation is {result:.0f} degrees."},
+}
+toolset.metadata["speculative_tools"] = ["walk", "rotate", "get_rotation", "recall_places", "nearby_places"]
+toolset.metadata["cacheable_results"] = [MotionOutcome]  # reports the plan cache replays and answers from (see plan_cache.py)
+toolset.metadata["tool_groups"] = {
+    "motion": {
+        "tools": ["walk", "rotate", "get_rotation", "damp"],
+        "words": ["walk", "go", "move", "step", "come", "turn", "rotate", "spin", "face", "facing", "heading", "rotation",
+                  "left", "right", "forward", "backward", "back", "around", "degrees", "meter", "meters", "stop", "damp", "relax"],
+    },
+    "memory": {
+        "tools": ["remember_place", "recall_places", "nearby_places"],
+        "words": ["remember", "recall", "place", "where", "return", "back", "nearby", "near", "been", "door", "find"],
+    },
+}
+
+
+def _state_rpy() -> Optional[str]:
+    with _imu_lock:
+        rpy = _latest_rpy_rad
+    return None if rpy is None else "/".join(f"{math.degrees(v):.1f}" for v in rpy) + "°"
+
+
+def _state_imu_age() -> Optional[str]:
+    with _imu_lock:
+        ts = _latest_lowstate_ts
+    return f"{time.monotonic() - ts:.2f}s" if ts else None
 
 
+toolset.metadata["state_fields"] = {
+    "yaw": lambda: None if _latest_yaw_rad is None else f"{math.degrees(_latest_yaw_rad):.1f}°",
+    "rpy": _state_rpy,
+    "last_command": last_command.describe,
+    "position": pose_tracker.describe,
+    "imu_age": _state_imu_age,
+}
 
-def walk(direction: Literal["forward", "backward", "left", "right"], duration_sec: float) -> None:
+
+
+def walk(direction: Literal["forward", "backward", "left", "right"], duration_sec: float) -> MotionOutcome:
     """
     Walk the robot in the specified direction for a given duration and speed.
+    Returns the estimated distance, final heading and elapsed time.
     """
     
     print(f"[UnitreeRobot] Walking {direction} for {duration_sec} seconds")
@@ -107,6 +195,7 @@ def walk(direction: Literal["forward", "backward", "left", "right"], duration_se
         raise ModelRetry("duration_sec must be > 0")
 
     speed = 0.3  # same scale as the example
+    last_command.start(f"walk {direction} {duration_sec}s")
     vx, vy = 0.0, 0.0
 
     if direction == "forward":
@@ -118,45 +207,91 @@ def walk(direction: Literal["forward", "backward", "left", "right"], duration_se
     elif direction == "right":
         vy = -speed
 
+    yaw = pose_tracker.yaw_deg()
+    started = time.monotonic()
+    sent_before = _commands_sent()
     try:
         c = sport_client
-        c.Move(vx, vy, 0.0, True)  # continuous move
-        time.sleep(duration_sec)
-        c.StopMove()
+        stop_channel.check()
+        if velocity_stream is not None:
+            velocity_stream.set_velocity(vx, vy, 0.0)
+        else:
+            c.Move(vx, vy, 0.0, True)  # continuous move
+        stopped = stop_channel.wait(duration_sec)
+        _stop_move()
+        if stopped:
+            stop_channel.check()
         print("Finished walking")
+        last_command.finish()
+    except MotionStopped:
+        last_command.finish("stopped")
+        print("[UnitreeRobot] Walking stopped")
+        raise
     except Exception as e:
+        last_command.finish("failed")
         try:
-            sport_client.StopMove()
+            _stop_move()
         except Exception:
             pass
         print(f"[UnitreeRobot] Error while walking: {e}")
         raise ModelRetry(f"Error while walking: {e}")
+    finally:
+        pose_tracker.walked(direction, min(duration_sec, time.monotonic() - started), yaw)
 
+    return MotionOutcome(
+        action=f"walk {direction}",
+        termination="duration",
+        elapsed_sec=time.monotonic() - started,
+        commands_sent=_commands_sent() - sent_before if velocity_stream is not None else 2,  # Move + StopMove
+        final_heading_deg=get_yaw_deg(),
+        distance_m=speed * duration_sec,
+    )
 
 
 
-def rotate(delta_deg: float) -> None:
+
+def rotate(delta_deg: float) -> MotionOutcome:
     """
     Rotate in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation.
+    Returns the measured rotation and the final heading, no need to check them with get_rotation.
     """
     
     if delta_deg < -180.0 or delta_deg > 180.0:
         raise ModelRetry("delta_deg must be in range [-180, 180]")
     
     print(f"[UnitreeRobot] Rotating {delta_deg} degrees")
+    last_command.start(f"rotate {delta_deg:+.0f}°")
 
+    started = time.monotonic()
     try:
         current = get_yaw_deg()
         target = _wrap_to_180(current + delta_deg)
-        rotate_to(target)
+        termination, commands = rotate_to(target)
+        last_command.finish("done" if termination == "tolerance" else termination)
     
+    except MotionStopped:
+        last_command.finish("stopped")
+        print("[UnitreeRobot] Rotation stopped")
+        raise
     except Exception as e:
+        last_command.finish("failed")
         try:
-            sport_client.StopMove()
+            _stop_move()
         except Exception:
             pass
         print(f"[UnitreeRobot] Error while rotating: {e}")
         raise ModelRetry(f"Error while rotating to target: {e}")
+
+    final = get_yaw_deg()
+    return MotionOutcome(
+        action=f"rotate {delta_deg:+.0f}°",
+        termination=termination,
+        elapsed_sec=time.monotonic() - started,
+        commands_sent=commands,
+        requested_deg=delta_deg,
+        yaw_delta_deg=_wrap_to_180(final - current),
+        final_heading_deg=final,
+    )
     
 
 def get_rotation() -> float:
@@ -173,13 +308,16 @@ def get_rotation() -> float:
         raise ModelRetry(f"Error while getting rotation: {e}")
 
 
-def damp() -> None:
+def damp() -> MotionOutcome:
+    """Switch the motors to damping mode."""
+    started = time.monotonic()
     try:
         print("[UnitreeRobot] Damping")
         sport_client.Damp()
     except Exception as e:
         print(f"[UnitreeRobot] Error while damping: {e}")
         raise ModelRetry(f"Error in damp: {e}")
+    return MotionOutcome(action="damp", termination="done", elapsed_sec=time.monotonic() - started, commands_sent=1)
 
 
 # def squat_to_stand() -> None:
@@ -252,6 +390,7 @@ toolset.add_function(walk)
 toolset.add_function(rotate)
 toolset.add_function(get_rotation)
 toolset.add_function(damp)
+add_spatial_memory_tools(toolset, spatial_memory, pose_tracker)  # no camera: places are stored without thumbnails
 # toolset.add_function(squat_to_stand)
 # toolset.add_function(stand_to_squat)
 # toolset.add_function(low_stand)
@@ -7,12 +7,21 @@ import logging_mp
 
 import cv2
 from pydantic_ai import BinaryContent, FunctionToolset, ModelRetry
-from teleimager.image_client import ImageClient
 
 from unitree_sdk2py.core.channel import ChannelPublisher, ChannelSubscriber, ChannelFactoryInitialize
 from unitree_sdk2py.idl.std_msgs.msg.dds_ import String_
 from unitree_sdk2py.idl.unitree_hg.msg.dds_ import LowState_
 
+from config import settings as conf
+from robot_state import LastCommand
+from robots.control_process import ControlProcess, command_data
+from robots.motion_report import MotionOutcome
+from robots.perception import DEFAULT_BLOB_COLORS, MarkerDetector, describe_detections
+from robots.spatial_memory import DeadReckoning, SpatialMemory, add_spatial_memory_tools
+from robots.stop_channel import MotionStopped, stop_channel
+from robots.teleimager_snapshot import TeleImagerSnapshotClient
+from robots.transport_health import transport_health
+
 
 def _quat_xyzw_to_yaw_rad(x: float, y: float, z: float, w: float) -> float:
     """Convert quaternion (x, y, z, w) to yaw (radians)."""
@@ -39,22 +48,37 @@ class RobotController:
         self,
         domain_id: int = 1,
         topic: str = "rt/run_command/cmd",
-        lowstate_topic: str = "rt/lowstate",
+        lowstate_topic: Optional[str] = "rt/lowstate",
         default_height: float = -0.5,
         rate_hz: float = 100.0,
+        control_process: bool = False,
+        health_log_sec: float = 0.0,
     ) -> None:
-        # HighState DDS publisher for movement commands
-        ChannelFactoryInitialize(domain_id)
-        self._publisher = ChannelPublisher(topic, String_)
-        self._publisher.Init()
-
-        # LowState DDS subscriber for IMU yaw feedback
         self._yaw_lock = threading.Lock()
         self._latest_yaw_rad: Optional[float] = None
-        self._latest_lowstate_ts: float = 0.0
-
-        self._lowstate_sub = ChannelSubscriber(lowstate_topic, LowState_)
-        self._lowstate_sub.Init(self._on_lowstate, 32)
+        self._latest_rpy_rad: Optional[Tuple[float, float, float]] = None
+        self._latest_lowstate_ts: float = 0.0  # time.monotonic() of the last IMU sample
+
+        # Optionally publish commands and read the IMU from a separate process, away from the agent's GIL
+        self._control: Optional[ControlProcess] = None
+        self._publisher = None
+        self._lowstate_sub = None
+        if control_process:
+            self._control = ControlProcess(rate_hz, domain_id, topic, lowstate_topic, default_height, health_log_sec)
+            self._control_imu = lowstate_topic is not None
+        else:
+            # HighState DDS publisher for movement commands
+            ChannelFactoryInitialize(domain_id)
+            self._publisher = ChannelPublisher(topic, String_)
+            self._publisher.Init()
+            self._write = transport_health.channel(topic).wrap_publish(self._publisher.Write)
+
+            # LowState DDS subscriber for IMU yaw feedback.
+            # Without a topic the IMU stream is fed externally (e.g. by telemetry_replay)
+            if lowstate_topic is not None:
+                self._lowstate_sub = ChannelSubscriber(lowstate_topic, LowState_)
+                self._lowstate_sub.Init(transport_health.channel(lowstate_topic).wrap_callback(self._on_lowstate), 32)
+            transport_health.start_logging(health_log_sec)
 
         self._default_height = float(default_height)
         self.tolerance_deg = 0.85
@@ -62,16 +86,15 @@ class RobotController:
         self._period = 1.0 / rate_hz if rate_hz > 0 else 0.01
 
     def _on_lowstate(self, msg: LowState_) -> None:
-        """DDS callback: cache latest yaw from IMU quaternion."""
-        try:
-            q = msg.imu_state.quaternion
-            # unitree_sim_isaaclab/dds/g1_robot_dds.py publishes quaternion as [x, y, z, w]
-            yaw = _quat_xyzw_to_yaw_rad(float(q[0]), float(q[1]), float(q[2]), float(q[3]))
-            with self._yaw_lock:
-                self._latest_yaw_rad = yaw
-                self._latest_lowstate_ts = time.time()
-        except Exception:
-            return
+        """DDS callback: cache latest yaw from IMU quaternion. Malformed messages raise and are counted by transport_health."""
+        q = msg.imu_state.quaternion
+        # unitree_sim_isaaclab/dds/g1_robot_dds.py publishes quaternion as [x, y, z, w]
+        yaw = _quat_xyzw_to_yaw_rad(float(q[0]), float(q[1]), float(q[2]), float(q[3]))
+        rpy = tuple(float(v) for v in msg.imu_state.rpy)
+        with self._yaw_lock:
+            self._latest_yaw_rad = yaw
+            self._latest_rpy_rad = rpy
+            self._latest_lowstate_ts = time.monotonic()
 
     # ------------------------------------------------------------------
 
@@ -85,14 +108,12 @@ class RobotController:
         if height is None:
             height = self._default_height
 
-        commands_list = [
-            float(x_vel),
-            -float(y_vel),
-            -float(yaw_vel),
-            float(height),
-        ]
-        msg = String_(data=str(commands_list))
-        self._publisher.Write(msg)
+        if self._control is not None:
+            self._control.set_velocity(x_vel, y_vel, yaw_vel, height)  # published by the control loop
+            return
+
+        msg = String_(data=command_data(x_vel, y_vel, yaw_vel, height))
+        self._write(msg)
 
     def move_for_duration(
         self,
@@ -101,24 +122,40 @@ class RobotController:
         y_vel: float = 0.0,
         yaw_vel: float = 0.0,
         height: Optional[float] = None,
-    ) -> None:
-        """Send a constant velocity command for a given duration, then stop."""
+    ) -> int:
+        """Send a constant velocity command for a given duration, then stop. Returns the number of commands sent."""
+        stop_channel.check()
+        commands = 0
         end_time = time.time() + float(duration_sec)
         while time.time() < end_time:
             self.send_command(x_vel=x_vel, y_vel=y_vel, yaw_vel=yaw_vel, height=height)
-            time.sleep(self._period)
+            commands += 1
+            if stop_channel.wait(self._period):
+                self._abort(height)
 
         # Send a final stop command (zero velocities, keep height)
         self.stop(height=height)
+        return commands + 1
         
     def stop(self, height: Optional[float] = None) -> None:
         """Send a zero-velocity command"""
 
+        if self._control is not None:
+            self._control.stop(height)
+            return
         self.send_command(0.0, 0.0, 0.0, height)
+
+    def _abort(self, height: Optional[float] = None) -> None:
+        """Stop after the stop channel fired; overrides a velocity command that raced the stop handler."""
+        self.stop(height=height)
+        stop_channel.check()
         
         
     def get_yaw_rad(self) -> Optional[float]:
         """Get latest yaw (radians) from rt/lowstate, or None if not available yet."""
+        if self._control is not None and self._control_imu:
+            imu = self._control.get_imu()
+            return None if imu is None else _quat_xyzw_to_yaw_rad(*imu[0])
         with self._yaw_lock:
             return self._latest_yaw_rad
 
@@ -126,6 +163,24 @@ class RobotController:
         """Get latest yaw (degrees) from rt/lowstate, or None if not available yet."""
         yaw = self.get_yaw_rad()
         return None if yaw is None else math.degrees(yaw)
+
+    def get_rpy_deg(self) -> Optional[Tuple[float, float, float]]:
+        """Get latest roll, pitch, yaw (degrees) from rt/lowstate, or None if not available yet."""
+        if self._control is not None and self._control_imu:
+            imu = self._control.get_imu()
+            rpy = None if imu is None else imu[1]
+        else:
+            with self._yaw_lock:
+                rpy = self._latest_rpy_rad
+        return None if rpy is None else tuple(math.degrees(v) for v in rpy)
+
+    def imu_age_sec(self) -> Optional[float]:
+        """Seconds since the last IMU sample, or None if none arrived yet."""
+        if self._control is not None and self._control_imu:
+            imu = self._control.get_imu()
+            return None if imu is None else time.monotonic() - imu[2]
+        with self._yaw_lock:
+            return time.monotonic() - self._latest_lowstate_ts if self._latest_lowstate_ts else None
     
     
     def rotate(
@@ -133,8 +188,12 @@ class RobotController:
         degrees: float,
         yaw_speed: float = 2.0,
         height: Optional[float] = None,
-    ) -> None:
-        """Rotate in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation."""
+        timeout_sec: float = 15.0,
+    ) -> Tuple[str, int]:
+        """Rotate in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation.
+
+        Returns why the loop ended ("tolerance", "overshoot" or "timeout") and the number of commands sent.
+        """
         
         if degrees > 180.0 or degrees < -180.0:
             raise ValueError("Rotation degrees must be in range <-180, +180>.")
@@ -142,6 +201,8 @@ class RobotController:
         if height is None:
             height = self._default_height
 
+        stop_channel.check()
+
         # Try to get current yaw in degrees
         current = self.get_yaw_deg()
         
@@ -155,6 +216,8 @@ class RobotController:
         # Initial direction based on desired delta
         cmd = (abs(yaw_speed) if degrees < 0.0 else -abs(yaw_speed))
 
+        commands = 0
+        deadline = time.monotonic() + timeout_sec
         while True:
             current = self.get_yaw_deg()
 
@@ -163,66 +226,39 @@ class RobotController:
                 # Stop if within tolerance
                 if abs(error) <= self.tolerance_deg:
                     # print("Primary stop triggered")
+                    termination = "tolerance"
                     break
                 # print(f"Current: {current:.2f}°, Target: {target:.2f}°, Error: {error:.2f}°")
                 # Fallback if we overshoot
                 if (error * desired_sign) < 0.0:
                     # print("Fallback stop triggered")
+                    termination = "overshoot"
                     break
+            if time.monotonic() > deadline:
+                termination = "timeout"
+                break
 
             # Command yaw rate, keep x/y zero
             self.send_command(x_vel=0.0, y_vel=0.0, yaw_vel=cmd, height=height)
-            time.sleep(self._period)
+            commands += 1
+            if stop_channel.wait(self._period):
+                self._abort(height)
 
         self.stop(height=height)
-
-
-############################################################
-# TeleImager
-############################################################
-
-class TeleImagerSnapshotClient:
-    """Small helper around TeleImager's `ImageClient` to fetch frames and save snapshots.
-
-    This is a class-based version of `teleimager_snapshot.py` so it can be used
-    from inside the Unitree simulator robot wrapper.
-    """
-
-    _CAMERA_TO_METHOD = {
-        "head": "get_head_frame",
-        "left": "get_left_wrist_frame",
-        "right": "get_right_wrist_frame",
-    }
-
-    def __init__(self, host: str = "127.0.0.1") -> None:
-        
-        logger = logging.getLogger("teleimager.image_client")
-        logger.setLevel(logging.WARNING)
-        
-        self._host = host
-        self._client = ImageClient(host=host)
-        
- 
-
-    def close(self) -> None:
-        self._client.close()
-
-    def get_frame(self, camera: str = "head") -> Tuple[Optional["cv2.typing.MatLike"], float]:
-        """Return the latest frame (or None) and the receive FPS estimate."""
-        if camera not in self._CAMERA_TO_METHOD:
-            raise ValueError(f"Unknown camera '{camera}'. Expected one of {sorted(self._CAMERA_TO_METHOD)}")
-        method = getattr(self._client, self._CAMERA_TO_METHOD[camera])
-        img, fps = method()
-        return img, float(fps)
-
+        return termination, commands + 1
 
 
 ############################################################
 # Instances
 ############################################################
 
-robot_controller = RobotController()
+robot_controller = RobotController(control_process=conf.CONTROL_PROCESS, health_log_sec=conf.TRANSPORT_HEALTH_LOG_SEC)
+stop_channel.add_handler(robot_controller.stop)
 teleimager_client = TeleImagerSnapshotClient(host="127.0.0.1")
+marker_detector = MarkerDetector(blob_colors=DEFAULT_BLOB_COLORS)
+last_command = LastCommand()
+pose_tracker = DeadReckoning(speed_mps=0.25, get_yaw_deg=robot_controller.get_yaw_deg)  # walk() covers ~1 m in 4 s
+spatial_memory = SpatialMemory(conf.SPATIAL_MEMORY_SIZE, conf.SPATIAL_MEMORY_OBSERVATIONS, thumbnail_px=conf.SPATIAL_MEMORY_THUMBNAIL_PX)
 
 
 
@@ -233,33 +269,91 @@ teleimager_client = TeleImagerSnapshotClient(host="127.0.0.1")
 toolset = FunctionToolset()
 toolset.metadata = {}
 toolset.metadata["robot_description"] = "Unitree G1 robot. Supports basic movement commands."
+toolset.metadata["fast_path"] = {
+    "walk": {"phrases": ["walk", "go", "move"]},
+    "rotate": {"phrases": ["rotate", "turn"], "signs": {"angle": {"left": 1, "right": -1}}},
+    "get_rotation": {"phrases": ["rotation", "heading"], "reply": "My current rotation is {result:.0f} degrees."},
+}
+toolset.metadata["speculative_tools"] = ["walk", "rotate", "get_rotation", "detect_markers", "recall_places", "nearby_places"]
+toolset.metadata["cacheable_results"] = [MotionOutcome]  # reports the plan cache replays and answers from (see plan_cache.py)
+toolset.metadata["tool_groups"] = {
+    "motion": {
+        "tools": ["walk", "rotate", "get_rotation"],
+        "words": ["walk", "go", "move", "step", "come", "turn", "rotate", "spin", "face", "facing", "heading", "rotation",
+                  "left", "right", "forward", "backward", "back", "around", "degrees", "meter", "meters", "stop"],
+    },
+    "vision": {
+        "tools": ["get_camera_snapshot", "detect_markers"],
+        "words": ["see", "look", "camera", "snapshot", "picture", "photo", "image", "view", "marker", "color", "colour",
+                  "red", "green", "blue", "yellow", "object", "find", "front", "show"],
+    },
+    "memory": {
+        "tools": ["remember_place", "recall_places", "nearby_places", "show_place"],
+        "words": ["remember", "recall", "place", "where", "return", "back", "nearby", "near", "been", "door", "find", "saw", "seen"],
+    },
+}
+
+
+def _format_rpy(rpy: Optional[Tuple[float, float, float]]) -> Optional[str]:
+    return None if rpy is None else "/".join(f"{v:.1f}" for v in rpy) + "°"
+
+
+toolset.metadata["state_fields"] = {
+    "yaw": lambda: None if (yaw := robot_controller.get_yaw_deg()) is None else f"{yaw:.1f}°",
+    "rpy": lambda: _format_rpy(robot_controller.get_rpy_deg()),
+    "last_command": last_command.describe,
+    "position": pose_tracker.describe,
+    "imu_age": lambda: None if (age := robot_controller.imu_age_sec()) is None else f"{age:.2f}s",
+    "camera_fps": lambda: f"{teleimager_client.get_fps('head'):.1f}",
+}
 
         
    
    
    
-def walk(direction: Literal["forward", "backward", "left", "right"], duration_sec: float) -> None:
+def walk(direction: Literal["forward", "backward", "left", "right"], duration_sec: float) -> MotionOutcome:
     """
     Walk the robot in the specified direction for a given duration.
     4 seconds of walking roughly equates to 1 meter.
+    Returns the estimated distance, final heading and elapsed time.
     """
     
     speed = 1
     print(f"[UnitreeRobot] Walking {direction} for {duration_sec} seconds")
+    last_command.start(f"walk {direction} {duration_sec}s")
+    yaw = pose_tracker.yaw_deg()
+    started = time.monotonic()
     
     try:
         match direction:
             case "forward":
-                robot_controller.move_for_duration(duration_sec, x_vel=abs(speed), y_vel=0.0, yaw_vel=0.0)
+                commands = robot_controller.move_for_duration(duration_sec, x_vel=abs(speed), y_vel=0.0, yaw_vel=0.0)
             case "backward":
-                robot_controller.move_for_duration(duration_sec, x_vel=-abs(speed), y_vel=0.0, yaw_vel=0.0)
+                commands = robot_controller.move_for_duration(duration_sec, x_vel=-abs(speed), y_vel=0.0, yaw_vel=0.0)
             case "left":
-                robot_controller.move_for_duration(duration_sec, x_vel=0.0, y_vel=-abs(speed), yaw_vel=0.0)
+                commands = robot_controller.move_for_duration(duration_sec, x_vel=0.0, y_vel=-abs(speed), yaw_vel=0.0)
             case "right":
-                robot_controller.move_for_duration(duration_sec, x_vel=0.0, y_vel=abs(speed), yaw_vel=0.0)
+                commands = robot_controller.move_for_duration(duration_sec, x_vel=0.0, y_vel=abs(speed), yaw_vel=0.0)
+    except MotionStopped:
+        last_command.finish("stopped")
+        print("[UnitreeRobot] Walking stopped")
+        raise
     except Exception as e:
+        last_command.finish("failed")
         print(f"[UnitreeRobot] Error while walking: {e}")
         raise ModelRetry(f"Error while walking: {e}")
+    finally:
+        pose_tracker.walked(direction, min(duration_sec, time.monotonic() - started), yaw)
+    last_command.finish()
+
+    return MotionOutcome(
+        action=f"walk {direction}",
+        termination="duration",
+        elapsed_sec=time.monotonic() - started,
+        commands_sent=commands,
+        final_heading_deg=robot_controller.get_yaw_deg(),
+        distance_m=pose_tracker.speed_mps * duration_sec,
+    )
         
         
 # def crouch(self, duration_sec: float, height_offset: float = -0.6) -> None:
@@ -279,19 +373,42 @@ def walk(direction: Literal["forward", "backward", "left", "right"], duration_se
 #     self.stop(height=self._default_height)
     
 
-def rotate(angle: float) -> None:
-    """Rotate the robot in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation."""
+def rotate(angle: float) -> MotionOutcome:
+    """
+    Rotate the robot in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation.
+    Returns the measured rotation and the final heading, no need to check them with get_rotation.
+    """
     
     speed = 1.5
     print(f"[UnitreeRobot] Rotating {angle} degrees")
+    last_command.start(f"rotate {angle:+.0f}°")
+    started = time.monotonic()
+    start_yaw = robot_controller.get_yaw_deg()
     
     try:
-        robot_controller.rotate(angle, speed)
+        termination, commands = robot_controller.rotate(angle, speed)
+    except MotionStopped:
+        last_command.finish("stopped")
+        print("[UnitreeRobot] Rotation stopped")
+        raise
     except Exception as e:
+        last_command.finish("failed")
         print(f"[UnitreeRobot] Error while rotating: {e}")
         raise ModelRetry(f"Error while rotating: {e}")
     
-    time.sleep(1) # Let the rotation settle
+    stop_channel.wait(1) # Let the rotation settle
+    last_command.finish("timeout" if termination == "timeout" else "done")
+
+    final_yaw = robot_controller.get_yaw_deg()
+    return MotionOutcome(
+        action=f"rotate {angle:+.0f}°",
+        termination=termination,
+        elapsed_sec=time.monotonic() - started,
+        commands_sent=commands,
+        requested_deg=angle,
+        yaw_delta_deg=None if start_yaw is None or final_yaw is None else wrap_to_180(final_yaw - start_yaw),
+        final_heading_deg=final_yaw,
+    )
         
 
         
@@ -308,36 +425,66 @@ def get_rotation() -> float:
     return rotation
         
         
-def get_camera_snapshot() -> BinaryContent:
-    """Get a snapshot from the head camera."""
+def _wait_for_head_frame(timeout_sec: float = 5.0) -> "cv2.typing.MatLike":
+    return teleimager_client.wait_for_frame(camera="head", timeout_sec=timeout_sec)
+
+
+def _remember_observation(label: str, img: "cv2.typing.MatLike") -> None:
+    """Record what the camera saw here for recall_places; a failure only costs the memory entry."""
+    try:
+        spatial_memory.add(label, pose_tracker.pose(), img, observation=True)
+    except Exception as e:
+        print(f"[UnitreeRobot] Could not remember '{label}': {e}")
+
+
+def get_camera_snapshot(label: str = "") -> BinaryContent:
+    """
+    Get a snapshot from the head camera.
+    Pass a short label of what you expect to see, e.g. 'kitchen door', so recall_places can find this spot later;
+    unlabelled snapshots are only listed by nearby_places.
+    """
     print(f"[UnitreeRobot] Getting camera snapshot...")
     try:
-        deadline = time.monotonic() + 5.0
-        last_fps = 0.0
-        while time.monotonic() < deadline:
-            img, fps = teleimager_client.get_frame(camera="head")
-            last_fps = fps
-            if img is not None:
-                ok, buf = cv2.imencode(".png", img)
-                if not ok:
-                    raise RuntimeError("cv2.imencode('.png', img) failed")
-                return BinaryContent(data=buf.tobytes(), media_type="image/png")
-            time.sleep(0.02)
-
-        raise TimeoutError(
-            f"Timed out waiting for head frame after 5.0s (last recv_fps≈{last_fps:.2f}). "
-            "Is the simulator running and the teleimager server enabled?"
-        )
+        img = _wait_for_head_frame()
+        ok, buf = cv2.imencode(".png", img)
+        if not ok:
+            raise RuntimeError("cv2.imencode('.png', img) failed")
     except Exception as e:
         print(f"[UnitreeRobot] Error while getting camera snapshot: {e}")
         raise ModelRetry(f"Error while getting camera snapshot: {e}")
-        
-        
-        
+
+    _remember_observation(f"camera snapshot {label}".strip(), img)
+    return BinaryContent(data=buf.tobytes(), media_type="image/png")
+
+
+def detect_markers() -> str:
+    """
+    Detect fiducial markers (ArUco/AprilTag) and red, green, blue or yellow objects in the head camera view.
+    Returns their IDs or colors, bearing (degrees left/right, usable with rotate) and estimated marker distance.
+    Prefer this over a camera snapshot to locate markers or colored objects.
+    """
+    print(f"[UnitreeRobot] Detecting markers...")
+    try:
+        img = _wait_for_head_frame()
+        detections = marker_detector.detect(img)
+    except Exception as e:
+        print(f"[UnitreeRobot] Error while detecting markers: {e}")
+        raise ModelRetry(f"Error while detecting markers: {e}")
+
+    if detections:  # remembered so recall_places can find the way back to them
+        _remember_observation(", ".join(f"{d.kind} {d.label}" for d in detections), img)
+    result = describe_detections(detections)
+    print(f"[UnitreeRobot] {result}")
+    return result
+
+
+
 toolset.add_function(walk)
 toolset.add_function(rotate)
 toolset.add_function(get_rotation)
 toolset.add_function(get_camera_snapshot)
+toolset.add_function(detect_markers)
+add_spatial_memory_tools(toolset, spatial_memory, pose_tracker, get_frame=_wait_for_head_frame)
         
         
         
@@ -0,0 +1,156 @@
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from metrics import LatencyStats, format_seconds
+
+
+Velocity = Tuple[float, float, float]
+
+
+class VelocityStreamer:
+    """Sends velocity setpoints to a blocking RPC client from a background thread.
+
+    Control loops call ``set_velocity`` every tick and return immediately; the
+    sender thread issues ``move(vx, vy, vyaw)`` only when the setpoint changed,
+    always with the newest value, so a slow RPC round trip delays the command
+    but no longer slows down the loop deciding it. ``halt`` makes the next RPC
+    a ``stop`` and can wait until it went out.
+    """
+
+    def __init__(
+        self,
+        move: Callable[[float, float, float], None],
+        stop: Callable[[], None],
+        keepalive_sec: Optional[float] = None,
+        name: str = "velocity-stream",
+    ) -> None:
+        self._move = move
+        self._stop = stop
+        self._keepalive_sec = keepalive_sec  # resend an unchanged moving setpoint this often, None = never
+
+        self._cond = threading.Condition()
+        self._setpoint: Optional[Velocity] = None  # None = stopped
+        self._version = 0  # bumped on every change
+        self._sent_version = 0
+        self._closed = False
+
+        self.rpc_latency = LatencyStats()
+        self.updates = 0  # set_velocity/halt calls
+        self.sent = 0  # RPCs issued
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+
+    def set_velocity(self, vx: float, vy: float, vyaw: float) -> None:
+        setpoint = (float(vx), float(vy), float(vyaw))
+        with self._cond:
+            self.updates += 1
+            if setpoint == self._setpoint:
+                return
+            self._setpoint = setpoint
+            self._version += 1
+            self._cond.notify_all()
+
+    def halt(self, wait: bool = True, timeout: float = 2.0) -> bool:
+        """Replace the setpoint by a stop. With ``wait``, returns once the stop RPC was sent."""
+        with self._cond:
+            self.updates += 1
+            if self._setpoint is not None or self._sent_version != self._version:
+                self._setpoint = None
+                self._version += 1
+                self._cond.notify_all()
+            if not wait:
+                return True
+            target = self._version
+            return self._cond.wait_for(lambda: self._sent_version >= target or self._closed, timeout)
+
+    def emergency_stop(self) -> None:
+        """Stop handler: stop RPC from the calling thread now, and make sure no queued move follows it."""
+        self.halt(wait=False)
+        self._stop()
+
+    def close(self) -> None:
+        self.halt(wait=True)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(1.0)
+
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        last_sent_at = 0.0
+        while True:
+            with self._cond:
+                while not self._closed and self._sent_version == self._version:
+                    if self._keepalive_sec is None or self._setpoint is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._keepalive_sec - (time.monotonic() - last_sent_at)
+                    if remaining <= 0.0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                setpoint, version = self._setpoint, self._version
+
+            start = time.perf_counter()
+            try:
+                if setpoint is None:
+                    self._stop()
+                else:
+                    self._move(*setpoint)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                print(f"[VelocityStreamer] RPC failed: {e}")
+            self.rpc_latency.add(time.perf_counter() - start)
+            last_sent_at = time.monotonic()
+
+            with self._cond:
+                self.sent += 1
+                self._sent_version = version
+                self._cond.notify_all()
+
+    def summary(self) -> str:
+        return (
+            f"Velocity stream: {self.sent} RPCs for {self.updates} setpoint updates, "
+            f"RPC p50={format_seconds(self.rpc_latency.percentile(50))} "
+            f"p95={format_seconds(self.rpc_latency.percentile(95))}, {self.errors} errors"
+        )
+
+
+class LoopRate:
+    """Achieved rate of a control loop, from the time between ``tick`` calls."""
+
+    def __init__(self) -> None:
+        self.periods = LatencyStats()
+        self._last: Optional[float] = None
+
+    def reset(self) -> None:
+        """Start a new measurement, e.g. for the next rotation; earlier periods are dropped."""
+        self.periods = LatencyStats()
+        self._last = None
+
+    def tick(self) -> None:
+        now = time.perf_counter()
+        if self._last is not None:
+            self.periods.add(now - self._last)
+        self._last = now
+
+    @property
+    def rate_hz(self) -> Optional[float]:
+        mean = self.periods.mean
+        return 1.0 / mean if mean else None
+
+    def summary(self) -> str:
+        rate = self.rate_hz
+        return (
+            f"loop {'-' if rate is None else f'{rate:.1f}Hz'}, "
+            f"period p95={format_seconds(self.periods.percentile(95))} max={format_seconds(self.periods.percentile(100))}"
+        )
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import pydantic_core
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
+
+
+class SessionStore:
+    """Message histories on disk, with binary content moved into a content-addressed blob directory.
+
+    Layout: ``<root>/<session_id>.jsonl`` holds one serialized message per line
+    (pydantic-ai's message adapter, binary data replaced by a ``blob`` digest)
+    and ``<root>/blobs/ab/abcdef...`` holds each distinct payload once, so the
+    same snapshot taken twice is stored once. Appending a turn writes only the
+    new messages. ``load`` reads only the blobs of the newest ``keep_images``
+    payloads; older ones, and blobs that are missing or damaged, become a short
+    text reference the model can still see (a ``TextPart`` in place of a file
+    the model generated).
+    """
+
+    def __init__(self, root: str, keep_images: Optional[int] = None) -> None:
+        self._root = root
+        self._blob_root = os.path.join(root, "blobs")
+        self.keep_images = keep_images
+        os.makedirs(self._blob_root, exist_ok=True)
+        self._lengths: Dict[str, int] = {}  # messages stored per session
+
+    def _session_path(self, session_id: str) -> str:
+        if not session_id or os.sep in session_id or session_id.startswith("."):
+            raise ValueError(f"Invalid session id {session_id!r}")
+        return os.path.join(self._root, f"{session_id}.jsonl")
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_root, digest[:2], digest)
+
+    def sessions(self) -> List[str]:
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(self._root) if name.endswith(".jsonl"))
+
+    # ------------------------------------------------------------------
+
+    def _put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _extract_blobs(self, node: Any) -> Any:
+        """Replace the bytes of every serialized ``BinaryContent`` by a blob digest."""
+        if isinstance(node, dict):
+            if node.get("kind") == "binary" and isinstance(node.get("data"), bytes):
+                return {**node, "data": b"", "blob": self._put_blob(node["data"])}
+            return {key: self._extract_blobs(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self._extract_blobs(value) for value in node]
+        return node
+
+    def _serialize(self, messages: List[ModelMessage]) -> bytes:
+        lines = [
+            pydantic_core.to_json(self._extract_blobs(message))
+            for message in ModelMessagesTypeAdapter.dump_python(messages, mode="python")
+        ]
+        return b"".join(line + b"\n" for line in lines)
+
+    def save(self, session_id: str, messages: List[ModelMessage]) -> None:
+        """Replace the stored history of ``session_id``."""
+        path = self._session_path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._serialize(messages))
+        os.replace(tmp_path, path)
+        self._lengths[session_id] = len(messages)
+
+    def append(self, session_id: str, messages: List[ModelMessage]) -> None:
+        """Add the messages of a new turn to the end of the stored history."""
+        if not messages:
+            return
+        with open(self._session_path(session_id), "ab") as f:
+            f.write(self._serialize(messages))
+        self._lengths[session_id] = self._lengths.get(session_id, 0) + len(messages)
+
+    def sync(self, session_id: str, messages: List[ModelMessage]) -> None:
+        """Persist ``messages`` as the full history, appending when it only grew since the last save or load."""
+        stored = self._lengths.get(session_id)
+        if stored is not None and stored <= len(messages):
+            self.append(session_id, messages[stored:])
+        else:
+            self.save(session_id, messages)
+
+    # ------------------------------------------------------------------
+
+    def load(self, session_id: str) -> List[ModelMessage]:
+        """Stored history of ``session_id``, empty if there is none."""
+        path = self._session_path(session_id)
+        if not os.path.exists(path):
+            self._lengths[session_id] = 0
+            return []
+
+        with open(path, "rb") as f:
+            raw = [json.loads(line) for line in f if line.strip()]
+
+        refs: List[Dict[str, Any]] = []
+        self._collect_refs(raw, refs)
+        if self.keep_images is not None:
+            refs = refs[max(0, len(refs) - self.keep_images):]
+        keep = {id(ref) for ref in refs}
+
+        messages = ModelMessagesTypeAdapter.validate_python([self._restore(m, keep) for m in raw])
+        self._lengths[session_id] = len(messages)
+        return messages
+
+    def _collect_refs(self, node: Any, refs: List[Dict[str, Any]]) -> None:
+        if isinstance(node, dict):
+            if node.get("kind") == "binary" and "blob" in node:
+                refs.append(node)
+                return
+            for value in node.values():
+                self._collect_refs(value, refs)
+        elif isinstance(node, list):
+            for value in node:
+                self._collect_refs(value, refs)
+
+    def _restore(self, node: Any, keep: set) -> Any:
+        if isinstance(node, dict):
+            if node.get("kind") == "binary" and "blob" in node:
+                placeholder = f"[{node.get('media_type', 'file')} {node['blob'][:12]} from earlier in the conversation, not reloaded]"
+                if id(node) not in keep:
+                    return placeholder
+                try:
+                    with open(self.blob_path(node["blob"]), "rb") as f:
+                        data = f.read()
+                except OSError as e:
+                    print(f"[SessionStore] Missing blob {node['blob'][:12]}: {e}")
+                    return placeholder
+                if hashlib.sha256(data).hexdigest() != node["blob"]:  # truncated or overwritten
+                    print(f"[SessionStore] Corrupt blob {node['blob'][:12]}, not reloaded")
+                    return placeholder
+                return {key: value for key, value in node.items() if key != "blob"} | {"data": data}
+            restored = {key: self._restore(value, keep) for key, value in node.items()}
+            if node.get("part_kind") == "file" and isinstance(restored.get("content"), str):
+                return {"part_kind": "text", "content": restored["content"]}  # a model's FilePart must hold binary content
+            return restored
+        if isinstance(node, list):
+            return [self._restore(value, keep) for value in node]
+        return node
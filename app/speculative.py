@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic_ai import Agent, FunctionToolset, RunContext
+from pydantic_ai._utils import get_event_loop
+from pydantic_ai.agent import AgentRunResult
+from pydantic_ai.messages import ModelMessage, PartDeltaEvent, PartStartEvent, ToolCallPart
+from pydantic_ai.toolsets import ToolsetTool, WrapperToolset
+
+from direct_execution import execute_tool_calls, get_direct_tool
+from metrics import LatencyStats, format_seconds
+
+
+def _complete_args(part: ToolCallPart) -> Optional[Dict[str, Any]]:
+    """Arguments of a streamed tool call once they form a complete JSON object, else None."""
+    if isinstance(part.args, dict):
+        return part.args
+    if not part.args:
+        return None
+    try:
+        args = json.loads(part.args)
+    except ValueError:
+        return None
+    return args if isinstance(args, dict) else None
+
+
+@dataclass
+class SpeculationStats:
+    started: int = 0
+    reused: int = 0
+    head_start: LatencyStats = field(default_factory=LatencyStats)  # time between early start and the agent's call
+
+
+@dataclass
+class SpeculativeToolset(WrapperToolset):
+    """Robot toolset wrapper that starts tool calls while the model is still streaming.
+
+    ``SpeculativeRunner`` calls ``speculate`` as soon as a streamed tool call has
+    complete, valid arguments. When the agent later executes that call the
+    wrapper awaits the already running result instead of running it twice.
+    Calls are executed one at a time in the order they were streamed.
+    """
+
+    allowed_tools: Set[str] = field(default_factory=set)
+    stats: SpeculationStats = field(default_factory=SpeculationStats)
+    # tool_call_id -> (arguments, start time, running call)
+    _pending: Dict[str, Tuple[Dict[str, Any], float, "asyncio.Future[Any]"]] = field(default_factory=dict, repr=False)
+    _executor: ThreadPoolExecutor = field(
+        default_factory=lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-tool"), repr=False
+    )
+
+    def may_speculate(self, name: str, args: Dict[str, Any]) -> bool:
+        """Safety rules: only allow-listed, directly callable tools with schema-valid arguments."""
+        if name not in self.allowed_tools:
+            return False
+        tool = get_direct_tool(self.wrapped, name)
+        if tool is None:
+            return False
+        try:
+            tool.function_schema.validator.validate_python(dict(args))
+        except Exception:
+            return False
+        return True
+
+    def speculate(self, tool_call_id: str, name: str, args: Dict[str, Any]) -> None:
+        print(f"[Speculative] Starting {name}({args}) early")
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, lambda: execute_tool_calls(self.wrapped, [(name, args)])[0])
+        self._pending[tool_call_id] = (dict(args), time.perf_counter(), future)
+        self.stats.started += 1
+
+    async def drain(self) -> None:
+        """Wait for early calls the agent never claimed, e.g. after the run failed."""
+        pending = [future for _, _, future in self._pending.values()]
+        self._pending.clear()
+        if pending:
+            await asyncio.wait(pending)
+
+    async def call_tool(self, name: str, tool_args: Dict[str, Any], ctx: RunContext, tool: ToolsetTool) -> Any:
+        pending = self._pending.pop(ctx.tool_call_id, None) if ctx.tool_call_id else None
+        if pending is not None:
+            started_args, started_at, future = pending
+            self.stats.head_start.add(time.perf_counter() - started_at)
+            if started_args == tool_args:
+                self.stats.reused += 1
+                return await future  # re-raises ModelRetry etc. from the early execution
+            # The validated arguments differ from what was started, finish it before running the real call
+            await asyncio.wait([future])
+        return await super().call_tool(name, tool_args, ctx, tool)
+
+
+class SpeculativeRunner:
+    """Runs agent turns with streaming so allowed tool calls start before the response is complete."""
+
+    def __init__(self, agent: Agent, toolset: SpeculativeToolset) -> None:
+        self._agent = agent
+        self._toolset = toolset
+
+    async def run(self, prompt: str, message_history: Optional[List[ModelMessage]] = None) -> AgentRunResult:
+        try:
+            async with self._agent.iter(prompt, message_history=message_history) as run:
+                async for node in run:
+                    if Agent.is_model_request_node(node):
+                        async with node.stream(run.ctx) as stream:
+                            await self._watch(stream)
+        finally:
+            await self._toolset.drain()
+        return run.result
+
+    def run_sync(self, prompt: str, message_history: Optional[List[ModelMessage]] = None) -> AgentRunResult:
+        # The loop Agent.run_sync uses: the provider's pooled connections are bound to it, so a new loop per turn breaks them
+        return get_event_loop().run_until_complete(self.run(prompt, message_history))
+
+    async def _watch(self, stream) -> None:
+        started: Set[int] = set()
+        blocked = False  # once a call cannot start early, later calls must wait to keep their order
+
+        async for event in stream:
+            if blocked or not isinstance(event, (PartStartEvent, PartDeltaEvent)):
+                continue
+
+            parts = stream.response.parts
+            for index, part in enumerate(parts):
+                if index in started or not isinstance(part, ToolCallPart):
+                    continue
+                args = _complete_args(part)
+                if args is None:
+                    break  # arguments still streaming
+                if not self._toolset.may_speculate(part.tool_name, args):
+                    blocked = True
+                    break
+                self._toolset.speculate(part.tool_call_id, part.tool_name, args)
+                started.add(index)
+
+    def summary(self) -> str:
+        stats = self._toolset.stats
+        return (
+            f"Speculative execution: {stats.started} calls started early, {stats.reused} reused, "
+            f"head start p50={format_seconds(stats.head_start.percentile(50))}"
+        )
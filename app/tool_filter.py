@@ -0,0 +1,171 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pydantic_ai import FunctionToolset, RunContext
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, RetryPromptPart
+from pydantic_ai.tools import ToolDefinition
+from pydantic_core import to_json
+
+from robot_state import prompt_parts
+
+
+SHOW_ALL_TOOLS = "show_all_tools"
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z]+", text.lower())
+
+
+def _matches(word: str, keyword: str) -> bool:
+    """Whole word, or an inflection of a keyword of 4+ letters ("turning" for "turn")."""
+    return word == keyword or (len(keyword) >= 4 and word.startswith(keyword))
+
+
+def _contains(words: List[str], keyword: str) -> bool:
+    """Whether ``words`` contain ``keyword``; the words of a phrase ("look up") must follow each other."""
+    phrase = _words(keyword)
+    n = len(phrase)
+    return n > 0 and any(all(_matches(w, k) for w, k in zip(words[i:i + n], phrase)) for i in range(len(words) - n + 1))
+
+
+def estimate_tokens(tool_def: ToolDefinition) -> int:
+    """Rough input-token cost of a tool definition, ~4 bytes of JSON per token."""
+    schema = {"name": tool_def.name, "description": tool_def.description, "parameters": tool_def.parameters_json_schema}
+    return max(1, len(to_json(schema)) // 4)
+
+
+def _split_turn(messages: List[ModelMessage], prompt: str) -> Tuple[List[ModelMessage], List[ModelMessage]]:
+    """(previous turn, current turn) of a run's messages; turns start at a request carrying the user prompt.
+
+    Injected robot state is a user part too but does not start a turn.
+    """
+    starts = [i for i, message in enumerate(messages) if any(p.content == prompt for p in prompt_parts(message))]
+    if not starts:
+        return [], messages
+    current = starts[-1]
+    previous = max(
+        (i for i, message in enumerate(messages[:current]) if prompt_parts(message)),
+        default=current,
+    )
+    return messages[previous:current], messages[current:]
+
+
+def _called_tools(messages: Iterable[ModelMessage]) -> Set[str]:
+    return {call.tool_name for m in messages if isinstance(m, ModelResponse) for call in m.tool_calls}
+
+
+class ToolFilter:
+    """Exposes only the tool groups relevant to the current instruction to the model.
+
+    Toolsets declare groups as ``metadata["tool_groups"]``, a mapping of group
+    name to ``{"tools": [...], "words": [...]}``. A group is exposed when the
+    instruction contains one of its words or phrases, or one of its tools was
+    called in the previous turn (follow-ups such as "once more"); tools in no
+    group are always exposed. The full set is sent when no group matches, once the model
+    called a hidden tool (pydantic-ai answers that with an "Unknown tool name"
+    retry) and once it called ``show_all_tools``, so a wrong guess costs one
+    step but never a capability. Used as a ``PrepareTools`` capability.
+    """
+
+    def __init__(self, toolsets: Sequence[FunctionToolset]) -> None:
+        self.groups: Dict[str, Set[str]] = {}
+        self.words: Dict[str, Set[str]] = {}
+        for toolset in toolsets:
+            for group, options in (toolset.metadata or {}).get("tool_groups", {}).items():
+                self.groups.setdefault(group, set()).update(options.get("tools", []))
+                self.words.setdefault(group, set()).update(word.lower() for word in options.get("words", []))
+        self.tool_groups: Dict[str, Set[str]] = {}
+        for group, tools in self.groups.items():
+            for tool in tools:
+                self.tool_groups.setdefault(tool, set()).add(group)
+
+        self.toolset = FunctionToolset()
+        self.toolset.add_function(self.show_all_tools, name=SHOW_ALL_TOOLS)
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, int] = {}
+        self.steps = 0
+        self.filtered_steps = 0
+        self.fallbacks = 0  # steps widened to the full set after a miss
+        self.full_tokens = 0
+        self.sent_tokens = 0
+
+    @staticmethod
+    def show_all_tools() -> str:
+        """Call this if none of the available tools can do what the user asked; all tools become available."""
+        return "All tools are available now."
+
+    def select_groups(self, instruction: str, previous_tools: Iterable[str] = ()) -> Optional[Set[str]]:
+        """Groups to expose for ``instruction``, or None for the full set."""
+        words = _words(instruction)
+        groups = {group for group, keywords in self.words.items() if any(_contains(words, keyword) for keyword in keywords)}
+        if not groups:
+            return None
+        for tool in previous_tools:
+            groups |= self.tool_groups.get(tool, set())
+        return groups
+
+    def _select(self, tool_defs: List[ToolDefinition], groups: Set[str]) -> List[ToolDefinition]:
+        return [d for d in tool_defs if d.name not in self.tool_groups or self.tool_groups[d.name] & groups]
+
+    def group_combinations(self) -> List[Set[str]]:
+        """Group sets an instruction commonly selects: each group alone, and the groups sharing a keyword."""
+        combinations: List[Set[str]] = [{group} for group in self.groups]
+        for keyword in sorted(set().union(*self.words.values())):
+            groups = {group for group, keywords in self.words.items() if keyword in keywords}
+            if groups not in combinations:
+                combinations.append(groups)
+        return combinations
+
+    def tool_lists(self, tool_defs: List[ToolDefinition]) -> List[List[ToolDefinition]]:
+        """The tool lists ``prepare_tools`` sends for ``tool_defs``: the full set first, then each common combination.
+
+        Every list is a different request prefix for the provider cache, so the
+        warm-up primes all of them (see prompt_cache.py).
+        """
+        lists = [tool_defs]
+        for groups in self.group_combinations():
+            selected = self._select(tool_defs, groups)
+            if selected not in lists:
+                lists.append(selected)
+        return lists
+
+    def _cost(self, tool_def: ToolDefinition) -> int:
+        tokens = self._tokens.get(tool_def.name)
+        if tokens is None:
+            tokens = self._tokens[tool_def.name] = estimate_tokens(tool_def)
+        return tokens
+
+    def prepare_tools(self, ctx: RunContext[Any], tool_defs: List[ToolDefinition]) -> List[ToolDefinition]:
+        prompt = ctx.prompt if isinstance(ctx.prompt, str) else ""
+        previous, current = _split_turn(ctx.messages, prompt)
+        missed = SHOW_ALL_TOOLS in _called_tools(current) or any(
+            isinstance(part, RetryPromptPart) and isinstance(part.content, str) and part.content.startswith("Unknown tool name")
+            for m in current if isinstance(m, ModelRequest) for part in m.parts
+        )
+
+        groups = None if missed else self.select_groups(prompt, _called_tools(previous))
+        selected = tool_defs if groups is None else self._select(tool_defs, groups)
+
+        full = sum(self._cost(d) for d in tool_defs)
+        sent = sum(self._cost(d) for d in selected)
+        with self._lock:
+            self.steps += 1
+            self.filtered_steps += len(selected) < len(tool_defs)
+            self.fallbacks += missed
+            self.full_tokens += full
+            self.sent_tokens += sent
+        if not any(isinstance(m, ModelResponse) for m in current) or missed:
+            which = "all, after a miss" if missed else ("all" if groups is None else ", ".join(sorted(groups)))
+            print(f"[ToolFilter] {len(selected)}/{len(tool_defs)} tools ({which}), ~{full - sent} of {full} tool tokens saved")
+        return selected
+
+    def summary(self) -> str:
+        with self._lock:
+            saved = self.full_tokens - self.sent_tokens
+            share = saved / self.full_tokens if self.full_tokens else 0.0
+            return (
+                f"Tool filter: {self.filtered_steps}/{self.steps} requests filtered, {self.fallbacks} fallbacks, "
+                f"~{saved} tool tokens saved ({share:.0%}, {saved / self.steps if self.steps else 0:.0f} per request)"
+            )
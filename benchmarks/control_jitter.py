@@ -0,0 +1,99 @@
+"""
+Compare command loop jitter with the loop in the agent process vs in a separate control process.
+
+Each mode runs the same ControlLoop at --rate-hz for --seconds while a motion thread
+refreshes the velocity setpoint, once idle and once next to busy "agent" threads that do
+JSON and pydantic validation work. Commands are not published, so no simulator is needed.
+
+    python benchmarks/control_jitter.py --rate-hz 100 --seconds 5 --agent-threads 2
+"""
+import argparse
+import json
+import threading
+import time
+
+import path
+
+from pydantic import BaseModel, TypeAdapter
+
+from metrics import format_seconds
+from robots.control_process import ControlLoop, ControlProcess, SharedControlBlock, jitter_stats
+
+
+class _Part(BaseModel):
+    kind: str
+    content: str
+    args: dict
+
+
+_messages = TypeAdapter(list[_Part])
+
+
+def busy_agent(done):
+    """Stand-in for the agent: serialize and validate a growing conversation over and over."""
+    history = [{"kind": "tool-call", "content": "x" * 200, "args": {"angle": i, "direction": "left"}} for i in range(200)]
+    while not done.is_set():
+        _messages.validate_json(json.dumps(history))
+
+
+def refresh_setpoint(done, set_velocity, rate_hz):
+    while not done.is_set():
+        set_velocity(0.3, 0.0, 0.0, -0.5)
+        time.sleep(1.0 / rate_hz)
+
+
+def run_mode(args, separate_process, agent_threads):
+    done = threading.Event()
+
+    if separate_process:
+        control = ControlProcess(args.rate_hz, topic=None, lowstate_topic=None)
+        block, set_velocity = control.block, control.set_velocity
+        time.sleep(1.0)  # interpreter start-up
+    else:
+        block = SharedControlBlock.create()
+        set_velocity = lambda *v: block.setpoint.write(*v, 1.0, time.monotonic())
+        loop_thread = threading.Thread(target=ControlLoop(block, args.rate_hz).run, daemon=True)
+        loop_thread.start()
+
+    threads = [threading.Thread(target=refresh_setpoint, args=(done, set_velocity, args.rate_hz))]
+    threads += [threading.Thread(target=busy_agent, args=(done,)) for _ in range(agent_threads)]
+    for t in threads:
+        t.start()
+
+    start_loops = int(block.loop.read()[1][0])
+    time.sleep(args.seconds)
+    loops = int(block.loop.read()[1][0]) - start_loops
+    periods = block.periods()[-max(1, loops - 1):]
+    done.set()
+    for t in threads:
+        t.join()
+
+    if separate_process:
+        control.close()
+    else:
+        block.request_shutdown()
+        loop_thread.join()
+        block.close()
+    return jitter_stats(periods, args.rate_hz)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate-hz", type=float, default=100.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--agent-threads", type=int, default=2)
+    args = parser.parse_args()
+
+    for separate_process in (False, True):
+        for agent_threads in (0, args.agent_threads):
+            stats = run_mode(args, separate_process, agent_threads)
+            mode = "control process" if separate_process else "agent process  "
+            load = "busy agent" if agent_threads else "idle agent"
+            print(
+                f"{mode} {load}: {stats['count']} periods, jitter p50={format_seconds(stats['p50'])} "
+                f"p99={format_seconds(stats['p99'])} max={format_seconds(stats['max'])}, {stats['missed']} missed deadlines"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Evaluate instruction-to-tool-call accuracy of one or more models on a case file.
+
+Cases run concurrently (bounded by --concurrency) against the robot module's
+toolset; every finished case is appended to --results, so rerunning the same
+command after an interruption only runs the missing cases. Cases that raised
+(provider errors, timeouts) are reported separately and not saved, so a rerun
+retries them. Use a new results file (or delete it) to start over.
+
+    python benchmarks/eval_tool_calling.py --models openai:gpt-5-mini openai:gpt-5 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+
+import path
+
+from config import Settings
+from evaluation import ResultStore, evaluate_model, format_summary, load_cases, summarize
+
+
+DEFAULT_CASES = os.path.join(os.path.dirname(__file__), "data", "tool_calling.jsonl")
+
+
+async def run(args):
+    cases = load_cases(args.cases)
+    store = ResultStore(args.results)
+    settings = Settings(ROBOT_MODULE=args.robot_module, ROBOT_TOOLSET=args.robot_toolset, MODEL=args.models[0])
+
+    summaries = []
+    for model in args.models:
+        before = len(store.for_model(model))
+        wall_sec = await evaluate_model(settings, model, cases, store, concurrency=args.concurrency)
+        results = [r for r in store.for_model(model) if r.case_id in {case.id for case in cases}]
+        errors = len(store.errors_for_model(model))
+        summaries.append(summarize(model, results, wall_sec, len(store.for_model(model)) - before + errors, errors))
+
+    print()
+    for summary in summaries:
+        print(format_summary(summary))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", required=True)
+    parser.add_argument("--cases", default=DEFAULT_CASES)
+    parser.add_argument("--results", default="eval_results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=4)
+    # Tools really execute, so evaluate against the test robot unless you mean it
+    parser.add_argument("--robot-module", default="robots.test_robot")
+    parser.add_argument("--robot-toolset", default="toolset")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Tail latency of model requests with and without hedging, against a local stand-in model.
+
+The stand-in answers after a latency drawn from a log-normal body with a slow
+tail (--tail-prob of requests take --tail-factor times longer), like a provider
+that is usually fast but occasionally stalls. Each configuration runs the same
+number of agent turns; hedging sends a duplicate to an independent stand-in with
+the same distribution. Latencies are scaled down so a run takes seconds.
+
+    python benchmarks/hedged_requests.py --requests 400 --median-ms 80 --tail-prob 0.05 --tail-factor 10
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import path
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from hedged_model import HedgedModel
+from metrics import LatencyStats, format_seconds
+
+
+def stand_in_model(args, rng: random.Random, name: str) -> FunctionModel:
+    calls = {"count": 0}
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        calls["count"] += 1
+        latency = args.median_ms / 1000.0 * rng.lognormvariate(0.0, args.sigma)
+        if rng.random() < args.tail_prob:
+            latency *= args.tail_factor
+        await asyncio.sleep(latency)
+        return ModelResponse(parts=[TextPart("Done.")])
+
+    model = FunctionModel(respond, model_name=name)
+    model.calls = calls
+    return model
+
+
+async def run_config(args, label, hedged):
+    rng = random.Random(args.seed)
+    primary = stand_in_model(args, rng, "primary")
+    backup = stand_in_model(args, random.Random(args.seed + 1), "backup")
+    model = primary
+    if hedged is not None:
+        model = HedgedModel(primary, backup, max_hedge_rate=args.max_hedge_rate, **hedged)
+    agent = Agent(model, output_type=str)
+
+    latency = LatencyStats(max_samples=args.requests)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def turn(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.run(f"instruction {i}")
+            latency.add(time.perf_counter() - start)
+
+    await asyncio.gather(*(turn(i) for i in range(args.requests)))
+    extra = backup.calls["count"] / args.requests
+    print(
+        f"{label:<28} p50={format_seconds(latency.percentile(50)):>8} p95={format_seconds(latency.percentile(95)):>8} "
+        f"p99={format_seconds(latency.percentile(99)):>8} max={format_seconds(latency.percentile(100)):>8}  extra requests {extra:.1%}"
+    )
+    if isinstance(model, HedgedModel):
+        print(f"{'':<28} {model.summary()}")
+
+
+async def main_async(args):
+    print(
+        f"{args.requests} turns, median {args.median_ms:.0f}ms, sigma {args.sigma}, "
+        f"{args.tail_prob:.0%} tail x{args.tail_factor:.0f}, hedge budget {args.max_hedge_rate:.0%}"
+    )
+    await run_config(args, "no hedging", None)
+    await run_config(args, f"hedge after {args.delay_ms:.0f}ms", {"hedge_delay_sec": args.delay_ms / 1000.0})
+    await run_config(args, "hedge after primary p90", {"hedge_delay_sec": args.delay_ms / 1000.0, "hedge_percentile": 90.0})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--median-ms", type=float, default=80.0)
+    parser.add_argument("--sigma", type=float, default=0.3, help="log-normal sigma of the latency body")
+    parser.add_argument("--tail-prob", type=float, default=0.05)
+    parser.add_argument("--tail-factor", type=float, default=10.0)
+    parser.add_argument("--delay-ms", type=float, default=150.0, help="fixed hedge delay")
+    parser.add_argument("--max-hedge-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Count tool calls per instruction when motion tools return nothing vs. a measured outcome.
+
+Runs a short conversation of turning and walking instructions against a
+simulated robot (yaw, rotate, walk; no hardware) whose rotations land a few
+degrees off target, once with tools returning None and once returning a
+MotionOutcome. The robot-state context is off so the tool result is the only
+source of the heading. Without --model a scripted stand-in policy is used: it
+confirms every motion with get_rotation unless the result already reports the
+final heading, which shows the mechanism but not how often a real model
+verifies. Pass a provider model to measure that.
+
+    python benchmarks/motion_outcomes.py --model openai:gpt-5-mini
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import Optional
+
+import path
+
+from pydantic_ai import FunctionToolset
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agent import build_agent
+from config import Settings
+from metrics import format_seconds
+from robots.motion_report import MotionOutcome
+
+
+INSTRUCTIONS = [
+    "Turn left by 90 degrees and tell me your heading.",
+    "Turn right by 45 degrees and make sure you got there.",
+    "Walk forward for 2 seconds.",
+    "Turn right by 120 degrees, then report which way you face.",
+    "Turn left by 30 degrees.",
+    "Walk left for 1 second and confirm your heading.",
+    "Turn left by 150 degrees and check the result.",
+    "Turn right by 10 degrees.",
+]
+
+
+############################################################
+# Simulated robot
+############################################################
+
+yaw_deg = 0.0
+report_outcomes = True
+rng = random.Random(0)
+
+toolset = FunctionToolset()
+toolset.metadata = {"robot_description": "Simulated robot that can rotate and walk."}
+
+
+def _wrap(angle: float) -> float:
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+@toolset.tool_plain
+def rotate(angle: float) -> Optional[MotionOutcome]:
+    """
+    Rotate the robot in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation.
+    Returns the measured rotation and the final heading when available.
+    """
+    global yaw_deg
+    start = yaw_deg
+    achieved = angle + rng.uniform(-3.0, 3.0)  # the controller stops within a few degrees
+    yaw_deg = _wrap(yaw_deg + achieved)
+    if not report_outcomes:
+        return None
+    return MotionOutcome(
+        action=f"rotate {angle:+.0f}°", termination="tolerance", elapsed_sec=abs(angle) / 60.0,
+        commands_sent=int(abs(angle) / 60.0 * 50) + 1, requested_deg=angle,
+        yaw_delta_deg=_wrap(yaw_deg - start), final_heading_deg=yaw_deg,
+    )
+
+
+@toolset.tool_plain
+def walk(direction: str, duration_sec: float) -> Optional[MotionOutcome]:
+    """Walk the robot in the specified direction (forward, backward, left, right) for a given duration."""
+    if not report_outcomes:
+        return None
+    return MotionOutcome(
+        action=f"walk {direction}", termination="duration", elapsed_sec=duration_sec,
+        commands_sent=int(duration_sec * 50) + 1, final_heading_deg=yaw_deg, distance_m=0.25 * duration_sec,
+    )
+
+
+@toolset.tool_plain
+def get_rotation() -> float:
+    """Get the current absolute rotation of the robot in degrees."""
+    return yaw_deg
+
+
+############################################################
+# Stand-in policy
+############################################################
+
+def _reported_heading(part: ToolReturnPart) -> Optional[float]:
+    if part.tool_name == "get_rotation":
+        return float(part.content)
+    content = part.content
+    if isinstance(content, MotionOutcome):
+        return content.final_heading_deg
+    if isinstance(content, str) and content.startswith("{"):
+        return json.loads(content).get("final_heading_deg")
+    return None
+
+
+def stand_in_policy(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+    """Scripted model: moves, then checks the heading with get_rotation unless the motion result reports it."""
+    instruction = next(
+        p.content for m in reversed(messages) if isinstance(m, ModelRequest) for p in m.parts if isinstance(p, UserPromptPart)
+    )
+    returns = [p for p in messages[-1].parts if isinstance(p, ToolReturnPart)]
+    if returns:
+        heading = _reported_heading(returns[-1])
+        if heading is None:
+            return ModelResponse(parts=[ToolCallPart("get_rotation", {})])
+        return ModelResponse(parts=[TextPart(f"Done, I am facing {heading:.0f} degrees.")])
+
+    relative = re.search(r"turn (left|right) by (\d+)", instruction, re.I)
+    if relative:
+        angle = float(relative.group(2)) * (1 if relative.group(1).lower() == "left" else -1)
+        return ModelResponse(parts=[ToolCallPart("rotate", {"angle": angle})])
+    walking = re.search(r"walk (\w+) for (\d+)", instruction, re.I)
+    direction, duration = (walking.group(1), float(walking.group(2))) if walking else ("forward", 1.0)
+    return ModelResponse(parts=[ToolCallPart("walk", {"direction": direction, "duration_sec": duration})])
+
+
+############################################################
+# Benchmark
+############################################################
+
+def run_conversation(model_name: Optional[str], outcomes: bool) -> None:
+    global yaw_deg, report_outcomes
+    yaw_deg, report_outcomes = 0.0, outcomes
+    rng.seed(0)
+    settings = Settings(
+        ROBOT_MODULE="__main__", ROBOT_TOOLSET="toolset", MODEL=model_name or "test",
+        FAST_PATH=False, PLAN_CACHE=False, SPECULATIVE_EXECUTION=False, MODEL_TIERS=[],
+        ROBOT_STATE_CONTEXT=False,
+    )
+    robot_agent = build_agent(settings)
+    model = None if model_name else FunctionModel(stand_in_policy)
+
+    messages = None
+    tool_calls = requests = verifications = 0
+    start = time.perf_counter()
+    for instruction in INSTRUCTIONS:
+        result = robot_agent.agent.run_sync(instruction, message_history=messages, model=model)
+        calls = [c.tool_name for m in result.new_messages() if isinstance(m, ModelResponse) for c in m.tool_calls]
+        tool_calls += len(calls)
+        verifications += calls.count("get_rotation")
+        requests += result.usage.requests
+        print(f"  {instruction:<60} {', '.join(calls) or '-'}")
+        messages = result.all_messages()
+    elapsed = time.perf_counter() - start
+
+    n = len(INSTRUCTIONS)
+    print(
+        f"  outcomes {'on ' if outcomes else 'off'}: {tool_calls / n:.2f} tool calls ({verifications} get_rotation) and "
+        f"{requests / n:.2f} model requests per instruction, {format_seconds(elapsed / n)} per instruction"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="provider model, default is the scripted stand-in policy")
+    args = parser.parse_args()
+
+    print(f"Model: {args.model or 'scripted stand-in'}")
+    for outcomes in (False, True):
+        run_conversation(args.model, outcomes)
+
+
+if __name__ == "__main__":
+    main()
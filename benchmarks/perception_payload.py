@@ -0,0 +1,85 @@
+"""
+Compare the marker perception tool with sending the head camera frame as PNG.
+
+Uses a synthetic frame with ArUco/AprilTag markers and a colored object (or --image),
+and reports per-call latency, payload bytes and approximate model input tokens.
+
+    python benchmarks/perception_payload.py --width 1280 --height 720 --repeat 50
+"""
+import argparse
+import math
+import time
+
+import cv2
+import numpy as np
+
+import path
+
+from metrics import LatencyStats, format_seconds
+from robots.perception import DEFAULT_BLOB_COLORS, MarkerDetector, describe_detections
+
+
+def synthetic_frame(width, height):
+    rng = np.random.default_rng(0)
+    img = rng.integers(90, 170, size=(height, width, 3), dtype=np.uint8)  # textured background compresses like a real scene
+    img = cv2.GaussianBlur(img, (5, 5), 0)
+    size = height // 5
+    markers = [
+        (cv2.aruco.DICT_4X4_50, 7, width // 6, height // 3),
+        (cv2.aruco.DICT_APRILTAG_36h11, 3, width * 2 // 3, height // 4),
+    ]
+    for dictionary, marker_id, x, y in markers:
+        marker = cv2.aruco.generateImageMarker(cv2.aruco.getPredefinedDictionary(dictionary), marker_id, size)
+        pad = size // 5
+        img[y - pad:y + size + pad, x - pad:x + size + pad] = 255
+        img[y:y + size, x:x + size] = cv2.cvtColor(marker, cv2.COLOR_GRAY2BGR)
+    cv2.circle(img, (width // 2, height * 3 // 4), height // 12, (0, 0, 220), -1)
+    return img
+
+
+def image_tokens(width, height):
+    """Approximate high-detail image token cost: 85 + 170 per 512px tile after the provider's resize."""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--image", default=None, help="use this image instead of the synthetic frame")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image) if args.image else synthetic_frame(args.width, args.height)
+    height, width = img.shape[:2]
+    detector = MarkerDetector(blob_colors=DEFAULT_BLOB_COLORS)
+
+    png_latency, text_latency = LatencyStats(), LatencyStats()
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        ok, buf = cv2.imencode(".png", img)
+        png_latency.add(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        text = describe_detections(detector.detect(img))
+        text_latency.add(time.perf_counter() - start)
+
+    png_bytes = len(buf.tobytes())
+    print(f"Frame {width}x{height}")
+    print(
+        f"  snapshot PNG : p50={format_seconds(png_latency.percentile(50))}, {png_bytes} bytes "
+        f"({math.ceil(png_bytes / 3) * 4} base64), ~{image_tokens(width, height)} image tokens"
+    )
+    print(
+        f"  detect text  : p50={format_seconds(text_latency.percentile(50))}, {len(text.encode())} bytes, "
+        f"~{math.ceil(len(text) / 4)} tokens"
+    )
+    print(f"  result       : {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+First-turn and steady-state latency with and without the startup warm-up.
+
+Runs the agent against a local OpenAI-compatible stub provider that charges
+--connect-ms for every new connection (a stand-in for DNS, TCP and TLS setup
+and a cold route), --prefill-us per input token that is not in its prefix
+cache, and reports cached tokens in its usage like the real API. Each
+configuration talks to a fresh stub with an empty cache and pauses
+--think-sec between turns, like a user typing:
+
+  cold: no warm-up, httpx's default 5 s keep-alive
+  warm: warm-up request at startup, PROVIDER_KEEPALIVE_SEC keep-alive
+
+The cache hits come from the usage metadata the agent receives, the same
+numbers PromptCacheStats reports against a real provider. The tool filter is
+on, as in the default settings, so instructions of different groups send
+different tool prefixes; the warm-up primes each of them (--no-tool-filter
+sends the full set every turn). Point --model at a real provider to measure
+it instead of the stub.
+
+    python benchmarks/provider_warmup.py --think-sec 6
+    python benchmarks/provider_warmup.py --model openai:gpt-5-mini
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import path
+
+from agent import build_agent
+from config import Settings
+from metrics import format_seconds
+
+
+INSTRUCTIONS = [
+    "What can you do?",
+    "What time is it?",
+    "Wave your right arm.",
+    "Take two steps forward.",
+    "Turn left by 90 degrees.",
+    "Crouch down.",
+    "Where are we right now?",
+]
+
+
+############################################################
+# Stub provider
+############################################################
+
+class StubProvider(ThreadingHTTPServer):
+    """OpenAI-compatible chat completions endpoint with connection setup cost and a prefix cache."""
+
+    daemon_threads = True
+
+    def __init__(self, connect_sec: float, prefill_sec_per_token: float, base_sec: float = 0.05) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.connect_sec = connect_sec
+        self.prefill_sec_per_token = prefill_sec_per_token
+        self.base_sec = base_sec
+        self.connections = 0
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def complete(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        system = [m for m in messages if m.get("role") in ("system", "developer")][:1]
+        prefix = json.dumps({"tools": body.get("tools"), "system": system}, sort_keys=False)
+        prefix_tokens = len(prefix) // 4
+        total_tokens = prefix_tokens + len(json.dumps(messages)) // 4
+        key = hashlib.sha256(prefix.encode()).hexdigest()
+        with self._lock:
+            cached = prefix_tokens if key in self._prefixes else 0
+            self._prefixes.add(key)
+        time.sleep(self.base_sec + (total_tokens - cached) * self.prefill_sec_per_token)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "OK."}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": total_tokens,
+                "completion_tokens": 2,
+                "total_tokens": total_tokens + 2,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+        }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+        time.sleep(self.server.connect_sec)  # paid once per connection, like a TLS handshake
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        data = json.dumps(self.server.complete(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+############################################################
+# Benchmark
+############################################################
+
+def run_session(model_name: str, warm: bool, think_sec: float, tool_filter: bool, stub: Optional[StubProvider]) -> None:
+    settings = Settings(
+        ROBOT_MODULE="robots.test_robot", ROBOT_TOOLSET="toolset", MODEL=model_name,
+        FAST_PATH=False, PLAN_CACHE=False, SPECULATIVE_EXECUTION=False, MODEL_TIERS=[], HEDGING=False,
+        TOOL_FILTER=tool_filter, PROMPT_CACHE=True, PROMPT_WARM_UP=warm,
+        PROVIDER_KEEPALIVE_SEC=120.0 if warm else 0.0,
+    )
+    robot_agent = build_agent(settings)
+    print(f"{'warm' if warm else 'cold'}:")
+
+    startup = time.perf_counter()
+    if settings.PROMPT_WARM_UP:
+        robot_agent.warm_up()
+    startup = time.perf_counter() - startup
+
+    messages = None
+    for i, instruction in enumerate(INSTRUCTIONS):
+        if i:
+            time.sleep(think_sec)
+        start = time.perf_counter()
+        result = robot_agent.run_sync(instruction, message_history=messages)
+        print(f"  {instruction:<28} {format_seconds(time.perf_counter() - start)}")
+        messages = result.all_messages()
+
+    s = robot_agent.prompt_cache.snapshot()
+    connections = f", {stub.connections} connections opened" if stub else ""
+    print(
+        f"  startup {format_seconds(startup)}, first turn {format_seconds(s['first_turn'])}, "
+        f"steady p50 {format_seconds(s['steady_p50'])}, {s['turns_with_hits']}/{s['turns']} turns with cache hits, "
+        f"{s['cache_read_tokens']}/{s['input_tokens']} input tokens cached{connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="provider model, default is the local stub")
+    parser.add_argument("--think-sec", type=float, default=6.0, help="pause between turns")
+    parser.add_argument("--connect-ms", type=float, default=300.0, help="stub cost of a new connection")
+    parser.add_argument("--prefill-us", type=float, default=200.0, help="stub cost per uncached input token")
+    parser.add_argument("--no-tool-filter", dest="tool_filter", action="store_false", help="turn the per-instruction tool filter off")
+    args = parser.parse_args()
+
+    for warm in (False, True):
+        stub = None
+        model_name = args.model
+        if model_name is None:
+            stub = StubProvider(args.connect_ms / 1000.0, args.prefill_us / 1e6)
+            os.environ["OPENAI_BASE_URL"] = stub.base_url
+            os.environ.setdefault("OPENAI_API_KEY", "stub")
+            model_name = f"openai-chat:stub-{'warm' if warm else 'cold'}"  # a new provider and pool per stub
+        run_session(model_name, warm, args.think_sec, args.tool_filter, stub)
+        if stub:
+            stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Record an IMU stream from the simulator and benchmark controller variants against it.
+
+    python benchmarks/replay_rotation.py record imu.jsonl --angle 90
+    python benchmarks/replay_rotation.py run imu.jsonl --angle 90 --yaw-speed 1.0 1.5 2.0
+"""
+import argparse
+import time
+
+import path
+
+from robots.telemetry_replay import TelemetryRecorder, benchmark_motion, load_samples
+
+
+def record(args) -> None:
+    import robots.unitree_g1_sim as sim  # type: ignore
+    from unitree_sdk2py.core.channel import ChannelSubscriber
+    from unitree_sdk2py.idl.unitree_hg.msg.dds_ import LowState_
+
+    recorder = TelemetryRecorder(args.file)
+    sub = ChannelSubscriber("rt/lowstate", LowState_)
+    sub.Init(recorder.record, 32)
+
+    time.sleep(args.lead_sec)
+    sim.rotate(angle=args.angle)
+    time.sleep(args.settle_sec)
+
+    sub.Close()
+    recorder.close()
+    print(f"Recorded IMU stream to {args.file}")
+
+
+def run(args) -> None:
+    from robots.unitree_g1_sim import RobotController, wrap_to_180  # type: ignore
+
+    samples = load_samples(args.file)
+    target = wrap_to_180(samples[0].yaw_deg + args.angle)
+
+    print(f"{'yaw_speed':>10} {'tolerance':>10} {'commands':>9} {'stop_t':>8} {'err@stop':>9} {'settle_t':>9} {'overshoot':>10}")
+    for yaw_speed in args.yaw_speed:
+        for tolerance in args.tolerance:
+            # Commands go to a separate topic so the replay never drives the simulator
+            controller = RobotController(topic="rt/replay/cmd", lowstate_topic=None)
+            controller.tolerance_deg = tolerance
+            if args.fast:
+                controller._period = 0.0  # lockstep replay does not need wall-clock pacing
+
+            result = benchmark_motion(
+                samples,
+                on_lowstate=controller._on_lowstate,
+                motion=lambda: controller.rotate(args.angle, yaw_speed=yaw_speed),
+                command_owner=controller,
+                command_attr="send_command",
+                target_yaw_deg=target,
+                tolerance_deg=tolerance,
+                speed=None if args.fast else 1.0,
+            )
+
+            def fmt(v):
+                return f"{v:.3f}" if v is not None else "-"
+
+            print(
+                f"{yaw_speed:>10} {tolerance:>10} {result.commands_sent:>9} {fmt(result.stop_time_sec):>8} "
+                f"{fmt(result.error_at_stop_deg):>9} {fmt(result.settle_time_sec):>9} {result.max_overshoot_deg:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="Record rt/lowstate while the simulator performs a rotation.")
+    p.add_argument("file")
+    p.add_argument("--angle", type=float, default=90.0)
+    p.add_argument("--lead-sec", type=float, default=1.0)
+    p.add_argument("--settle-sec", type=float, default=2.0)
+    p.set_defaults(func=record)
+
+    p = sub.add_parser("run", help="Replay a recording against RobotController.rotate variants.")
+    p.add_argument("file")
+    p.add_argument("--angle", type=float, default=90.0)
+    p.add_argument("--yaw-speed", type=float, nargs="+", default=[1.5])
+    p.add_argument("--tolerance", type=float, nargs="+", default=[0.85])
+    p.add_argument("--realtime", dest="fast", action="store_false", help="Replay at recorded speed instead of lockstep.")
+    p.set_defaults(func=run)
+
+    args = parser.parse_args()
+    args.func(args)
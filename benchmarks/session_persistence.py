@@ -0,0 +1,110 @@
+"""
+Compare the session store with naive JSON dumps of the whole message history.
+
+Builds a synthetic session where every turn calls a snapshot tool returning a PNG
+(every --repeat-every-th snapshot repeats an earlier one, as when the robot has not
+moved). The naive baseline re-dumps the whole history with pydantic-ai's adapter
+after every turn; the store appends the turn and moves images into blobs.
+
+    python benchmarks/session_persistence.py --turns 200 --image-kb 300
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import path
+
+from pydantic_ai.messages import (
+    BinaryContent, ModelMessagesTypeAdapter, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart,
+)
+
+from metrics import format_seconds
+from session_store import SessionStore
+
+
+def build_turns(args):
+    images = []
+    turns = []
+    for i in range(args.turns):
+        if images and i % args.repeat_every == 0:
+            image = images[i % len(images)]
+        else:
+            image = os.urandom(args.image_kb * 1024)
+            images.append(image)
+        turns.append([
+            ModelRequest(parts=[UserPromptPart(content=f"Turn {i}: what do you see now?")]),
+            ModelResponse(parts=[ToolCallPart("get_camera_snapshot", {}, tool_call_id=f"call_{i}")]),
+            ModelRequest(parts=[ToolReturnPart("get_camera_snapshot", BinaryContent(image, media_type="image/png"), tool_call_id=f"call_{i}")]),
+            ModelResponse(parts=[TextPart(f"I see a corridor with a door on the left ({i}).")]),
+        ])
+    return turns
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def measure_load(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    messages = load()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--image-kb", type=int, default=300)
+    parser.add_argument("--repeat-every", type=int, default=3)
+    parser.add_argument("--keep-images", type=int, default=2)
+    args = parser.parse_args()
+
+    turns = build_turns(args)
+    work = tempfile.mkdtemp()
+    try:
+        # Naive: rewrite the whole history as JSON after every turn
+        naive_file = os.path.join(work, "naive.json")
+        history = []
+        start = time.perf_counter()
+        for turn in turns:
+            history.extend(turn)
+            with open(naive_file, "wb") as f:
+                f.write(ModelMessagesTypeAdapter.dump_json(history))
+        naive_save = time.perf_counter() - start
+
+        def naive_load():
+            with open(naive_file, "rb") as f:
+                return ModelMessagesTypeAdapter.validate_json(f.read())
+
+        # Session store: append each turn, images in content-addressed blobs
+        store_dir = os.path.join(work, "store")
+        store = SessionStore(store_dir, keep_images=args.keep_images)
+        history = []
+        start = time.perf_counter()
+        for turn in turns:
+            history.extend(turn)
+            store.sync("bench", history)
+        store_save = time.perf_counter() - start
+
+        naive_load_sec, naive_peak, count = measure_load(naive_load)
+        store_load_sec, store_peak, _ = measure_load(lambda: SessionStore(store_dir, keep_images=args.keep_images).load("bench"))
+        full_load_sec, full_peak, _ = measure_load(lambda: SessionStore(store_dir).load("bench"))
+
+        print(f"{args.turns} turns, {count} messages, {args.image_kb}KB snapshots")
+        print(f"  naive JSON     : save all turns {format_seconds(naive_save)}, load {format_seconds(naive_load_sec)}, "
+              f"peak {naive_peak / 1e6:.1f}MB, disk {os.path.getsize(naive_file) / 1e6:.1f}MB")
+        print(f"  store (keep {args.keep_images}) : save all turns {format_seconds(store_save)}, load {format_seconds(store_load_sec)}, "
+              f"peak {store_peak / 1e6:.1f}MB, disk {dir_size(store_dir) / 1e6:.1f}MB")
+        print(f"  store (all)    : load {format_seconds(full_load_sec)}, peak {full_peak / 1e6:.1f}MB")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+End-to-end camera snapshot latency against a synthetic teleimager server.
+
+Starts a SyntheticFrameServer (robots/frame_server.py) on the teleimager ports
+and takes --snapshots snapshots of the head camera, --interval-sec apart, for
+each scenario: a clean stream, a delayed and jittery link, dropped frames and
+periodic outages. Each snapshot reports
+
+  acquire  time until the client had a frame (TeleImagerSnapshotClient.wait_for_frame)
+  age      capture-to-available time, read from the capture stamp in the pixels
+  encode   PNG encoding and size, as get_camera_snapshot returns it to the model
+
+The default client is TeleImagerSnapshotClient on teleimager's ImageClient.
+--client zmq uses a plain ZMQ subscriber that decodes the same JPEG stream,
+which separates the transport from the client library. --via-tool times
+get_camera_snapshot of the simulator robot instead (needs unitree_sdk2py; the
+robot's DDS channels are only created, nothing has to run). Server and client
+run on one box, so the age includes no clock skew.
+
+    python benchmarks/snapshot_pipeline.py --head-shape 720x2560 --head-fps 30
+    python benchmarks/snapshot_pipeline.py --client zmq --scenario stalls
+"""
+import argparse
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import path
+
+import cv2
+import numpy as np
+import zmq
+
+from metrics import LatencyStats, format_seconds
+from robots.frame_server import CAMERA_KEYS, DEFAULT_PORTS, SyntheticFrameServer, add_server_arguments, read_frame_stamp, streams_from_args
+
+
+SCENARIOS = {
+    "clean": {},
+    "delay": {"delay_ms": 50.0, "jitter_ms": 30.0},
+    "drops": {"drop_rate": 0.3},
+    "stalls": {"stall_every_sec": 2.0, "stall_sec": 0.5},
+}
+
+
+############################################################
+# Clients
+############################################################
+
+class ZmqFrameClient:
+    """Reference subscriber: keeps the newest decoded frame of each camera, like teleimager's ImageClient."""
+
+    def __init__(self, host: str = "127.0.0.1", ports: Optional[Dict[str, int]] = None) -> None:
+        self._context = zmq.Context()
+        self._frames: Dict[str, Tuple[Optional[np.ndarray], float]] = {}
+        self._stop = threading.Event()
+        self._threads = []
+        for camera, port in (ports or DEFAULT_PORTS).items():
+            self._frames[camera] = (None, 0.0)
+            thread = threading.Thread(target=self._receive, args=(camera, f"tcp://{host}:{port}"), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _receive(self, camera: str, endpoint: str) -> None:
+        socket = self._context.socket(zmq.SUB)
+        socket.setsockopt(zmq.CONFLATE, 1)
+        socket.setsockopt(zmq.SUBSCRIBE, b"")
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(endpoint)
+        received = []
+        try:
+            while not self._stop.is_set():
+                if not socket.poll(100):
+                    continue
+                img = cv2.imdecode(np.frombuffer(socket.recv(), np.uint8), cv2.IMREAD_COLOR)
+                now = time.monotonic()
+                received = [t for t in received if now - t < 1.0] + [now]
+                self._frames[camera] = (img, float(len(received)))
+        finally:
+            socket.close()
+
+    def get_frame(self, camera: str = "head") -> Tuple[Optional[np.ndarray], float]:
+        return self._frames[camera]
+
+    def wait_for_frame(self, camera: str = "head", timeout_sec: float = 5.0, poll_sec: float = 0.02) -> np.ndarray:
+        deadline = time.monotonic() + timeout_sec
+        while time.monotonic() < deadline:
+            img, _ = self.get_frame(camera)
+            if img is not None:
+                return img
+            time.sleep(poll_sec)
+        raise TimeoutError(f"Timed out waiting for {camera} frame after {timeout_sec}s")
+
+    def close(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._context.term()
+
+
+############################################################
+# Benchmark
+############################################################
+
+# A snapshot returns the frame, the PNG bytes, and the acquire and encode seconds when they can be told apart
+Snapshot = Tuple[np.ndarray, bytes, Optional[float], Optional[float]]
+
+
+def snapshot_via_client(client) -> Callable[[], Snapshot]:
+    """The steps of get_camera_snapshot, on the given client."""
+
+    def snapshot() -> Snapshot:
+        start = time.perf_counter()
+        img = client.wait_for_frame(camera="head", timeout_sec=5.0)
+        acquired = time.perf_counter()
+        ok, buf = cv2.imencode(".png", img)
+        if not ok:
+            raise RuntimeError("cv2.imencode('.png', img) failed")
+        return img, buf.tobytes(), acquired - start, time.perf_counter() - acquired
+
+    return snapshot
+
+
+def snapshot_via_tool() -> Callable[[], Snapshot]:
+    import robots.unitree_g1_sim as robot_sim
+
+    def snapshot() -> Snapshot:
+        content = robot_sim.get_camera_snapshot()
+        return cv2.imdecode(np.frombuffer(content.data, np.uint8), cv2.IMREAD_COLOR), content.data, None, None
+
+    return snapshot
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> None:
+    args = argparse.Namespace(**{**vars(args), **SCENARIOS[name]})
+    server = SyntheticFrameServer(streams_from_args(args), host="127.0.0.1").start()
+    client = None
+    try:
+        if args.via_tool:
+            snapshot = snapshot_via_tool()
+        else:
+            if args.client == "zmq":
+                client = ZmqFrameClient(ports={camera: server.ports[camera] for camera in server.streams})
+            else:
+                from robots.teleimager_snapshot import TeleImagerSnapshotClient
+                client = TeleImagerSnapshotClient(host="127.0.0.1")
+            snapshot = snapshot_via_client(client)
+
+        acquire, age, encode, total = LatencyStats(), LatencyStats(), LatencyStats(), LatencyStats()
+        sizes, failures, unstamped = [], 0, 0
+        for i in range(args.snapshots):
+            if i:
+                time.sleep(args.interval_sec)
+            start = time.perf_counter()
+            try:
+                img, data, acquire_sec, encode_sec = snapshot()
+                total.add(time.perf_counter() - start)
+            except Exception as e:
+                failures += 1
+                print(f"  snapshot {i} failed: {e}")
+                continue
+            stamp = read_frame_stamp(img)
+            if stamp is None:
+                unstamped += 1
+            else:
+                age.add(time.time() - stamp)
+            if acquire_sec is not None:
+                acquire.add(acquire_sec)
+                encode.add(encode_sec)
+            sizes.append(len(data))
+
+        def stats(s: LatencyStats) -> str:
+            return f"p50={format_seconds(s.percentile(50))} p99={format_seconds(s.percentile(99))} max={format_seconds(s.percentile(100))}"
+
+        print(f"{name} ({', '.join(f'{k}={v:g}' for k, v in SCENARIOS[name].items()) or 'no faults'}):")
+        print(f"  snapshot {stats(total)}, {failures} failed" + (f", {unstamped} frames without stamp" if unstamped else ""))
+        print(f"  acquire  {stats(acquire)}")
+        print(f"  age      {stats(age)}")
+        print(f"  encode   {stats(encode)}, {np.mean(sizes) / 1024.0 if sizes else 0.0:.0f} KiB PNG")
+        print("  " + server.summary().replace("\n", "\n  "))
+    finally:
+        if client is not None:
+            client.close()
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client", default="teleimager", choices=["teleimager", "zmq"])
+    parser.add_argument("--via-tool", action="store_true", help="time the simulator robot's get_camera_snapshot tool")
+    parser.add_argument("--scenario", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--snapshots", type=int, default=50)
+    parser.add_argument("--interval-sec", type=float, default=0.13, help="pause between snapshots, off the frame period")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    cameras = ", ".join(CAMERA_KEYS[c] for c in ["head"] + args.wrist)
+    print(f"Client: {'get_camera_snapshot' if args.via_tool else args.client}; cameras: {cameras}")
+    for name in args.scenario:
+        run_scenario(name, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory use and query latency of the spatial memory as it fills up.
+
+Adds --entries observations at random positions, each with a camera-sized frame
+turned into a thumbnail, and reports the stored bytes (bounded by eviction) and
+the latency of nearest-location and label queries against a brute-force scan.
+
+    python benchmarks/spatial_memory.py --entries 2000 --max-entries 500
+"""
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+import path
+
+from metrics import LatencyStats, format_seconds
+from robots.spatial_memory import SpatialMemory
+
+
+LABELS = ["door", "red blob", "aruco 3", "charging station", "kitchen", "stairs", "camera snapshot", "table"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--max-entries", type=int, default=500)
+    parser.add_argument("--thumbnail-px", type=int, default=96)
+    parser.add_argument("--area-m", type=float, default=50.0, help="side of the square the robot wanders in")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    memory = SpatialMemory(max_entries=args.max_entries, thumbnail_px=args.thumbnail_px)
+
+    add = LatencyStats(max_samples=args.entries)
+    for i in range(args.entries):
+        start = time.perf_counter()
+        memory.add(f"{rng.choice(LABELS)} {i}", (rng.uniform(0, args.area_m), rng.uniform(0, args.area_m), 0.0), frame)
+        add.add(time.perf_counter() - start)
+
+    nearest, brute, find = LatencyStats(args.queries), LatencyStats(args.queries), LatencyStats(args.queries)
+    places = list(memory._places.values())
+    for _ in range(args.queries):
+        qx, qy = rng.uniform(0, args.area_m), rng.uniform(0, args.area_m)
+        start = time.perf_counter()
+        memory.nearest(qx, qy, k=5)
+        nearest.add(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        sorted(places, key=lambda p: math.hypot(p.x - qx, p.y - qy))[:5]
+        brute.add(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory.find(rng.choice(LABELS))
+        find.add(time.perf_counter() - start)
+
+    raw_frame = frame.nbytes
+    print(f"{args.entries} observations added, {len(memory)} kept ({memory.evicted} evicted)")
+    print(f"  thumbnails  : {memory.thumbnail_bytes / 1e6:.2f}MB stored, {memory.thumbnail_bytes / len(memory) / 1000:.1f}KB each "
+          f"(raw frames would be {raw_frame * len(memory) / 1e6:.0f}MB)")
+    print(f"  add         : p50={format_seconds(add.percentile(50))} p95={format_seconds(add.percentile(95))}")
+    print(f"  nearest (5) : p50={format_seconds(nearest.percentile(50))} p95={format_seconds(nearest.percentile(95))}, "
+          f"brute force p50={format_seconds(brute.percentile(50))}")
+    print(f"  label find  : p50={format_seconds(find.percentile(50))} p95={format_seconds(find.percentile(95))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare when robot motion starts with and without speculative tool execution.
+
+Uses a local streaming stand-in model that emits a multi-step plan at a fixed
+token rate, and motion tools that take a fixed time, so no robot or provider is needed.
+
+    python benchmarks/speculative_execution.py --steps 4 --tokens-per-sec 60 --motion-sec 0.5
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import path
+
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.messages import ModelRequest, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+from speculative import SpeculativeRunner, SpeculativeToolset
+
+
+def build_model(plan, args, steps_per_response):
+    token_delay = 1.0 / args.tokens_per_sec
+
+    async def stream(messages, info: AgentInfo):
+        done = sum(1 for m in messages if isinstance(m, ModelRequest) for p in m.parts if isinstance(p, ToolReturnPart))
+        await asyncio.sleep(args.ttft_sec)
+        if done >= len(plan):
+            yield "Done."
+            return
+
+        for i, (name, call_args) in enumerate(plan[done:done + steps_per_response]):
+            yield {i: DeltaToolCall(name=name)}
+            for ch in range(0, len(call_args), 4):  # ~4 characters per token
+                await asyncio.sleep(token_delay)
+                yield {i: DeltaToolCall(json_args=call_args[ch:ch + 4])}
+        # Trailing tokens the provider sends after the last argument (closing events, usage, ...)
+        for _ in range(args.tail_tokens):
+            await asyncio.sleep(token_delay)
+            yield ""
+
+    return FunctionModel(stream_function=stream)
+
+
+def build_toolset(args, starts):
+    toolset = FunctionToolset()
+    robot = threading.Lock()  # the robot performs one motion at a time
+
+    def walk(direction: str, duration_sec: float) -> None:
+        with robot:
+            starts.append(time.perf_counter())
+            time.sleep(args.motion_sec)
+
+    def rotate(angle: float) -> None:
+        with robot:
+            starts.append(time.perf_counter())
+            time.sleep(args.motion_sec)
+
+    toolset.add_function(walk)
+    toolset.add_function(rotate)
+    return toolset
+
+
+def run_once(args, speculative, steps_per_response):
+    plan = []
+    for i in range(args.steps):
+        if i % 2 == 0:
+            plan.append(("walk", json.dumps({"direction": "forward", "duration_sec": 2})))
+        else:
+            plan.append(("rotate", json.dumps({"angle": 90})))
+
+    starts = []
+    toolset = SpeculativeToolset(build_toolset(args, starts), allowed_tools={"walk", "rotate"} if speculative else set())
+    runner = SpeculativeRunner(Agent(build_model(plan, args, steps_per_response), toolsets=[toolset]), toolset)
+
+    t0 = time.perf_counter()
+    runner.run_sync("Patrol the corridor.")
+    total = time.perf_counter() - t0
+    return [s - t0 for s in starts], total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--ttft-sec", type=float, default=0.3)
+    parser.add_argument("--tail-tokens", type=int, default=10)
+    parser.add_argument("--motion-sec", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for steps_per_response, label in ((args.steps, "all steps in one response"), (1, "one step per response")):
+        print(f"\n{label}:")
+        for speculative in (False, True):
+            starts, total = run_once(args, speculative, steps_per_response)
+            mode = "speculative" if speculative else "baseline   "
+            print(f"  {mode} first motion at {starts[0]:.3f}s, step starts {[round(s, 3) for s in starts]}, turn {total:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Count tool calls and model requests per instruction with and without the robot-state context.
+
+Runs a short conversation of heading-related instructions against a simulated
+robot (yaw, rotate, walk; no hardware) once with ROBOT_STATE_CONTEXT off and
+once on. Without --model a scripted stand-in policy is used: it calls
+get_rotation whenever it needs the heading and cannot read it from the request,
+which shows the mechanism but not how often a real model does so. Pass a
+provider model to measure that.
+
+    python benchmarks/state_context.py --model openai:gpt-5-mini
+"""
+import argparse
+import re
+import time
+from typing import Optional
+
+import path
+
+from pydantic_ai import FunctionToolset
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agent import build_agent
+from config import Settings
+from metrics import format_seconds
+from robot_state import STATE_PREFIX, LastCommand
+
+
+INSTRUCTIONS = [
+    "What is your current heading?",
+    "Turn to face heading 90 degrees.",
+    "Turn right by 30 degrees.",
+    "Turn to face heading -45 degrees.",
+    "Walk forward for 2 seconds.",
+    "Which way are you facing now?",
+    "Turn back to heading 0.",
+    "Turn to face heading 180 degrees.",
+]
+
+
+############################################################
+# Simulated robot
+############################################################
+
+yaw_deg = 17.0
+last_command = LastCommand()
+
+toolset = FunctionToolset()
+toolset.metadata = {"robot_description": "Simulated robot that can rotate and walk."}
+toolset.metadata["state_fields"] = {
+    "yaw": lambda: f"{yaw_deg:.1f}°",
+    "last_command": last_command.describe,
+}
+
+
+@toolset.tool_plain
+def rotate(angle: float) -> None:
+    """Rotate the robot in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation."""
+    global yaw_deg
+    last_command.start(f"rotate {angle:+.0f}°")
+    yaw_deg = (yaw_deg + angle + 180.0) % 360.0 - 180.0
+    last_command.finish()
+
+
+@toolset.tool_plain
+def walk(direction: str, duration_sec: float) -> None:
+    """Walk the robot in the specified direction (forward, backward, left, right) for a given duration."""
+    last_command.start(f"walk {direction} {duration_sec}s")
+    last_command.finish()
+
+
+@toolset.tool_plain
+def get_rotation() -> float:
+    """Get the current absolute rotation of the robot in degrees."""
+    return yaw_deg
+
+
+############################################################
+# Stand-in policy
+############################################################
+
+def _known_yaw(request: ModelRequest) -> Optional[float]:
+    for part in request.parts:
+        if isinstance(part, ToolReturnPart) and part.tool_name == "get_rotation":
+            return float(part.content)
+        if isinstance(part, UserPromptPart) and isinstance(part.content, str) and part.content.startswith(STATE_PREFIX):
+            match = re.search(r"yaw=(-?[\d.]+)", part.content)
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def stand_in_policy(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+    """Scripted model: reads the heading from the request if it is there, otherwise asks for it."""
+    instruction = next(
+        p.content for m in reversed(messages) if isinstance(m, ModelRequest) for p in m.parts
+        if isinstance(p, UserPromptPart) and not p.content.startswith(STATE_PREFIX)
+    )
+    request = messages[-1]
+    if any(isinstance(p, ToolReturnPart) and p.tool_name != "get_rotation" for p in request.parts):
+        return ModelResponse(parts=[TextPart("Done.")])
+
+    relative = re.search(r"turn (left|right) by (\d+)", instruction, re.I)
+    if relative:
+        angle = float(relative.group(2)) * (1 if relative.group(1).lower() == "left" else -1)
+        return ModelResponse(parts=[ToolCallPart("rotate", {"angle": angle})])
+    if "walk" in instruction.lower():
+        return ModelResponse(parts=[ToolCallPart("walk", {"direction": "forward", "duration_sec": 2.0})])
+
+    yaw = _known_yaw(request)
+    if yaw is None:
+        return ModelResponse(parts=[ToolCallPart("get_rotation", {})])
+    target = re.search(r"heading (-?\d+)", instruction)
+    if target is None:
+        return ModelResponse(parts=[TextPart(f"I am facing {yaw:.0f} degrees.")])
+    delta = (float(target.group(1)) - yaw + 180.0) % 360.0 - 180.0
+    return ModelResponse(parts=[ToolCallPart("rotate", {"angle": round(delta, 1)})])
+
+
+############################################################
+# Benchmark
+############################################################
+
+def run_conversation(model_name: Optional[str], state_context: bool) -> None:
+    global yaw_deg
+    yaw_deg = 17.0
+    settings = Settings(
+        ROBOT_MODULE="__main__", ROBOT_TOOLSET="toolset", MODEL=model_name or "test",
+        FAST_PATH=False, PLAN_CACHE=False, SPECULATIVE_EXECUTION=False, MODEL_TIERS=[],
+        ROBOT_STATE_CONTEXT=state_context,
+    )
+    robot_agent = build_agent(settings)
+    model = None if model_name else FunctionModel(stand_in_policy)
+
+    messages = None
+    tool_calls = requests = 0
+    start = time.perf_counter()
+    for instruction in INSTRUCTIONS:
+        result = robot_agent.agent.run_sync(instruction, message_history=messages, model=model)
+        calls = [c.tool_name for m in result.new_messages() if isinstance(m, ModelResponse) for c in m.tool_calls]
+        tool_calls += len(calls)
+        requests += result.usage.requests
+        print(f"  {instruction:<38} {', '.join(calls) or '-'}")
+        messages = result.all_messages()
+    elapsed = time.perf_counter() - start
+
+    n = len(INSTRUCTIONS)
+    print(
+        f"  state context {'on ' if state_context else 'off'}: {tool_calls / n:.2f} tool calls and "
+        f"{requests / n:.2f} model requests per instruction, {format_seconds(elapsed / n)} per instruction"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="provider model, default is the scripted stand-in policy")
+    args = parser.parse_args()
+
+    print(f"Model: {args.model or 'scripted stand-in'}")
+    for state_context in (False, True):
+        run_conversation(args.model, state_context)
+
+
+if __name__ == "__main__":
+    main()
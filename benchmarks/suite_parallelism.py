@@ -0,0 +1,43 @@
+"""
+Measure test suite wall time with 1 vs N pytest-xdist workers.
+
+The model-backed suites (tests/tool_calling) spend most of their time waiting on
+the provider, so they gain the most from parallel workers; tests/unitee_sim stays
+on one worker because all its tests drive the same simulator.
+
+    python benchmarks/suite_parallelism.py --workers 1 4 8 -- tests/tool_calling
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def run_suite(workers, targets):
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--dist", "loadgroup", "-n", str(workers), *targets]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    summary = completed.stdout.strip().splitlines()[-1] if completed.stdout.strip() else completed.stderr.strip()
+    return elapsed, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("targets", nargs="*", default=["tests"])
+    args = parser.parse_args()
+
+    baseline = None
+    for workers in args.workers:
+        elapsed, summary = run_suite(workers, args.targets)
+        baseline = baseline or elapsed
+        print(f"{workers:>2} workers: {elapsed:6.2f}s wall ({baseline / elapsed:.2f}x)  {summary}")
+
+
+if __name__ == "__main__":
+    main()
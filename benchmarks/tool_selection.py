@@ -0,0 +1,226 @@
+"""
+Measure the tool-definition tokens sent per model request with and without the tool filter.
+
+Runs a short mixed conversation (motion, camera, memory, time and web questions)
+against a simulated robot that also has the G1 actions still commented out in
+unitree_g1.py (wave_hand, shake_hand, low_stand, ...), once with TOOL_FILTER off
+and once on. Without --model a scripted stand-in policy calls the tool named by
+each instruction and calls show_all_tools when it is hidden, so misses cost a
+request the way they would with a real model; tokens are estimated from the
+tool definitions it receives. With --model the provider's input token counts
+are reported as well.
+
+    python benchmarks/tool_selection.py --model openai:gpt-5-mini
+"""
+import argparse
+import time
+from typing import Optional
+
+import path
+
+from pydantic_ai import FunctionToolset
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agent import build_agent
+from config import Settings
+from metrics import format_seconds
+from tool_filter import SHOW_ALL_TOOLS, estimate_tokens
+
+
+# (instruction, tool the stand-in policy calls)
+CONVERSATION = [
+    ("Walk forward for 2 seconds.", "walk"),
+    ("Now turn left by 90 degrees.", "rotate"),
+    ("What do you see in front of you?", "get_camera_snapshot"),
+    ("Remember this spot as the kitchen door.", "remember_place"),
+    ("Wave at the guest.", "wave_hand"),
+    ("What time is it?", "get_date_and_time"),
+    ("Search the news about humanoid robots.", "duckduckgo_search"),
+    ("Greet the visitor with a handshake.", "shake_hand"),
+    ("Lower yourself a bit.", "low_stand"),
+    ("Go back to the kitchen door.", "recall_places"),
+]
+
+
+############################################################
+# Simulated robot
+############################################################
+
+toolset = FunctionToolset()
+toolset.metadata = {"robot_description": "Simulated humanoid robot that can move, look around, gesture and remember places."}
+toolset.metadata["tool_groups"] = {
+    "motion": {"tools": ["walk", "rotate", "get_rotation"], "words": ["walk", "go", "turn", "rotate", "heading", "left", "right", "forward", "back"]},
+    "vision": {"tools": ["get_camera_snapshot", "detect_markers"], "words": ["see", "look", "camera", "marker", "front"]},
+    "memory": {"tools": ["remember_place", "recall_places", "nearby_places"], "words": ["remember", "recall", "place", "spot", "back", "door"]},
+    "gestures": {"tools": ["wave_hand", "shake_hand"], "words": ["wave", "greet", "hand", "handshake", "hello"]},
+    "posture": {"tools": ["low_stand", "high_stand", "squat_to_stand", "stand_to_squat", "damp"], "words": ["stand", "squat", "sit", "posture", "damp", "relax"]},
+}
+
+
+@toolset.tool_plain
+def walk(direction: str, duration_sec: float) -> None:
+    """Walk the robot in the specified direction (forward, backward, left, right) for a given duration. 4 seconds of walking roughly equates to 1 meter."""
+
+
+@toolset.tool_plain
+def rotate(angle: float) -> None:
+    """Rotate the robot in place by a relative angle in degrees in range <-180, +180> where positive values correspond to counter-clockwise (left) rotation."""
+
+
+@toolset.tool_plain
+def get_rotation() -> float:
+    """Get the current yaw rotation of the robot in degrees in range [-180, 180]."""
+    return 0.0
+
+
+@toolset.tool_plain
+def get_camera_snapshot() -> str:
+    """Take a snapshot with the robot's head camera and return the image."""
+    return "image"
+
+
+@toolset.tool_plain
+def detect_markers(colors: Optional[list[str]] = None) -> str:
+    """Detect ArUco markers and colored blobs in the current camera frame; returns their label, bearing and approximate distance."""
+    return "No markers."
+
+
+@toolset.tool_plain
+def remember_place(label: str) -> str:
+    """Remember the current location under a short description, e.g. 'kitchen door' or 'charging station'. Use recall_places later to find the way back."""
+    return "Remembered."
+
+
+@toolset.tool_plain
+def recall_places(query: str) -> str:
+    """Find remembered places and earlier observations matching a description. Returns how far away each one is and the rotate angle and walk duration to get there."""
+    return "No matching places remembered."
+
+
+@toolset.tool_plain
+def nearby_places() -> str:
+    """List the remembered places and observations closest to the current location."""
+    return "No matching places remembered."
+
+
+@toolset.tool_plain
+def wave_hand(turn_around: bool = False) -> None:
+    """Wave a hand, optionally turning around first."""
+
+
+@toolset.tool_plain
+def shake_hand() -> None:
+    """Hold out the right hand for a handshake and retract it after a few seconds."""
+
+
+@toolset.tool_plain
+def low_stand() -> None:
+    """Lower the standing height."""
+
+
+@toolset.tool_plain
+def high_stand() -> None:
+    """Raise the standing height."""
+
+
+@toolset.tool_plain
+def squat_to_stand() -> None:
+    """Stand up from a squat."""
+
+
+@toolset.tool_plain
+def stand_to_squat() -> None:
+    """Squat down from standing."""
+
+
+@toolset.tool_plain
+def damp() -> None:
+    """Switch the motors to damping mode."""
+
+
+############################################################
+# Stand-in policy
+############################################################
+
+tool_tokens: list[int] = []  # estimated tool-definition tokens of each request
+
+
+def stand_in_policy(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+    """Scripted model: calls the instruction's tool, asking for all tools first if it is hidden.
+
+    Tools of the general toolset (web search, time) only need to be visible; they
+    are not called, so the benchmark runs offline.
+    """
+    tool_tokens.append(sum(estimate_tokens(t) for t in info.function_tools))
+    instruction = next(
+        p.content for m in reversed(messages) if isinstance(m, ModelRequest) for p in m.parts
+        if isinstance(p, UserPromptPart) and isinstance(p.content, str) and not p.content.startswith("[")
+    )
+    tool = dict(CONVERSATION)[instruction]
+    returned = [p.tool_name for p in messages[-1].parts if isinstance(p, ToolReturnPart)]
+    if tool in returned:
+        return ModelResponse(parts=[TextPart("Done.")])
+    if tool not in {t.name for t in info.function_tools}:
+        return ModelResponse(parts=[ToolCallPart(SHOW_ALL_TOOLS, {})])
+    if tool not in toolset.tools:
+        return ModelResponse(parts=[TextPart("Done.")])
+    args = {
+        "walk": {"direction": "forward", "duration_sec": 2.0}, "rotate": {"angle": 90.0},
+        "remember_place": {"label": "kitchen door"}, "recall_places": {"query": "kitchen door"},
+    }.get(tool, {})
+    return ModelResponse(parts=[ToolCallPart(tool, args)])
+
+
+############################################################
+# Benchmark
+############################################################
+
+def run_conversation(model_name: Optional[str], tool_filter: bool) -> None:
+    settings = Settings(
+        ROBOT_MODULE="__main__", ROBOT_TOOLSET="toolset", MODEL=model_name or "test",
+        FAST_PATH=False, PLAN_CACHE=False, SPECULATIVE_EXECUTION=False, MODEL_TIERS=[],
+        ROBOT_STATE_CONTEXT=False, TOOL_FILTER=tool_filter,
+    )
+    robot_agent = build_agent(settings)
+    model = None if model_name else FunctionModel(stand_in_policy)
+    tool_tokens.clear()
+
+    messages = None
+    requests = input_tokens = 0
+    start = time.perf_counter()
+    for instruction, _ in CONVERSATION:
+        sent_before = len(tool_tokens)
+        result = robot_agent.agent.run_sync(instruction, message_history=messages, model=model)
+        calls = [c.tool_name for m in result.new_messages() if isinstance(m, ModelResponse) for c in m.tool_calls]
+        requests += result.usage.requests
+        input_tokens += result.usage.input_tokens
+        turn_tokens = sum(tool_tokens[sent_before:])
+        print(f"  {instruction:<42} {', '.join(calls) or '-':<40} {turn_tokens:>5} tool tokens")
+        messages = result.all_messages()
+    elapsed = time.perf_counter() - start
+
+    n = len(CONVERSATION)
+    line = (
+        f"  filter {'on ' if tool_filter else 'off'}: {requests / n:.2f} requests and ~{sum(tool_tokens) / max(1, len(tool_tokens)):.0f} "
+        f"tool tokens per request, {format_seconds(elapsed / n)} per instruction"
+    )
+    if model_name:
+        line += f", {input_tokens / n:.0f} provider input tokens per instruction"
+    print(line)
+    if robot_agent.tool_filter:
+        print(f"  {robot_agent.tool_filter.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="provider model, default is the scripted stand-in policy")
+    args = parser.parse_args()
+
+    print(f"Model: {args.model or 'scripted stand-in'}")
+    for tool_filter in (False, True):
+        run_conversation(args.model, tool_filter)
+
+
+if __name__ == "__main__":
+    main()
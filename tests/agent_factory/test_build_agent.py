@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from agent import build_agent  # type: ignore
+from config import Settings  # type: ignore
+from model_router import RoutingModel  # type: ignore
+
+
+def settings(**overrides):
+    values = dict(ROBOT_MODULE="robots.test_robot", ROBOT_TOOLSET="toolset", MODEL="test", PLAN_CACHE=False)
+    values.update(overrides)
+    return Settings(**values)
+
+
+def call_then_answer(tool_name):
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[TextPart(f"Done with {tool_name}.")])
+        return ModelResponse(parts=[ToolCallPart(tool_name, {})])
+    return FunctionModel(respond)
+
+
+def test_agents_are_independent_but_share_construction():
+
+    first = build_agent(settings())
+    second = build_agent(settings())
+
+    assert first.agent is not second.agent,                                         "Each call must return a new agent"
+    assert first.fast_path is not second.fast_path,                                 "Per-agent helpers must not be shared"
+    assert first.robot_toolset is second.robot_toolset,                             "The robot toolset should be built once"
+    assert first.model is second.model,                                             "Provider models should be shared"
+
+    first.run_sync("crouch")
+    assert (first.fast_path.hits, second.fast_path.hits) == (1, 0),                 "Fast path statistics leaked between agents"
+
+
+def test_differently_configured_agents_side_by_side():
+
+    routed = build_agent(settings(MODEL_TIERS=["test", "test"], FAST_PATH=False))
+    plain = build_agent(settings())
+
+    assert isinstance(routed.model, RoutingModel),                                  "MODEL_TIERS should build a routing model"
+    assert routed.fast_path is None and plain.fast_path is not None,                "FAST_PATH applies per agent"
+    assert build_agent(settings(MODEL_TIERS=["test"])).model is not routed.model,   "Routers keep per-agent statistics"
+
+
+def test_concurrent_runs_do_not_interfere():
+
+    tools = ["crouch", "stand", "wave_right_arm", "crouch"]
+    agents = [build_agent(settings(FAST_PATH=False)) for _ in tools]
+
+    def run(i):
+        result = agents[i].agent.run_sync("Do it.", model=call_then_answer(tools[i]))
+        return result.output, [c.tool_name for m in result.all_messages() if isinstance(m, ModelResponse) for c in m.tool_calls]
+
+    with ThreadPoolExecutor(max_workers=len(tools)) as pool:
+        results = list(pool.map(run, range(len(tools))))
+
+    for tool, (output, calls) in zip(tools, results):
+        assert calls == [tool],                                                     f"Expected only {tool}, got {calls}"
+        assert output == f"Done with {tool}.",                                      f"Unexpected output {output!r}"
+
+
+def test_process_wide_robot_settings_are_reported(capsys):
+
+    build_agent(settings(CONTROL_PROCESS=True))
+    assert "CONTROL_PROCESS apply to the whole process" in capsys.readouterr().out,  "Ignored robot settings should be reported"
+
+    build_agent(settings())
+    assert "whole process" not in capsys.readouterr().out,                          "Default settings should not be reported"
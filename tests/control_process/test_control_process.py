@@ -0,0 +1,67 @@
+import threading
+import time
+
+import path
+
+from robots.control_process import ControlLoop, ControlProcess, SharedControlBlock, command_data  # type: ignore
+
+
+def run_loop(block, published, setpoint_timeout_sec=0.5):
+    loop = ControlLoop(block, rate_hz=200.0, publish=published.append, setpoint_timeout_sec=setpoint_timeout_sec)
+    thread = threading.Thread(target=loop.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_loop_publishes_active_setpoint_then_one_stop():
+
+    block = SharedControlBlock.create()
+    published = []
+    thread = run_loop(block, published)
+    try:
+        block.setpoint.write(0.3, 0.0, 0.5, -0.5, 1.0, time.monotonic())
+        time.sleep(0.1)
+        block.setpoint.write(0.0, 0.0, 0.0, -0.5, 0.0, time.monotonic())
+        time.sleep(0.1)
+    finally:
+        block.request_shutdown()
+        thread.join(1.0)
+        block.close()
+
+    moving = command_data(0.3, 0.0, 0.5, -0.5)
+    stop = command_data(0.0, 0.0, 0.0, -0.5)
+    assert published.count(moving) >= 10,                                          f"Expected the setpoint every period, got {published.count(moving)} commands"
+    assert published[-1] == stop and published.count(stop) == 1,                   "Deactivating must publish exactly one stop and then go quiet"
+
+
+def test_stale_setpoint_stops_the_robot():
+
+    block = SharedControlBlock.create()
+    published = []
+    thread = run_loop(block, published, setpoint_timeout_sec=0.05)
+    try:
+        block.setpoint.write(0.3, 0.0, 0.0, -0.5, 1.0, time.monotonic())  # never refreshed, as if the agent hung
+        time.sleep(0.2)
+    finally:
+        block.request_shutdown()
+        thread.join(1.0)
+        block.close()
+
+    assert published[-1] == command_data(0.0, 0.0, 0.0, -0.5),                     "A stale setpoint must end with a stop"
+    assert len(published) < 20,                                                     f"Loop kept publishing after the timeout ({len(published)} commands)"
+
+
+def test_control_process_runs_and_shuts_down():
+
+    control = ControlProcess(rate_hz=200.0, topic=None, lowstate_topic=None)
+    try:
+        deadline = time.monotonic() + 10.0
+        while control.loops < 50 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert control.loops >= 50,                                                 "Control process did not start looping"
+        assert control.get_imu() is None,                                           "No IMU state without a lowstate topic"
+        assert len(control.block.periods()) > 0,                                    "Loop periods should be recorded"
+    finally:
+        control.close()
+
+    assert not control.is_alive(),                                                  "Control process should exit on close"
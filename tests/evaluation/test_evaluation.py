@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+import agent  # type: ignore
+from config import Settings  # type: ignore
+from evaluation import EvalCase, ResultStore, evaluate_model, load_cases, score_tool_calls, summarize  # type: ignore
+
+
+CASES = [
+    EvalCase("turn", "Rotate 90 degrees to the right.", [{"tool": "turn_right", "args": {"degrees": 90}}]),
+    EvalCase("walk", "Take three steps forward.", [{"tool": "step_forward", "args": {"steps": 3}}]),
+    EvalCase("hello", "Hello!", []),
+]
+
+
+def scripted_model(calls_per_instruction):
+    """Answers each instruction with a fixed list of tool calls, then a text reply."""
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[TextPart("Done.")])
+        instruction = messages[-1].parts[-1].content
+        calls = calls_per_instruction.get(instruction, [])
+        return ModelResponse(parts=[ToolCallPart(name, args) for name, args in calls] or [TextPart("Hi!")])
+    return FunctionModel(respond)
+
+
+def test_scoring_checks_order_and_listed_args():
+
+    case = CASES[0]
+    assert score_tool_calls(case, [ToolCallPart("turn_right", {"degrees": 90.0})])[0],          "Equal numbers must match"
+    assert score_tool_calls(case, [ToolCallPart("turn_right", '{"degrees": 90, "x": 1}')])[0],  "Unlisted args are not checked"
+    assert not score_tool_calls(case, [ToolCallPart("turn_right", {"degrees": 45})])[0],        "Wrong argument must fail"
+    assert not score_tool_calls(case, [])[0],                                                   "Missing call must fail"
+    assert score_tool_calls(CASES[2], [])[0],                                                   "No calls expected and none made"
+
+
+def test_load_cases_skips_comments(tmp_path):
+
+    file = tmp_path / "cases.jsonl"
+    file.write_text("# comment\n" + "\n".join(json.dumps(c.__dict__) for c in CASES) + "\n\n")
+    cases = load_cases(str(file))
+    assert [c.id for c in cases] == ["turn", "walk", "hello"],                    f"Unexpected cases {cases}"
+
+
+def test_concurrent_evaluation_resumes(tmp_path, monkeypatch):
+
+    model = scripted_model({
+        "Rotate 90 degrees to the right.": [("turn_right", {"degrees": 90})],
+        "Take three steps forward.": [("step_forward", {"steps": 2})],  # wrong on purpose
+    })
+    monkeypatch.setattr(agent, "load_model", lambda name, keepalive_sec=0.0: model)
+    settings = Settings(ROBOT_MODULE="robots.test_robot", MODEL="scripted")
+    results_file = str(tmp_path / "results.jsonl")
+
+    store = ResultStore(results_file)
+    asyncio.run(evaluate_model(settings, "scripted", CASES[:2], store, concurrency=2))
+
+    resumed = ResultStore(results_file)
+    assert len(resumed.results) == 2,                                             "Results must be persisted per case"
+    asyncio.run(evaluate_model(settings, "scripted", CASES, resumed, concurrency=2))
+    assert [r.case_id for r in resumed.results].count("turn") == 1,               "Finished cases must not run again"
+
+    summary = summarize("scripted", resumed.for_model("scripted"), 1.0, 1)
+    assert summary["cases"] == 3,                                                 f"Expected 3 results, got {summary['cases']}"
+    assert abs(summary["accuracy"] - 2 / 3) < 1e-9,                               f"Expected 2/3 accuracy, got {summary['accuracy']}"
+    assert summary["input_tokens"] > 0 and summary["latency_p95"] is not None,    "Usage and latency should be reported"
+
+
+def test_errored_cases_are_retried_on_resume(tmp_path, monkeypatch):
+
+    failing = {"on": True}
+
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if failing["on"]:
+            raise RuntimeError("provider unavailable")
+        return ModelResponse(parts=[TextPart("Hi!")])
+
+    monkeypatch.setattr(agent, "load_model", lambda name, keepalive_sec=0.0: FunctionModel(respond))
+    settings = Settings(ROBOT_MODULE="robots.test_robot", MODEL="scripted")
+    results_file = str(tmp_path / "results.jsonl")
+
+    store = ResultStore(results_file)
+    asyncio.run(evaluate_model(settings, "scripted", CASES[2:], store))
+    summary = summarize("scripted", store.for_model("scripted"), 1.0, 1, len(store.errors_for_model("scripted")))
+    assert summary["errors"] == 1 and summary["cases"] == 0,                      f"Errors must not be scored: {summary}"
+
+    failing["on"] = False
+    resumed = ResultStore(results_file)
+    asyncio.run(evaluate_model(settings, "scripted", CASES[2:], resumed))
+    assert [r.passed for r in resumed.for_model("scripted")] == [True],           "Errored case must run again on resume"
@@ -0,0 +1,84 @@
+from typing import Literal
+
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.messages import ModelResponse, SystemPromptPart, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from fast_path import FastPath  # type: ignore
+
+
+def unitree_like_toolset(log):
+    toolset = FunctionToolset()
+    toolset.metadata = {"fast_path": {
+        "walk": {"phrases": ["walk", "go"]},
+        "rotate": {"phrases": ["rotate", "turn"], "signs": {"angle": {"left": 1, "right": -1}}},
+        "get_rotation": {"phrases": ["rotation"], "reply": "My current rotation is {result:.0f} degrees."},
+    }}
+
+    def walk(direction: Literal["forward", "backward", "left", "right"], duration_sec: float) -> None:
+        log.append(("walk", direction, duration_sec))
+
+    def rotate(angle: float) -> None:
+        log.append(("rotate", angle))
+
+    def get_rotation() -> float:
+        return 42.0
+
+    toolset.add_function(walk)
+    toolset.add_function(rotate)
+    toolset.add_function(get_rotation)
+    return toolset
+
+
+def test_parses_commands_from_tool_signatures():
+
+    fast_path = FastPath(unitree_like_toolset([]))
+
+    assert fast_path.parse("Turn left 90 degrees") == ("rotate", {"angle": 90.0}),                 "Left turn should be a positive angle"
+    assert fast_path.parse("turn right 45°.") == ("rotate", {"angle": -45.0}),                     "Right turn should be a negative angle"
+    assert fast_path.parse("Walk forward for 3 seconds") == ("walk", {"direction": "forward", "duration_sec": 3.0}), "Walk should fill the Literal and the number"
+    assert fast_path.parse("go backward 2s") == ("walk", {"direction": "backward", "duration_sec": 2.0}), "Unit suffixes should be accepted"
+    assert fast_path.parse("What is your rotation?") == ("get_rotation", {}),                      "Question should map to get_rotation"
+
+
+def test_ambiguous_commands_fall_through():
+
+    fast_path = FastPath(unitree_like_toolset([]))
+
+    for text in (
+        "Walk forward 3 seconds, then turn left 90 degrees",
+        "Turn left slowly",
+        "Walk forward 2 meters",
+        "Go to the door",
+        "Turn left",
+        "Hello, what is your name?",
+    ):
+        assert fast_path.parse(text) is None,                                                     f"Expected '{text}' to fall through to the agent"
+
+
+def test_fast_path_turn_is_written_to_history():
+
+    log = []
+    toolset = unitree_like_toolset(log)
+    fast_path = FastPath(toolset, system_prompt="You are the brain of a robot.")
+
+    result = fast_path.try_run("turn left 90 degrees")
+
+    assert log == [("rotate", 90.0)],                                                             f"Expected the tool to run once, got {log}"
+    assert result.output == "Done.",                                                              f"Unexpected reply {result.output}"
+    assert fast_path.hits == 1 and fast_path.hit_latency.count == 1,                              "Hit should be recorded"
+
+    seen = []
+
+    def model(messages, info: AgentInfo) -> ModelResponse:
+        seen.extend(messages)
+        return ModelResponse(parts=[TextPart("ok")])
+
+    agent = Agent(FunctionModel(model), system_prompt="You are the brain of a robot.", toolsets=[toolset])
+    agent.run_sync("Why did you turn?", message_history=result.all_messages())
+
+    system_parts = [p for m in seen for p in getattr(m, "parts", []) if isinstance(p, SystemPromptPart)]
+    assert len(system_parts) == 1,                                                                "History must carry the system prompt exactly once"
+    assert any(getattr(m, "tool_calls", None) for m in seen),                                     "The model should see the fast-path tool call"
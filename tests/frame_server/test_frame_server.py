@@ -0,0 +1,85 @@
+import json
+import time
+
+import cv2
+import numpy as np
+import zmq
+
+import path
+
+from robots.frame_server import CameraStream, SyntheticFrameServer, read_frame_stamp, stamp_frame  # type: ignore
+
+
+def receive_frame(endpoint, timeout_ms=3000):
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.SUB)
+    socket.setsockopt(zmq.SUBSCRIBE, b"")
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    try:
+        if not socket.poll(timeout_ms):
+            return None
+        return cv2.imdecode(np.frombuffer(socket.recv(), np.uint8), cv2.IMREAD_COLOR)
+    finally:
+        socket.close()
+
+
+def test_stamp_survives_jpeg():
+
+    img = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    now = time.time()
+    stamp_frame(img, now)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 50])
+    decoded = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+    assert ok,                                                       "JPEG encoding failed"
+    assert abs(read_frame_stamp(decoded) - now) < 0.002,             "Stamp must survive JPEG compression to the millisecond"
+    assert read_frame_stamp(np.zeros((480, 640, 3), np.uint8)) is None, "Frames without a stamp must read as None"
+    assert read_frame_stamp(np.zeros((8, 8, 3), np.uint8)) is None,  "Frames too small for a stamp must read as None"
+
+
+def test_config_and_frames():
+
+    server = SyntheticFrameServer(
+        [CameraStream("head", 1280, 480, 30.0, port=-1, binocular=True), CameraStream("left", 640, 480, 15.0, port=-1, delay_ms=40.0)],
+        request_port=-1,
+    ).start()
+    try:
+        request = zmq.Context.instance().socket(zmq.REQ)
+        request.setsockopt(zmq.LINGER, 0)
+        request.connect(f"tcp://127.0.0.1:{server.request_port}")
+        request.send(b"GET_DATA")
+        assert request.poll(3000),                                   "Config request not answered"
+        config = json.loads(request.recv())
+        request.close()
+
+        head = receive_frame(f"tcp://127.0.0.1:{config['head_camera']['zmq_port']}")
+        left = receive_frame(f"tcp://127.0.0.1:{config['camera']['left_wrist_camera']['zmq_port']}")
+        left_age = time.time() - read_frame_stamp(left)
+    finally:
+        server.stop()
+
+    assert config["head_camera"]["image_shape"] == [480, 1280],     f"Unexpected head config {config['head_camera']}"
+    assert config["head_camera"]["binocular"] is True,              "Binocular flag not reported"
+    assert config["right_wrist_camera"]["enable_zmq"] is False,     "Unserved camera must be disabled"
+    assert head is not None and head.shape == (480, 1280, 3),       "Head frame missing or wrong size"
+    assert left is not None and left.shape == (480, 640, 3),        "Wrist frame missing or wrong size"
+    assert 0.04 <= left_age < 1.0,                                  f"Injected delay not reflected in frame age: {left_age:.3f}s"
+
+
+def test_drops_and_stalls():
+
+    server = SyntheticFrameServer(
+        [CameraStream("head", 320, 240, 50.0, port=-1, drop_rate=1.0), CameraStream("right", 320, 240, 50.0, port=-1, stall_every_sec=1.0, stall_sec=1.0)],
+        request_port=-1,
+    ).start()
+    try:
+        head = receive_frame(f"tcp://127.0.0.1:{server.ports['head']}", timeout_ms=300)
+        right = receive_frame(f"tcp://127.0.0.1:{server.ports['right']}", timeout_ms=300)
+    finally:
+        server.stop()
+
+    assert head is None and right is None,                          "Dropped and stalled frames must not be sent"
+    assert server.stats["head"].dropped > 0,                        "Drops not counted"
+    assert server.stats["right"].stalled > 0,                       "Stalls not counted"
+    assert server.stats["head"].published == server.stats["right"].published == 0, "Nothing should be published"
@@ -0,0 +1,112 @@
+import asyncio
+
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelAPIError
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from hedged_model import HedgedModel  # type: ignore
+
+
+def stand_in(name, delay, fail=False):
+    state = {"calls": 0, "cancelled": 0}
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        state["calls"] += 1
+        try:
+            await asyncio.sleep(delay[(state["calls"] - 1) % len(delay)] if isinstance(delay, list) else delay)
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+        if fail:
+            raise ModelAPIError(name, "provider error")
+        return ModelResponse(parts=[TextPart(f"from {name}")])
+
+    return FunctionModel(respond, model_name=name), state
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+
+    primary, primary_state = stand_in("primary", 1.0)
+    backup, backup_state = stand_in("backup", 0.01)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.05, max_hedge_rate=1.0)
+
+    result = Agent(model).run_sync("Turn left.")
+
+    assert result.output == "from backup",                                          "Backup answer should win"
+    assert primary_state["cancelled"] == 1,                                         "Slow primary must be cancelled"
+    assert (model.stats.hedges, model.stats.backup_wins) == (1, 1),                 "Hedge not counted"
+
+
+def test_fast_primary_is_not_hedged():
+
+    primary, _ = stand_in("primary", 0.0)
+    backup, backup_state = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.2)
+
+    assert Agent(model).run_sync("Turn left.").output == "from primary",             "Primary answer expected"
+    assert backup_state["calls"] == 0 and model.stats.hedges == 0,                  "No hedge for a fast primary"
+
+
+def test_hedge_rate_budget():
+
+    primary, _ = stand_in("primary", 0.05)
+    backup, backup_state = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.01, max_hedge_rate=0.25, budget_window=8)
+    agent = Agent(model)
+
+    for _ in range(8):
+        agent.run_sync("Turn left.")
+
+    assert model.stats.hedges == 2 and backup_state["calls"] == 2,                  f"Budget exceeded: {model.snapshot()}"
+    assert model.stats.budget_denied == 6,                                          "Denied hedges not counted"
+
+
+def test_failed_primary_falls_back_to_backup():
+
+    primary, _ = stand_in("primary", 0.0, fail=True)
+    backup, _ = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=5.0, max_hedge_rate=1.0)
+
+    assert Agent(model).run_sync("Turn left.").output == "from backup",              "Backup should answer a failed primary"
+
+
+def test_cancelled_caller_cancels_primary_during_hedge_delay():
+
+    primary, primary_state = stand_in("primary", 1.0)
+    backup, backup_state = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.5, max_hedge_rate=1.0)
+
+    async def cancel_early():
+        run = asyncio.ensure_future(Agent(model).run("Turn left."))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        return primary_state["cancelled"]  # before asyncio.run cancels what is left over
+
+    assert asyncio.run(cancel_early()) == 1 and backup_state["calls"] == 0,         "Primary must be cancelled with its caller"
+
+
+def test_first_request_can_hedge():
+
+    primary, _ = stand_in("primary", 1.0)
+    backup, _ = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.05)  # default budget of 10% of 100 requests
+
+    assert Agent(model).run_sync("Turn left.").output == "from backup",              f"First request should hedge: {model.snapshot()}"
+
+
+def test_hedge_delay_does_not_shrink_under_a_heavy_tail():
+
+    primary, _ = stand_in("primary", [0.005, 0.005, 0.005, 0.005, 0.5])  # every fifth request is slow
+    backup, _ = stand_in("backup", 0.0)
+    model = HedgedModel(primary, backup, hedge_delay_sec=0.1, hedge_percentile=90, min_samples=5, max_hedge_rate=1.0)
+    agent = Agent(model)
+
+    for _ in range(20):
+        agent.run_sync("Turn left.")
+
+    assert model.stats.backup_wins == 4,                                            f"Slow requests should hedge: {model.snapshot()}"
+    assert model.hedge_delay() >= 0.1,                                              f"Hedged requests must count as slow: {model.snapshot()}"
@@ -0,0 +1,73 @@
+from pydantic_ai import Agent, FunctionToolset, ModelRetry
+from pydantic_ai.capabilities import ProcessHistory
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from model_router import RoutingModel, classify_turn  # type: ignore
+from robot_state import RobotStateContext  # type: ignore
+
+
+def tool_then_answer(name):
+    """Model that calls `wave` once, then answers with its own name."""
+
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[TextPart(name)])
+        return ModelResponse(parts=[ToolCallPart("wave", {})])
+
+    return FunctionModel(respond, model_name=name)
+
+
+def build_agent(model, fail_first_call, state_context=None):
+    toolset = FunctionToolset()
+    calls = []
+
+    @toolset.tool_plain
+    def wave() -> None:
+        calls.append(1)
+        if fail_first_call and len(calls) == 1:
+            raise ModelRetry("Arm is busy, try again.")
+
+    capabilities = [ProcessHistory(state_context.inject)] if state_context else None
+    return Agent(model, output_type=str, toolsets=[toolset], capabilities=capabilities)
+
+
+def test_classify_turn():
+
+    assert classify_turn("What time is it?") == 0,                                                    "Single question should be the cheapest tier"
+    assert classify_turn("Crouch, then stand up.") == 1,                                              "Short sequence should be the middle tier"
+    assert classify_turn("Explore the room and find the door.") == 2,                                 "Planning should be the strongest tier"
+
+
+def test_simple_turn_stays_on_cheap_model():
+
+    model = RoutingModel(tool_then_answer("fast"), tool_then_answer("strong"))
+    result = build_agent(model, fail_first_call=False).run_sync("Wave.")
+
+    assert result.output == "fast",                                                                   f"Expected the fast model to answer, got {result.output}"
+    assert model.stats[0].turns == 1 and model.stats[1].requests == 0,                               "Strong model should not be used"
+
+
+def test_model_retry_escalates_to_next_tier():
+
+    model = RoutingModel(tool_then_answer("fast"), tool_then_answer("strong"))
+    result = build_agent(model, fail_first_call=True).run_sync("Wave.")
+
+    assert result.output == "strong",                                                                 f"Expected escalation to the strong model, got {result.output}"
+    assert model.stats[0].escalations == 1,                                                           f"Expected one escalation, got {model.stats[0].escalations}"
+    assert model.stats[0].latency.count == 1 and model.stats[1].latency.count == 2,                   "Latency should be recorded per tier"
+
+
+def test_robot_state_does_not_start_turns():
+
+    state_context = RobotStateContext({"yaw": lambda: "12.0°", "height": lambda: "0.7m", "last_command": lambda: "rotate +90°, done"})
+    model = RoutingModel(tool_then_answer("fast"), tool_then_answer("mid"), tool_then_answer("strong"))
+    simple = build_agent(model, fail_first_call=False, state_context=state_context).run_sync("Wave.")
+
+    assert simple.output == "fast",                                                                   f"State text must not raise the tier, got {simple.output}"
+    assert model.stats[0].turns == 1 and model.stats[0].requests == 2,                               "Tool return with state is the same turn"
+
+    retried = build_agent(model, fail_first_call=True, state_context=state_context).run_sync("Wave.")
+    assert retried.output == "mid" and model.stats[0].escalations == 1,                              "Retry must still escalate one tier with state injected"
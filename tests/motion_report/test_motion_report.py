@@ -0,0 +1,42 @@
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from robots.motion_report import MotionOutcome  # type: ignore
+
+
+def test_rounding_and_text():
+
+    outcome = MotionOutcome(
+        action="rotate +90°", termination="tolerance", elapsed_sec=2.345, commands_sent=41,
+        requested_deg=90.0, yaw_delta_deg=89.27, final_heading_deg=float("nan"),
+    )
+
+    assert outcome.elapsed_sec == 2.3 and outcome.yaw_delta_deg == 89.3,             "Floats should be rounded to 0.1"
+    assert outcome.final_heading_deg is None,                                       "Non-finite values should become None"
+    assert str(outcome) == "rotate +90°: turned +89°.",                              f"Unexpected text {outcome}"
+
+    timed_out = MotionOutcome("rotate -170°", "timeout", 10.0, 500, -170.0, -120.0, 47.0)
+    assert str(timed_out) == "rotate -170°: turned -120°, now facing 47° (ended by timeout).", f"Unexpected text {timed_out}"
+
+
+def test_outcome_reaches_the_model():
+
+    toolset = FunctionToolset()
+
+    @toolset.tool_plain
+    def rotate(angle: float) -> MotionOutcome:
+        return MotionOutcome(f"rotate {angle:+.0f}°", "overshoot", 1.0, 20, angle, angle + 1.5, 31.5)
+
+    def policy(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if len(messages) == 1:
+            return ModelResponse(parts=[ToolCallPart("rotate", {"angle": 30})])
+        returned = next(p for p in messages[-1].parts if isinstance(p, ToolReturnPart))
+        return ModelResponse(parts=[TextPart(returned.model_response_str())])
+
+    result = Agent(FunctionModel(policy), toolsets=[toolset]).run_sync("turn left 30")
+
+    assert '"yaw_delta_deg":31.5' in result.output,                                 f"Measured rotation missing from {result.output}"
+    assert '"termination":"overshoot"' in result.output,                            f"Termination missing from {result.output}"
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+import path
+
+from robots.perception import DEFAULT_BLOB_COLORS, MarkerDetector, describe_detections  # type: ignore
+
+
+def place_marker(img, dictionary, marker_id, x, y, size):
+    marker = cv2.aruco.generateImageMarker(cv2.aruco.getPredefinedDictionary(dictionary), marker_id, size)
+    pad = size // 5
+    img[y - pad:y + size + pad, x - pad:x + size + pad] = 255
+    img[y:y + size, x:x + size] = cv2.cvtColor(marker, cv2.COLOR_GRAY2BGR)
+
+
+def test_markers_bearing_and_distance():
+
+    img = np.full((480, 640, 3), 128, np.uint8)
+    place_marker(img, cv2.aruco.DICT_4X4_50, 7, 70, 190, 100)   # left of center
+    place_marker(img, cv2.aruco.DICT_APRILTAG_36h11, 3, 420, 190, 50)  # right, half the size
+
+    detector = MarkerDetector(marker_size_m=0.15, hfov_deg=90.0)
+    detections = detector.detect(img)
+    by_label = {d.label: d for d in detections}
+
+    assert [(d.kind, d.label) for d in detections] == [("aruco", "7"), ("apriltag", "3")], f"Unexpected detections {detections}"
+    assert by_label["7"].bearing_deg > 0 > by_label["3"].bearing_deg,                   "Left must be positive, right negative"
+    # 90° HFOV at 640px -> focal 320px, a 0.15m marker seen 100px wide is ~0.48m away
+    assert abs(by_label["7"].distance_m - 0.48) < 0.05,                                 f"Distance estimate {by_label['7'].distance_m:.2f}m"
+    assert abs(by_label["3"].distance_m / by_label["7"].distance_m - 2.0) < 0.15,       "Half the size should be twice as far"
+
+
+def test_blobs_and_text_output():
+
+    img = np.full((480, 640, 3), 128, np.uint8)
+    cv2.circle(img, (320, 300), 40, (0, 0, 220), -1)  # red, straight ahead
+
+    assert MarkerDetector().detect(img) == [],                                          "Blob detection must be off by default"
+
+    detections = MarkerDetector(blob_colors=DEFAULT_BLOB_COLORS).detect(img)
+    assert [(d.kind, d.label) for d in detections] == [("blob", "red")],                f"Unexpected detections {detections}"
+
+    text = describe_detections(detections)
+    assert text == "blob red: straight ahead.",                                         f"Unexpected description {text!r}"
+    assert describe_detections([]) == "No markers or objects detected in view.",        "Empty result must still be a sentence"
@@ -0,0 +1,136 @@
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from plan_cache import PlanCache, normalize_instruction, refers_to_context  # type: ignore
+from robots.motion_report import MotionOutcome  # type: ignore
+
+
+def robot_toolset(log, with_run=False):
+    toolset = FunctionToolset()
+
+    def step_forward(seconds: float) -> None:
+        """Step forward."""
+        log.append(("step_forward", seconds))
+
+    def turn(degrees: float) -> None:
+        """Turn in place."""
+        log.append(("turn", degrees))
+
+    toolset.add_function(step_forward)
+    toolset.add_function(turn)
+
+    if with_run:
+        def run(seconds: float) -> None:
+            """Run forward."""
+
+        toolset.add_function(run)
+    return toolset
+
+
+def patrol_model():
+    plan = [ToolCallPart("step_forward", {"seconds": 4}), ToolCallPart("turn", {"degrees": 180}), ToolCallPart("step_forward", {"seconds": 4})]
+
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        done = sum(1 for m in messages if isinstance(m, ModelResponse))
+        if done < len(plan):
+            return ModelResponse(parts=[plan[done]])
+        return ModelResponse(parts=[TextPart("Patrol complete.")])
+
+    return FunctionModel(respond)
+
+
+def test_normalize_instruction():
+
+    a = normalize_instruction("Patrol: forward 4s, turn 180, forward 4 seconds.")
+    b = normalize_instruction("please patrol forward 4.0 sec turn 180 forward 4 s")
+    assert a == b,                                                                  f"Expected equal keys, got {a!r} and {b!r}"
+
+
+def test_cached_plan_replays_without_model(tmp_path):
+
+    log = []
+    toolset = robot_toolset(log)
+    cache = PlanCache(toolset, "robots.test", path=str(tmp_path / "plans.json"))
+
+    result = Agent(patrol_model(), toolsets=[toolset]).run_sync("Patrol: forward 4s, turn 180, forward 4s")
+    assert cache.record_run("Patrol: forward 4s, turn 180, forward 4s", result.new_messages(), result.output), "Plan should be cacheable"
+
+    log.clear()
+    reloaded = PlanCache(toolset, "robots.test", path=str(tmp_path / "plans.json"))
+    replay = reloaded.try_run("patrol: forward 4 seconds, turn 180, forward 4 seconds")
+
+    assert replay is not None,                                                      "Expected a cache hit after reload"
+    assert replay.output == "Patrol complete.",                                     f"Unexpected output {replay.output}"
+    assert log == [("step_forward", 4.0), ("turn", 180.0), ("step_forward", 4.0)],  f"Unexpected replayed calls {log}"
+    assert sum(len(m.tool_calls) for m in replay.all_messages() if isinstance(m, ModelResponse)) == 3, "Replay must be written to history"
+
+
+def test_schema_change_invalidates_plans(tmp_path):
+
+    toolset = robot_toolset([])
+    cache = PlanCache(toolset, "robots.test", path=str(tmp_path / "plans.json"))
+    cache.store("turn around", [("turn", {"degrees": 180})], "Done.")
+
+    changed = PlanCache(robot_toolset([], with_run=True), "robots.test", path=str(tmp_path / "plans.json"))
+
+    assert changed.invalidated == 1,                                                "Plan recorded against old schemas should be dropped"
+    assert changed.lookup("turn around") is None,                                   "Stale plan must not be replayed"
+
+
+def test_lru_eviction():
+
+    cache = PlanCache(robot_toolset([]), "robots.test", max_entries=2)
+    cache.store("turn 1", [("turn", {"degrees": 1})], "Done.")
+    cache.store("turn 2", [("turn", {"degrees": 2})], "Done.")
+    cache.lookup("turn 1")
+    cache.store("turn 3", [("turn", {"degrees": 3})], "Done.")
+
+    assert cache.lookup("turn 2") is None,                                          "Least recently used plan should be evicted"
+    assert cache.lookup("turn 1") is not None and cache.lookup("turn 3") is not None, "Recently used plans should stay"
+
+
+def test_motion_outcomes_are_cached_and_reported_fresh():
+
+    heading = {"value": 10.0}
+    toolset = FunctionToolset()
+    toolset.metadata = {"cacheable_results": [MotionOutcome]}
+
+    @toolset.tool_plain
+    def rotate(angle: float) -> MotionOutcome:
+        """Rotate in place."""
+        heading["value"] += angle
+        return MotionOutcome(action=f"rotate {angle:+.0f}°", termination="tolerance", elapsed_sec=1.0, commands_sent=50,
+                             requested_deg=angle, yaw_delta_deg=angle, final_heading_deg=heading["value"])
+
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        if any(isinstance(m, ModelResponse) for m in messages):
+            return ModelResponse(parts=[TextPart("Now facing 100 degrees.")])
+        return ModelResponse(parts=[ToolCallPart("rotate", {"angle": 90})])
+
+    cache = PlanCache(toolset, "robots.test")
+    result = Agent(FunctionModel(respond), toolsets=[toolset]).run_sync("Turn left by 90 degrees")
+    toolset.metadata = {}
+    assert not PlanCache(toolset, "robots.test").record_run("Turn left by 90 degrees", result.new_messages(), result.output), "Undeclared results must block caching"
+    assert cache.record_run("Turn left by 90 degrees", result.new_messages(), result.output), "Motion outcomes should not block caching"
+
+    replay = cache.try_run("turn left by 90 degrees")
+    assert replay is not None and "now facing 190°" in replay.output,               f"Reply should report the new outcome, got {replay and replay.output}"
+
+
+def test_context_dependent_instructions_are_not_cached(tmp_path):
+
+    log = []
+    toolset = robot_toolset(log)
+    cache = PlanCache(toolset, "robots.test", path=str(tmp_path / "plans.json"))
+    result = Agent(patrol_model(), toolsets=[toolset]).run_sync("Do it again")
+
+    assert refers_to_context("Turn the other way.") and not refers_to_context("Turn 180"), "Context words should be detected"
+    assert not cache.record_run("Do it again", result.new_messages(), result.output), "Context-dependent plan must not be cached"
+
+    log.clear()
+    cache.store("go back", [("turn", {"degrees": 180})], "Done.")  # e.g. recorded by an older version
+    assert cache.try_run("Go back.") is None and log == [],                         "Context-dependent plan must not be replayed"
+    assert cache.contextual == 1,                                                   "Skipped lookups should be counted"
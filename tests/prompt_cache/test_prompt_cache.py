@@ -0,0 +1,59 @@
+from pydantic_ai.messages import ModelMessage, ModelResponse, SystemPromptPart, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.usage import RunUsage
+
+import path
+
+from prompt_cache import PromptCacheStats, keepalive_provider_factory, stable_tool_order, warm_up  # type: ignore
+
+
+def tool_defs(*names):
+    return [ToolDefinition(name=name, description=f"{name} tool") for name in names]
+
+
+def test_stable_tool_order():
+
+    ordered = stable_tool_order(None, tool_defs("walk", "damp", "rotate"))
+
+    assert [d.name for d in ordered] == ["damp", "rotate", "walk"],                 "Tools should be sorted by name"
+
+
+def test_warm_up_sends_the_agent_prefix():
+
+    seen = []
+
+    def model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        seen.append((messages[0].parts[0], [t.name for t in info.function_tools], info.model_settings))
+        return ModelResponse(parts=[ToolCallPart("walk", {})])  # must not be executed
+
+    def failing(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        raise RuntimeError("provider down")
+
+    timings = warm_up(
+        [FunctionModel(model, model_name="ok"), FunctionModel(failing, model_name="down")],
+        "You are a robot.", [tool_defs("damp", "walk"), tool_defs("walk")], {"parallel_tool_calls": False},
+    )
+
+    system, tools, settings = seen[0]
+    assert isinstance(system, SystemPromptPart) and system.content == "You are a robot.", "System prompt should come first"
+    assert tools == ["damp", "walk"],                                               "Tool definitions should be sent as given"
+    assert [tools for _, tools, _ in seen[1:]] == [["walk"]],                       "Every tool list should be warmed"
+    assert settings["max_tokens"] == 16 and not settings["parallel_tool_calls"],    "Agent settings should be kept"
+    assert timings["ok"] is not None and timings["down"] is None,                   f"Unexpected timings {timings}"
+
+
+def test_stats_and_keepalive(monkeypatch):
+
+    stats = PromptCacheStats()
+    stats.record(RunUsage(requests=1, input_tokens=1000), 2.0)
+    stats.record(RunUsage(requests=1, input_tokens=1000, cache_read_tokens=900), 0.5)
+    snapshot = stats.snapshot()
+
+    assert snapshot["first_turn"] == 2.0 and snapshot["steady_p50"] == 0.5,         "First turn should be kept apart"
+    assert snapshot["turns_with_hits"] == 1 and snapshot["cache_read_tokens"] == 900, "Cache reads should come from usage"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    provider = keepalive_provider_factory(90.0)("openai")
+    pool = provider.client._client._transport._pool
+    assert pool._keepalive_expiry == 90.0,                                          "Idle connections should be kept longer"
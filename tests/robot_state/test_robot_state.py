@@ -0,0 +1,68 @@
+import pytest
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from agent import build_agent, load_robot_toolset  # type: ignore
+from config import Settings  # type: ignore
+from robot_state import STATE_PREFIX, LastCommand, RobotStateContext  # type: ignore
+
+
+def settings(**overrides):
+    values = dict(ROBOT_MODULE="robots.test_robot", ROBOT_TOOLSET="toolset", MODEL="test", PLAN_CACHE=False, FAST_PATH=False)
+    values.update(overrides)
+    return Settings(**values)
+
+
+def state_parts(message):
+    return [p.content for p in message.parts if isinstance(p, UserPromptPart) and p.content.startswith(STATE_PREFIX)]
+
+
+def test_render_selected_fields():
+
+    context = RobotStateContext(
+        {"yaw": lambda: "12.0°", "imu_age": lambda: None, "broken": lambda: 1 / 0},
+        include=["imu_age", "yaw", "broken"],
+    )
+    text = context.render()
+
+    assert text.startswith(STATE_PREFIX),                                           "State text must carry the prefix"
+    assert text.endswith("imu_age=unknown, yaw=12.0°, broken=unknown"),             f"Unexpected state text {text!r}"
+    assert context.errors == 1,                                                     "Failing field should be counted"
+    with pytest.raises(ValueError):
+        RobotStateContext({"yaw": lambda: "0°"}, include=["heading"])
+
+
+def test_last_command():
+
+    command = LastCommand()
+    assert command.describe() is None,                                              "No command yet"
+    command.start("rotate +90°")
+    command.finish("stopped")
+    assert command.describe().startswith("rotate +90° (stopped, "),                 f"Unexpected description {command.describe()!r}"
+
+
+def test_state_is_added_to_every_model_request(monkeypatch):
+
+    yaw = {"value": 10.0}
+    monkeypatch.setitem(load_robot_toolset("robots.test_robot", "toolset").metadata, "state_fields", {"yaw": lambda: f"{yaw['value']:.1f}°"})
+    robot_agent = build_agent(settings())
+    seen = []
+
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        seen.append(state_parts(messages[-1]))
+        if any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            return ModelResponse(parts=[TextPart("Done.")])
+        yaw["value"] = 55.0  # state changes between the two requests of the run
+        return ModelResponse(parts=[ToolCallPart("crouch", {})])
+
+    result = robot_agent.agent.run_sync("Crouch.", model=FunctionModel(respond))
+    requests = [m for m in result.all_messages() if isinstance(m, ModelRequest)]
+
+    assert len(seen) == 2 and all(len(parts) == 1 for parts in seen),               f"Expected one state part per request, got {seen}"
+    assert "yaw=10.0°" in seen[0][0] and "yaw=55.0°" in seen[1][0],                 "State should be read fresh for each request"
+    assert [len(state_parts(m)) for m in requests] == [0, 1],                       "Only the newest state part should stay in the history"
+    assert robot_agent.state_context.injected == 2,                                 "Injection count"
+
+    assert build_agent(settings(ROBOT_STATE_CONTEXT=False)).state_context is None,  "ROBOT_STATE_CONTEXT=False disables injection"
@@ -0,0 +1,97 @@
+import hashlib
+import os
+
+import path
+
+from pydantic_ai.messages import (  # type: ignore
+    BinaryContent, FilePart, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart,
+)
+
+from session_store import SessionStore  # type: ignore
+
+
+def snapshot_turn(i, image):
+    return [
+        ModelRequest(parts=[UserPromptPart(content=f"Look around {i}")]),
+        ModelResponse(parts=[ToolCallPart("get_camera_snapshot", {}, tool_call_id=f"call_{i}")]),
+        ModelRequest(parts=[ToolReturnPart("get_camera_snapshot", BinaryContent(image, media_type="image/png"), tool_call_id=f"call_{i}")]),
+        ModelResponse(parts=[TextPart(f"A door, turn {i}.")]),
+    ]
+
+
+def blob_count(root):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(root, "blobs")))
+
+
+def test_round_trip_and_blob_dedup(tmp_path):
+
+    store = SessionStore(str(tmp_path))
+    same = b"\x89PNG same frame"
+    messages = snapshot_turn(0, same) + snapshot_turn(1, same) + snapshot_turn(2, b"\x89PNG other frame")
+    store.save("robot", messages)
+
+    assert blob_count(tmp_path) == 2,                                               "Identical snapshots should share one blob"
+    assert SessionStore(str(tmp_path)).load("robot") == messages,                   "History changed in a save/load round trip"
+    assert store.sessions() == ["robot"],                                           "Session not listed"
+    assert SessionStore(str(tmp_path)).load("missing") == [],                       "Unknown session should load empty"
+
+
+def test_sync_appends_only_new_messages(tmp_path):
+
+    store = SessionStore(str(tmp_path))
+    history = snapshot_turn(0, b"frame 0")
+    store.sync("robot", history)
+    session_file = tmp_path / "robot.jsonl"
+    first = session_file.read_bytes()
+
+    history = history + snapshot_turn(1, b"frame 1")
+    store.sync("robot", history)
+    assert session_file.read_bytes().startswith(first),                             "Sync rewrote earlier turns instead of appending"
+    assert SessionStore(str(tmp_path)).load("robot") == history,                    "Appended history does not load back"
+
+    store.sync("robot", history[:2])  # history was truncated, so it is rewritten
+    assert SessionStore(str(tmp_path)).load("robot") == history[:2],                "Truncated history not saved"
+
+
+def test_load_keeps_only_newest_images(tmp_path):
+
+    store = SessionStore(str(tmp_path))
+    history = [m for i in range(4) for m in snapshot_turn(i, f"frame {i}".encode())]
+    store.save("robot", history)
+
+    loaded = SessionStore(str(tmp_path), keep_images=1).load("robot")
+    returns = [part.content for m in loaded for part in m.parts if isinstance(part, ToolReturnPart)]
+
+    assert len(loaded) == len(history),                                             "Messages were dropped"
+    assert isinstance(returns[-1], BinaryContent) and returns[-1].data == b"frame 3", "Newest image not reloaded"
+    assert all(isinstance(r, str) and "not reloaded" in r for r in returns[:-1]),   "Older images should become text references"
+
+
+def test_missing_or_damaged_blob_becomes_text(tmp_path):
+
+    store = SessionStore(str(tmp_path))
+    store.save("robot", snapshot_turn(0, b"frame 0") + snapshot_turn(1, b"frame 1"))
+    os.remove(store.blob_path(hashlib.sha256(b"frame 0").hexdigest()))
+    with open(store.blob_path(hashlib.sha256(b"frame 1").hexdigest()), "wb") as f:
+        f.write(b"fra")  # partly written
+
+    loaded = SessionStore(str(tmp_path)).load("robot")
+    returns = [part.content for m in loaded for part in m.parts if isinstance(part, ToolReturnPart)]
+
+    assert len(returns) == 2 and all(isinstance(r, str) and "not reloaded" in r for r in returns), f"Expected text references, got {returns}"
+
+
+def test_model_generated_file_is_resumed(tmp_path):
+
+    drawn = [
+        ModelRequest(parts=[UserPromptPart(content="Draw the room")]),
+        ModelResponse(parts=[FilePart(BinaryContent(b"\x89PNG drawing", media_type="image/png")), TextPart("Here it is.")]),
+    ]
+    store = SessionStore(str(tmp_path), keep_images=0)
+    store.save("robot", drawn + snapshot_turn(0, b"frame 0"))
+
+    parts = SessionStore(str(tmp_path), keep_images=0).load("robot")[1].parts
+    assert isinstance(parts[0], TextPart) and "not reloaded" in parts[0].content,   f"Expected a text reference, got {parts[0]}"
+
+    parts = SessionStore(str(tmp_path)).load("robot")[1].parts
+    assert isinstance(parts[0], FilePart) and parts[0].content.data == b"\x89PNG drawing", "Kept files should be reloaded"
@@ -0,0 +1,85 @@
+import math
+import random
+
+import numpy as np
+from pydantic_ai import FunctionToolset
+
+import path
+
+from robots.spatial_memory import DeadReckoning, SpatialMemory, add_spatial_memory_tools  # type: ignore
+
+
+def test_dead_reckoning_and_directions():
+
+    yaw = {"deg": 90.0}
+    pose = DeadReckoning(speed_mps=0.25, get_yaw_deg=lambda: yaw["deg"])
+    pose.walked("forward", 4.0)  # 1 m along +y
+    yaw["deg"] = 0.0
+    pose.walked("left", 8.0)  # 2 m along +y
+
+    x, y, _ = pose.pose()
+    assert abs(x) < 1e-9 and abs(y - 3.0) < 1e-9,                                   f"Unexpected position {(x, y)}"
+
+
+def test_nearest_matches_brute_force():
+
+    rng = random.Random(0)
+    memory = SpatialMemory(max_entries=500, cell_m=0.5)
+    for i in range(300):
+        memory.add(f"place {i}", (rng.uniform(-20, 20), rng.uniform(-20, 20), 0.0))
+
+    for _ in range(20):
+        qx, qy = rng.uniform(-25, 25), rng.uniform(-25, 25)
+        expected = sorted(memory._places.values(), key=lambda p: math.hypot(p.x - qx, p.y - qy))[:5]
+        assert [p.id for p in memory.nearest(qx, qy, k=5)] == [p.id for p in expected], "Grid search disagrees with brute force"
+
+
+def test_label_search_and_bounds():
+
+    memory = SpatialMemory(max_entries=3, thumbnail_px=32)
+    frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+    for label in ["kitchen door", "red blob", "front door", "charging station"]:
+        memory.add(label, (0.0, 0.0, 0.0), frame)
+
+    assert len(memory) == 3 and memory.evicted == 1,                                "Oldest entry should be evicted"
+    assert [p.label for p in memory.find("the door")] == ["front door"],            "Evicted entry still indexed"
+    assert memory.find("station")[0].label == "charging station",                   "Label query failed"
+    assert all(len(p.thumbnail) < 2000 for p in memory._places.values()),           "Thumbnails should be downsampled"
+
+    small = SpatialMemory(max_bytes=1, thumbnail_px=32)
+    small.add("a", (0.0, 0.0, 0.0), frame)
+    small.add("b", (0.0, 0.0, 0.0), frame)
+    assert len(small) == 1,                                                         "Thumbnail byte budget not enforced"
+
+
+def test_observations_do_not_evict_named_places():
+
+    pose = DeadReckoning(speed_mps=0.25, get_yaw_deg=lambda: 0.0)
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    for memory in [SpatialMemory(max_entries=3, max_observations=2, thumbnail_px=32), SpatialMemory(max_bytes=2000, thumbnail_px=32)]:
+        toolset = FunctionToolset()
+        add_spatial_memory_tools(toolset, memory, pose, get_frame=lambda: frame)
+        toolset.tools["remember_place"].function("kitchen door")
+        for _ in range(20):
+            memory.add("camera snapshot", pose.pose(), frame, observation=True)
+
+        labels = [p.label for p in memory._places.values()]
+        assert labels[0] == "kitchen door",                                         f"Snapshots evicted the named place: {labels}"
+        assert 1 <= labels.count("camera snapshot") <= 2,                           f"Observation budget not enforced: {labels}"
+        assert memory.thumbnail_bytes <= memory.max_bytes,                          "Thumbnail byte budget not enforced"
+        assert memory.find("door")[0].label == "kitchen door",                      "Named place no longer found"
+
+def test_tools_give_directions():
+
+    pose = DeadReckoning(speed_mps=0.25, get_yaw_deg=lambda: 0.0)
+    memory = SpatialMemory()
+    toolset = FunctionToolset()
+    add_spatial_memory_tools(toolset, memory, pose)
+
+    toolset.tools["remember_place"].function("kitchen door")
+    pose.walked("forward", 8.0)  # 2 m past the door
+    answer = toolset.tools["recall_places"].function("door")
+
+    assert "show_place" not in toolset.tools,                                       "No thumbnails without a camera"
+    assert "2.0 m away" in answer and "180°" in answer,                             answer
+    assert "walk forward 8.0s" in answer,                                           answer
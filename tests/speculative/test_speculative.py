@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+import path
+
+from speculative import SpeculativeRunner, SpeculativeToolset  # type: ignore
+
+
+def streamed_plan(calls, delay, events):
+    """Streams all tool calls in one response with `delay` of generation after each, then answers."""
+
+    async def stream(messages, info: AgentInfo):
+        if isinstance(messages[-1], ModelRequest) and any(isinstance(p, ToolReturnPart) for p in messages[-1].parts):
+            yield "Done."
+            return
+        for i, (name, args) in enumerate(calls):
+            yield {i: DeltaToolCall(name=name, tool_call_id=f"call_{i}")}
+            yield {i: DeltaToolCall(json_args=args[:-2])}
+            await asyncio.sleep(delay / 4)
+            yield {i: DeltaToolCall(json_args=args[-2:])}
+            await asyncio.sleep(delay)
+        events.append(("stream_end", time.perf_counter()))
+
+    return FunctionModel(stream_function=stream)
+
+
+def build(events, allowed):
+    toolset = FunctionToolset()
+
+    def walk(duration_sec: float) -> None:
+        events.append(("walk", time.perf_counter()))
+
+    def rotate(angle: float) -> None:
+        events.append(("rotate", time.perf_counter()))
+
+    toolset.add_function(walk)
+    toolset.add_function(rotate)
+    return SpeculativeToolset(toolset, allowed_tools=set(allowed))
+
+
+def test_allowed_tools_start_before_stream_ends():
+
+    events = []
+    toolset = build(events, allowed={"walk", "rotate"})
+    model = streamed_plan([("walk", '{"duration_sec": 2}'), ("rotate", '{"angle": 90}')], 0.2, events)
+    runner = SpeculativeRunner(Agent(model, toolsets=[toolset]), toolset)
+
+    result = runner.run_sync("Walk 2 seconds, then turn left 90 degrees.")
+
+    names = [name for name, _ in events]
+    assert result.output == "Done.",                                                          f"Unexpected output {result.output}"
+    assert names == ["walk", "rotate", "stream_end"],                                         f"Tools should start in order before the stream ends, got {names}"
+    assert toolset.stats.started == 2 and toolset.stats.reused == 2,                          "Each early call should be reused exactly once"
+
+
+def test_disallowed_tool_blocks_later_calls():
+
+    events = []
+    toolset = build(events, allowed={"rotate"})
+    model = streamed_plan([("walk", '{"duration_sec": 2}'), ("rotate", '{"angle": 90}')], 0.05, events)
+    runner = SpeculativeRunner(Agent(model, toolsets=[toolset]), toolset)
+
+    runner.run_sync("Walk 2 seconds, then turn left 90 degrees.")
+
+    names = [name for name, _ in events]
+    assert names == ["stream_end", "walk", "rotate"],                                         f"Nothing may start ahead of a disallowed call, got {names}"
+    assert toolset.stats.started == 0,                                                        "No call should have started early"
+
+
+def test_turns_share_the_agent_event_loop():
+
+    loops = []
+
+    async def stream(messages, info: AgentInfo):
+        loops.append(asyncio.get_running_loop())
+        yield "Done."
+
+    async def respond(messages, info: AgentInfo):
+        loops.append(asyncio.get_running_loop())
+        return ModelResponse(parts=[TextPart("Done.")])
+
+    agent = Agent(FunctionModel(respond, stream_function=stream))
+    runner = SpeculativeRunner(agent, build([], allowed=set()))
+    runner.run_sync("Hello.")
+    runner.run_sync("Hello again.")
+    agent.run_sync("And once more.")
+
+    assert len(set(map(id, loops))) == 1 and not loops[0].is_closed(),                      "Pooled provider connections need one loop across turns"
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import path
+
+from robots.stop_channel import MotionStopped, StopChannel  # type: ignore
+
+
+class FakeController:
+    """Velocity loop shaped like RobotController.move_for_duration, publishing at 100Hz."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.commands = []  # (time, yaw_vel)
+        self.exited_at = None
+
+    def send_command(self, yaw_vel):
+        self.commands.append((time.perf_counter(), yaw_vel))
+
+    def stop(self):
+        self.send_command(0.0)
+
+    def move_for_duration(self, duration_sec):
+        self.channel.check()
+        end_time = time.time() + duration_sec
+        try:
+            while time.time() < end_time:
+                self.send_command(1.0)
+                if self.channel.wait(0.01):
+                    self.stop()
+                    self.channel.check()
+            self.stop()
+        finally:
+            self.exited_at = time.perf_counter()
+
+
+def cpu_load(done):
+    while not done.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_stop_latency_under_load():
+
+    channel = StopChannel(max_latency_sec=0.05)
+    controller = FakeController(channel)
+    channel.add_handler(controller.stop)
+
+    done = threading.Event()
+    load = [threading.Thread(target=cpu_load, args=(done,), daemon=True) for _ in range(4)]
+    for t in load:
+        t.start()
+
+    errors = []
+    def motion():
+        try:
+            controller.move_for_duration(10.0)
+        except MotionStopped as e:
+            errors.append(e)
+
+    mover = threading.Thread(target=motion)
+    mover.start()
+    time.sleep(0.3)
+
+    triggered_at = time.perf_counter()
+    handler_latency = channel.trigger("test")
+    mover.join(timeout=2.0)
+    done.set()
+
+    first_stop = next(t for t, yaw_vel in controller.commands if yaw_vel == 0.0)
+    stop_latency = first_stop - triggered_at
+    exit_latency = controller.exited_at - triggered_at
+    print(f"stop published after {stop_latency * 1000:.2f}ms, handler {handler_latency * 1000:.2f}ms, loop exited after {exit_latency * 1000:.2f}ms")
+
+    assert not mover.is_alive(),                                                    "Motion loop did not exit after the stop"
+    assert len(errors) == 1,                                                        "Motion should end with MotionStopped"
+    assert stop_latency < 0.05,                                                     f"Stop command published after {stop_latency * 1000:.1f}ms"
+    assert exit_latency < 0.1,                                                      f"Motion loop exited after {exit_latency * 1000:.1f}ms"
+    assert controller.commands[-1][1] == 0.0,                                       "Last command must be a stop"
+
+
+def test_stop_is_latched_until_cleared():
+
+    channel = StopChannel()
+    controller = FakeController(channel)
+
+    channel.trigger("test")
+    try:
+        controller.move_for_duration(1.0)
+        raise AssertionError("Motion should not start while the stop is latched")
+    except MotionStopped:
+        pass
+    assert controller.commands == [],                                               "No command may be sent while stopped"
+
+    channel.clear()
+    controller.move_for_duration(0.05)
+    assert controller.commands[-1][1] == 0.0,                                       "Motion should run and stop normally after clear"
+
+
+def test_blocking_handler_does_not_hold_up_trigger():
+
+    channel = StopChannel(max_latency_sec=0.05)
+    controller = FakeController(channel)
+    seen_latched = []
+    rpc_done = threading.Event()
+
+    def stop_rpc():
+        time.sleep(0.5)  # e.g. LocoClient.StopMove waiting on its reply
+        rpc_done.set()
+
+    channel.add_handler(stop_rpc, blocking=True)
+    channel.add_handler(lambda: seen_latched.append(channel.is_set()))
+    channel.add_handler(controller.stop)
+
+    latency = channel.trigger("test")
+
+    assert latency < 0.05,                                                          f"Blocking handler held up the trigger for {latency * 1000:.1f}ms"
+    assert seen_latched == [True],                                                  "Stop must be latched before handlers run"
+    assert controller.commands and controller.commands[-1][1] == 0.0,               "Fast handlers still run in the caller"
+    assert not rpc_done.is_set() and rpc_done.wait(2.0),                            "Blocking handler should finish in the background"
+
+    channel.remove_handler(stop_rpc)
+    channel.clear()
+    assert channel.trigger("again") < 0.05 and len(controller.commands) == 2,       "Removed handler must not run"
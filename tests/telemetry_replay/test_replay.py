@@ -0,0 +1,83 @@
+import math
+from types import SimpleNamespace
+
+import path
+
+from robots.telemetry_replay import IMUSample, TelemetryRecorder, TelemetryReplay, benchmark_motion, load_samples  # type: ignore
+
+
+def yaw_sample(t, yaw_deg):
+    half = math.radians(yaw_deg) / 2.0
+    return IMUSample(t=t, quaternion=(0.0, 0.0, math.sin(half), math.cos(half)), rpy=(0.0, 0.0, math.radians(yaw_deg)))
+
+
+class YawController:
+    """Bang-bang rotation loop with the same exit conditions as RobotController.rotate."""
+
+    def __init__(self, tolerance_deg):
+        self.tolerance_deg = tolerance_deg
+        self.yaw = None
+
+    def on_lowstate(self, msg):
+        q = msg.imu_state.quaternion
+        self.yaw = math.degrees(math.atan2(2.0 * (q[3] * q[2] + q[0] * q[1]), 1.0 - 2.0 * (q[1] * q[1] + q[2] * q[2])))
+
+    def send_command(self, yaw_vel):
+        pass
+
+    def rotate(self, target):
+        while abs(target - self.yaw) > self.tolerance_deg and self.yaw < target:
+            self.send_command(1.0)
+        self.send_command(0.0)
+
+
+def test_record_and_load_round_trip(tmp_path):
+
+    file = tmp_path / "imu.jsonl"
+    recorder = TelemetryRecorder(str(file))
+    for yaw in (0.0, 10.0, 20.0):
+        recorder.record(yaw_sample(0.0, yaw).to_lowstate())
+    recorder.record(SimpleNamespace())  # messages without IMU data are skipped
+    recorder.close()
+
+    samples = load_samples(str(file))
+
+    assert len(samples) == 3,                                                       f"Expected 3 samples, got {len(samples)}"
+    assert [round(s.yaw_deg, 6) for s in samples] == [0.0, 10.0, 20.0],               f"Unexpected yaw values {[s.yaw_deg for s in samples]}"
+    assert samples[0].t == 0.0 and samples[2].t >= samples[1].t,                     "Timestamps must start at zero and be monotonic"
+
+
+def test_fast_replay_delivers_all_samples():
+
+    samples = [yaw_sample(i * 0.5, i) for i in range(10)]
+    received = []
+
+    replay = TelemetryReplay(samples, lambda msg: received.append(msg.imu_state.rpy[2]), speed=None)
+    replay.run()
+
+    assert replay.finished,                                                         "Replay should be finished"
+    assert len(received) == 10,                                                     f"Expected 10 callbacks, got {len(received)}"
+
+
+def test_lockstep_benchmark_is_deterministic():
+
+    samples = [yaw_sample(i * 0.01, i * 0.7) for i in range(300)]
+
+    results = []
+    for _ in range(2):
+        controller = YawController(tolerance_deg=1.0)
+        results.append(benchmark_motion(
+            samples,
+            on_lowstate=controller.on_lowstate,
+            motion=lambda: controller.rotate(90.0),
+            command_owner=controller,
+            command_attr="send_command",
+            target_yaw_deg=90.0,
+            tolerance_deg=1.0,
+        ))
+
+    first, second = results
+    assert first.commands_sent == second.commands_sent,                             "Lockstep replay must issue the same number of commands"
+    assert first.stop_time_sec == second.stop_time_sec,                             "Lockstep replay must stop at the same recording time"
+    assert abs(first.error_at_stop_deg) <= 1.0,                                     f"Expected stop within tolerance, got {first.error_at_stop_deg}"
+    assert first.max_overshoot_deg > 0.0,                                           "Recorded yaw keeps turning past the target, overshoot expected"
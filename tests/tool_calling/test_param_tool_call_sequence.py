@@ -1,14 +1,13 @@
 import util
 from util import mock_settings
 import path
+from agent import build_agent  # type: ignore
 
 
 
-def test_basic_tool_call(monkeypatch, mock_settings):
+def test_basic_tool_call(mock_settings):
     
-    monkeypatch.setattr("config.settings", mock_settings)
-    
-    import agent as a  # type: ignore
+    a = build_agent(mock_settings)
     
     
     result = a.agent.run_sync("Go forward 5 steps, then turn left 45 degrees, then step backward 3 steps.")
@@ -0,0 +1,126 @@
+import pytest
+from pydantic_ai import Agent, FunctionToolset
+from pydantic_ai.capabilities import PrepareTools, ProcessHistory
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import path
+
+from general_toolset import toolset as general_toolset  # type: ignore
+from robot_state import RobotStateContext  # type: ignore
+from tool_filter import SHOW_ALL_TOOLS, ToolFilter  # type: ignore
+
+
+def robot_toolset():
+    toolset = FunctionToolset()
+    toolset.metadata = {"tool_groups": {
+        "motion": {"tools": ["walk", "rotate"], "words": ["walk", "turn"]},
+        "web": {"tools": ["search"], "words": ["search", "news", "look up"]},
+    }}
+
+    @toolset.tool_plain
+    def walk(duration_sec: float) -> None:
+        """Walk forward."""
+
+    @toolset.tool_plain
+    def rotate(angle: float) -> None:
+        """Rotate in place."""
+
+    @toolset.tool_plain
+    def search(query: str) -> str:
+        """Search the web."""
+        return "nothing found"
+
+    @toolset.tool_plain
+    def stop() -> None:
+        """Stop moving."""
+
+    return toolset
+
+
+def run(tool_filter, toolset, prompt, policy, message_history=None, state_context=None):
+    seen = []
+
+    def model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        seen.append(sorted(t.name for t in info.function_tools))
+        return policy(messages, len(seen))
+
+    capabilities = [PrepareTools(tool_filter.prepare_tools)]
+    if state_context:
+        capabilities.insert(0, ProcessHistory(state_context.inject))
+    agent = Agent(FunctionModel(model), toolsets=[toolset, tool_filter.toolset], capabilities=capabilities)
+    return agent.run_sync(prompt, message_history=message_history), seen
+
+
+def test_select_groups():
+
+    tool_filter = ToolFilter([robot_toolset()])
+
+    assert tool_filter.select_groups("Please turn left") == {"motion"},             "Keyword should select its group"
+    assert tool_filter.select_groups("Walking and searching") == {"motion", "web"}, "Inflections of longer keywords should match"
+    assert tool_filter.select_groups("Tell me a joke") is None,                     "No match should mean the full set"
+    assert tool_filter.select_groups("turn", ["search"]) == {"motion", "web"},      "Tools of the previous turn should stay exposed"
+    assert tool_filter.select_groups("Looking up prices") == {"web"},               "Phrases should match consecutive words"
+    assert tool_filter.select_groups("Look it up") is None,                         "Words of a phrase must follow each other"
+
+
+def test_every_shipped_keyword_is_reachable():
+
+    for toolset in [general_toolset, robot_toolset()]:
+        tool_filter = ToolFilter([toolset])
+        for group, options in toolset.metadata["tool_groups"].items():
+            for keyword in options["words"]:
+                assert group in (tool_filter.select_groups(f"please {keyword} now") or set()), f"'{keyword}' cannot select {group}"
+
+
+@pytest.mark.parametrize("with_state", [False, True])
+def test_filters_and_reports_savings(with_state):
+
+    toolset = robot_toolset()
+    tool_filter = ToolFilter([toolset])
+    state_context = RobotStateContext({"yaw": lambda: "90.0°"}) if with_state else None
+    result, seen = run(tool_filter, toolset, "turn left by 90", lambda messages, step: (
+        ModelResponse(parts=[ToolCallPart("rotate", {"angle": 90})]) if step == 1 else ModelResponse(parts=[TextPart("Done.")])
+    ), state_context=state_context)
+
+    assert seen[0] == ["rotate", SHOW_ALL_TOOLS, "stop", "walk"],                    f"Unexpected tools {seen[0]}"
+    assert tool_filter.filtered_steps == 2 and tool_filter.fallbacks == 0,           "Both requests should be filtered"
+    assert tool_filter.sent_tokens < tool_filter.full_tokens,                        "Savings should be counted"
+
+    # The follow-up keeps the groups of the previous turn
+    _, seen = run(tool_filter, toolset, "search the news", lambda messages, step: ModelResponse(parts=[TextPart("ok")]),
+                  message_history=result.all_messages(), state_context=state_context)
+    assert "rotate" in seen[0] and "search" in seen[0],                             f"Unexpected follow-up tools {seen[0]}"
+
+
+def test_fallback_to_full_set():
+
+    toolset = robot_toolset()
+    tool_filter = ToolFilter([toolset])
+
+    # A hidden tool is called anyway: the next request gets every tool
+    _, seen = run(tool_filter, toolset, "turn around", lambda messages, step: (
+        ModelResponse(parts=[ToolCallPart("search", {"query": "x"})]) if step < 3 else ModelResponse(parts=[TextPart("ok")])
+    ))
+    assert "search" not in seen[0] and "search" in seen[1],                         f"Expected a fallback after the miss, saw {seen}"
+    assert tool_filter.fallbacks == 2,                                              "Fallback steps should be counted"
+
+    # The model asks for everything
+    _, seen = run(tool_filter, toolset, "walk", lambda messages, step: (
+        ModelResponse(parts=[ToolCallPart(SHOW_ALL_TOOLS, {})]) if step == 1 else ModelResponse(parts=[TextPart("ok")])
+    ))
+    assert len(seen[1]) == 5,                                                       f"show_all_tools should expose everything, saw {seen[1]}"
+
+
+def test_tool_lists_cover_the_sent_prefixes():
+
+    toolset = robot_toolset()
+    toolset.metadata["tool_groups"]["web"]["words"].append("around")  # "turn around" selects both groups
+    tool_filter = ToolFilter([toolset])
+    tool_defs = [tool.tool_def for t in (toolset, tool_filter.toolset) for tool in t.tools.values()]
+    warmed = [sorted(d.name for d in defs) for defs in tool_filter.tool_lists(tool_defs)]
+
+    for prompt in ["turn left", "search the news", "turn around", "tell me a joke"]:
+        _, seen = run(tool_filter, toolset, prompt, lambda messages, step: ModelResponse(parts=[TextPart("ok")]))
+        assert seen[0] in warmed,                                                   f"'{prompt}' sent tools {seen[0]} that were not warmed"
+    assert len(warmed) == 3,                                                        f"Identical lists should be warmed once: {warmed}"
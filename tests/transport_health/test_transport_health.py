@@ -0,0 +1,66 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import path
+
+from robots.transport_health import ChannelHealth, TransportHealth  # type: ignore
+
+
+def lowstate(yaw):
+    return SimpleNamespace(imu_state=SimpleNamespace(rpy=[0.0, 0.0, yaw]))
+
+
+def test_rate_gaps_and_parse_failures():
+
+    health = ChannelHealth("rt/lowstate", expected_hz=100.0)
+    yaws = []
+    callback = health.wrap_callback(lambda msg: yaws.append(float(msg.imu_state.rpy[2])))
+
+    for i in range(20):
+        if i == 10:
+            time.sleep(0.03)  # two messages lost
+        callback(lowstate(i) if i != 5 else SimpleNamespace())  # one malformed message
+        time.sleep(0.01)
+    snapshot = health.snapshot()
+
+    assert len(yaws) == 19,                                                         "Valid messages must still reach the callback"
+    assert snapshot["received"] == 20,                                              "Every message counts as received"
+    assert snapshot["parse_failures"] == 1,                                         "Malformed message not counted"
+    assert "AttributeError" in snapshot["last_error"],                              "Last error not recorded"
+    assert snapshot["missed"] >= 2,                                                 f"Gap not detected: {snapshot}"
+    assert 40.0 < snapshot["rate_hz"] < 110.0,                                      f"Unexpected rate {snapshot['rate_hz']}"
+    assert snapshot["jitter"] is not None and snapshot["callback_max"] is not None, "Jitter and callback time should be tracked"
+
+
+def test_publish_and_registry():
+
+    registry = TransportHealth()
+    sent = []
+    write = registry.channel("rt/cmd").wrap_publish(sent.append)
+    for i in range(5):
+        write(i)
+
+    def failing(msg):
+        raise RuntimeError("no writer")
+
+    with pytest.raises(RuntimeError):
+        registry.channel("rt/cmd").wrap_publish(failing)("x")
+
+    snapshot = registry.snapshot()["rt/cmd"]
+    assert sent == [0, 1, 2, 3, 4],                                                 "Writes must go through"
+    assert (snapshot["published"], snapshot["publish_failures"]) == (5, 1),         f"Unexpected counters {snapshot}"
+    assert registry.channel("rt/cmd") is registry.channel("rt/cmd"),                "Channels are registered once by name"
+    assert "rt/cmd: tx 5" in registry.summary(),                                    registry.summary()
+
+
+def test_periodic_log(capsys):
+
+    registry = TransportHealth()
+    registry.channel("rt/lowstate").wrap_callback(lambda msg: None)(None)
+    registry.start_logging(0.05)
+    time.sleep(0.2)
+    registry.stop_logging()
+
+    assert "[TransportHealth] Transport health: rt/lowstate: rx 1" in capsys.readouterr().out, "No periodic log line"
@@ -1,8 +1,12 @@
 import time
+import pytest
 import util
 from util import mock_settings
 import path
 
+# All tests drive the one simulator, so parallel runs keep them on a single worker
+pytestmark = pytest.mark.xdist_group("simulator")
+
 
 
 def test_basic_rotation(monkeypatch, mock_settings):
@@ -0,0 +1,73 @@
+import math
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import path
+
+pytest.importorskip("unitree_sdk2py")
+pytest.importorskip("teleimager.image_client")
+
+from robots.control_process import command_data  # type: ignore
+from robots.stop_channel import MotionStopped, stop_channel  # type: ignore
+from robots.unitree_g1_sim import RobotController  # type: ignore
+
+# All tests drive the one simulator, so parallel runs keep them on a single worker
+pytestmark = pytest.mark.xdist_group("simulator")
+
+
+def lowstate(yaw_deg):
+    half = math.radians(yaw_deg) / 2.0
+    return SimpleNamespace(imu_state=SimpleNamespace(quaternion=[0.0, 0.0, math.sin(half), math.cos(half)], rpy=[0.0, 0.0, math.radians(yaw_deg)]))
+
+
+def recording_controller():
+    """Real RobotController on a scratch topic, with its publish call recorded and the IMU fed by hand."""
+    controller = RobotController(topic="rt/test_stop_latency/cmd", lowstate_topic=None)
+    commands = []  # (time, payload)
+    controller._write = lambda msg: commands.append((time.perf_counter(), msg.data))
+    controller._on_lowstate(lowstate(0.0))
+    return controller, commands
+
+
+@pytest.mark.parametrize("motion", ["walk", "rotate"])
+def test_stop_preempts_real_motion_loops(motion):
+
+    controller, commands = recording_controller()
+    slow_rpc = lambda: time.sleep(2.0)  # StopMove of the real robot, waiting on its reply
+    stop_channel.clear()
+    stop_channel.add_handler(slow_rpc, blocking=True)
+    stop_channel.add_handler(controller.stop)
+    errors, exited = [], []
+
+    def run():
+        try:
+            if motion == "walk":
+                controller.move_for_duration(10.0, x_vel=0.3)
+            else:
+                controller.rotate(170.0)  # the IMU never reaches the target
+        except MotionStopped as e:
+            errors.append(e)
+        finally:
+            exited.append(time.perf_counter())
+
+    mover = threading.Thread(target=run)
+    try:
+        mover.start()
+        time.sleep(0.3)
+        triggered_at = time.perf_counter()
+        latency = stop_channel.trigger("test")
+        mover.join(timeout=2.0)
+    finally:
+        stop_channel.remove_handler(slow_rpc)
+        stop_channel.remove_handler(controller.stop)
+        stop_channel.clear()
+
+    zero = command_data(0.0, 0.0, 0.0, controller._default_height)
+    first_stop = next(t for t, data in commands if t >= triggered_at and data == zero)
+    assert latency < 0.05,                                                          f"Trigger held up for {latency * 1000:.1f}ms by the blocking handler"
+    assert first_stop - triggered_at < 0.05,                                        f"Stop command published after {(first_stop - triggered_at) * 1000:.1f}ms"
+    assert not mover.is_alive() and len(errors) == 1,                               "Motion loop should end with MotionStopped"
+    assert exited[0] - triggered_at < 0.1,                                          f"Motion loop exited after {(exited[0] - triggered_at) * 1000:.1f}ms"
@@ -1,10 +1,14 @@
 import time
 import cv2
 import numpy as np
+import pytest
 import util
 from util import mock_settings
 import path
 
+# All tests drive the one simulator, so parallel runs keep them on a single worker
+pytestmark = pytest.mark.xdist_group("simulator")
+
 
 def test_teleimager(monkeypatch, mock_settings):
 
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import path
+
+from robots.velocity_stream import LoopRate, VelocityStreamer  # type: ignore
+
+
+class SlowClient:
+    """LocoClient stand-in whose RPCs take `rpc_sec` to return."""
+
+    def __init__(self, rpc_sec):
+        self.rpc_sec = rpc_sec
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def Move(self, vx, vy, vyaw):
+        time.sleep(self.rpc_sec)
+        with self._lock:
+            self.calls.append(("Move", vyaw))
+
+    def StopMove(self):
+        time.sleep(self.rpc_sec)
+        with self._lock:
+            self.calls.append(("StopMove", None))
+
+
+def test_loop_rate_is_independent_of_rpc_latency():
+
+    client = SlowClient(rpc_sec=0.05)
+    stream = VelocityStreamer(client.Move, client.StopMove)
+    rate = LoopRate()
+
+    for i in range(50):  # 50Hz loop, the yaw command flips every 10 ticks
+        rate.tick()
+        stream.set_velocity(0.0, 0.0, 0.8 if (i // 10) % 2 == 0 else -0.8)
+        time.sleep(0.02)
+    assert stream.halt(wait=True),                                                  "Stop was not sent"
+    stream.close()
+
+    print(f"{rate.summary()}, {stream.summary()}")
+    assert rate.rate_hz > 40.0,                                                     f"Loop slowed down to {rate.rate_hz:.1f}Hz"
+    assert stream.sent <= 6,                                                        f"Unchanged setpoints were resent ({stream.sent} RPCs)"
+    assert client.calls[-1] == ("StopMove", None),                                  f"Last RPC must be the stop, got {client.calls[-1]}"
+    assert stream.rpc_latency.percentile(50) >= 0.05,                               "RPC latency should be recorded"
+
+    rate.reset()
+    for _ in range(3):
+        rate.tick()
+    assert rate.periods.count == 2,                                                 "Reset should start a new measurement"
+
+
+def test_emergency_stop_is_not_overtaken_by_a_queued_move():
+
+    client = SlowClient(rpc_sec=0.05)
+    stream = VelocityStreamer(client.Move, client.StopMove)
+
+    stream.set_velocity(0.0, 0.0, 0.8)
+    time.sleep(0.01)  # first Move in flight
+    stream.set_velocity(0.0, 0.0, -0.8)  # queued behind it
+    stream.emergency_stop()
+    stream.halt(wait=True)
+    stream.close()
+
+    assert ("Move", -0.8) not in client.calls,                                      "A queued move was sent after the emergency stop"
+    assert client.calls[-1] == ("StopMove", None),                                  "Last RPC must be the stop"
+
+
+def test_keepalive_resends_moving_setpoint():
+
+    client = SlowClient(rpc_sec=0.0)
+    stream = VelocityStreamer(client.Move, client.StopMove, keepalive_sec=0.05)
+    stream.set_velocity(0.3, 0.0, 0.0)
+    time.sleep(0.28)
+    stream.close()
+
+    moves = sum(1 for name, _ in client.calls if name == "Move")
+    assert 4 <= moves <= 7,                                                         f"Expected a resend every 50ms, got {moves} moves"